@@ -1,6 +1,8 @@
 import numpy as np
 import librosa
 
+from ui_segments import find_segments
+
 def change_audio_speed(y, sr, speed_factor=1.0):
     if speed_factor == 1.0:
         return y
@@ -35,31 +37,8 @@ def find_nonzero_segments(signal, sr, threshold=0.03, merge_threshold=1.0, mode=
     mode: "свободный" или "5:6"
     - В режиме "5:6" обязательно должно быть найдено ровно 30 интервалов.
     """
-    segments = []
-    start = None
-    for i, val in enumerate(signal):
-        if val > threshold and start is None:
-            start = i
-        elif val <= threshold and start is not None:
-            segments.append((start, i))
-            start = None
-    if start is not None:
-        segments.append((start, len(signal)))
-
-    # Объединение близких сегментов
-    merged = []
-    for start, end in segments:
-        if not merged:
-            merged.append((start, end))
-        else:
-            last_start, last_end = merged[-1]
-            if (start / sr) <= (last_end / sr + merge_threshold):
-                merged[-1] = (last_start, end)
-            else:
-                merged.append((start, end))
-
-    # Перевод в секунды
-    final_segments = [(s / sr, e / sr) for s, e in merged]
+    # Поиск и объединение интервалов — общий векторизованный движок
+    final_segments = find_segments(signal, sr, threshold, merge_threshold)
 
     # Проверка на количество интервалов в эксперименте
     if mode == "5:6" and len(final_segments) != 30:
@@ -0,0 +1,233 @@
+"""
+Пакетная обработка записей без GUI.
+Пример:
+    python batch.py recordings/ --energy --experiment 5:6 --quantile 0.92 --merge 1.0 --out reports/
+"""
+import argparse
+import glob
+import json
+import os
+import sys
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+
+from ui_audio_io import DECODE_CACHE_BYTES, decode_cache, open_audio
+from ui_envelope import ENVELOPES
+from ui_export import (APPEND_FORMATS, EXCEL, EXTENSIONS, REPORT_FORMATS, append_report, check_format,
+                       write_report, write_table)
+from ui_pipeline import DEFAULT_MEMORY_BUDGET, DEFAULT_PARAMS, STAGE_TITLES, run_pipeline
+from ui_profile import StageProfiler, stage_of
+from ui_report import build_report_frames, signal_stats
+from ui_stream import DEFAULT_BLOCK_SIZE, run_stream_pipeline
+from ui_speed import SPEED_MODES
+from ui_threshold import THRESHOLD_MODES
+
+AUDIO_EXTENSIONS = (".wav", ".mp3")
+
+
+def collect_files(inputs):
+    """
+    Разворачивает папки и шаблоны (glob) в отсортированный список аудиофайлов.
+    """
+    files = []
+    for item in inputs:
+        if os.path.isdir(item):
+            candidates = [os.path.join(item, name) for name in os.listdir(item)]
+        else:
+            candidates = glob.glob(item, recursive=True)
+        files.extend(p for p in candidates if os.path.isfile(p) and p.lower().endswith(AUDIO_EXTENSIONS))
+    return sorted(set(files))
+
+
+def report_names(files):
+    """
+    Имена отчётов (без расширения формата) для списка файлов: "<имя записи>_report".
+    Записи с одинаковым именем (a/x.wav и b/x.wav, x.wav и x.mp3) иначе перезаписали бы отчёты
+    друг друга — для них имя строится из пути относительно общей папки и расширения записи,
+    а если совпадение осталось и после этого — добавляется номер.
+    """
+    stems = [os.path.splitext(os.path.basename(f))[0] for f in files]
+    repeated = Counter(stem.lower() for stem in stems)
+    root = os.path.commonpath([os.path.dirname(os.path.abspath(f)) for f in files]) if files else ""
+    names, used = [], set()
+    for filepath, stem in zip(files, stems):
+        name = stem
+        if repeated[stem.lower()] > 1:
+            base, ext = os.path.splitext(os.path.relpath(os.path.abspath(filepath), root))
+            name = "_".join(base.split(os.sep) + [ext.lstrip(".").lower()])
+        unique, n = name, 1
+        while unique.lower() in used:  # регистр не различают файловые системы Windows и macOS
+            n += 1
+            unique = f"{name}_{n}"
+        used.add(unique.lower())
+        names.append(f"{unique}_report")
+    return names
+
+
+def process_file(filepath, params, out_dir, stream=False, block_size=DEFAULT_BLOCK_SIZE,
+                 memory_budget=DEFAULT_MEMORY_BUDGET, cache_bytes=DECODE_CACHE_BYTES, profile=False,
+                 format=EXCEL, append=False, report_name=None):
+    """
+    Обрабатывает один файл в отдельном процессе и пишет его отчёт.
+    Ошибки не пробрасываются — файл попадает в сводку со статусом "ошибка".
+    :param stream: потоковый режим — файл читается блоками и не загружается в память целиком
+    :param memory_budget: бюджет памяти цепочки в байтах (см. ui_pipeline.Pipeline)
+    :param cache_bytes: предел кэша декодированных файлов в байтах (см. ui_audio_io.open_audio)
+    :param profile: профилировать этапы — лист "Производительность" в отчёте и row["profile"]
+                    (строки ui_profile.StageProfiler.records, run_batch печатает их в JSON)
+    :param format: формат отчёта (см. ui_export.REPORT_FORMATS)
+    :param append: не писать отчёт, а вернуть таблицы в row["frames"] — их дописывает в набор данных
+                   run_batch (в одном процессе, чтобы записи в общие файлы не перемешивались)
+    :param report_name: имя отчёта без расширения (см. report_names); по умолчанию "<имя записи>_report"
+    :return: строка сводной таблицы
+    """
+    row = {"Файл": filepath, "Статус": "ok", "Сообщение": "", "Интервалов": None,
+           "Длительность (сек)": None, "Средняя длительность интервала (сек)": None, "Отчёт": ""}
+    profiler = StageProfiler(allocations=False) if profile else None
+    try:
+        with stage_of(profiler, "process"):
+            if stream:
+                with stage_of(profiler, "stream"):
+                    result = run_stream_pipeline(filepath, params, block_size)
+                stats = {"duration": result["duration"], "power": result["power"]}
+            else:
+                # PCM WAV и mp3 из кэша отображаются в память: целиком читаются, только если включены фильтры
+                with stage_of(profiler, "open"):
+                    y, sr = open_audio(filepath, cache_bytes)
+                result = run_pipeline(y, sr, params, memory_budget, profiler)
+                stats = signal_stats(result["audio"], result["sr"])
+        segments = result["segments"] or []
+
+        frames = build_report_frames(filepath, result["sr"], stats, segments, params,
+                                     profile=profiler and profiler.records(STAGE_TITLES))
+        if append:
+            row["frames"] = frames
+        else:
+            report_name = report_name or f"{os.path.splitext(os.path.basename(filepath))[0]}_report"
+            report_path = os.path.join(out_dir, f"{report_name}{EXTENSIONS[format]}")
+            row["Отчёт"] = ", ".join(write_report(report_path, frames, format=format))
+
+        row["Интервалов"] = len(segments)
+        row["Длительность (сек)"] = stats["duration"]
+        if segments:
+            row["Средняя длительность интервала (сек)"] = sum(e - s for s, e in segments) / len(segments)
+    except Exception as e:
+        # ValueError из режима "5:6" (не 30 интервалов) — ожидаемый исход, а не сбой пакета
+        row["Статус"] = "ошибка"
+        row["Сообщение"] = str(e)
+    if profiler:
+        row["profile"] = profiler.records(STAGE_TITLES)
+    return row
+
+
+def run_batch(files, params, out_dir, jobs=None, stream=False, block_size=DEFAULT_BLOCK_SIZE,
+              memory_budget=DEFAULT_MEMORY_BUDGET, cache_bytes=DECODE_CACHE_BYTES, profile=False,
+              format=EXCEL, append=None):
+    """
+    Обрабатывает файлы параллельно на пуле процессов.
+    С profile профиль этапов каждого файла печатается в stdout строкой JSON {"file", "stages"};
+    ход обработки — в stderr, чтобы stdout оставался корректным JSONL.
+    :param append: папка набора данных: вместо отчётов по файлам интервалы, метрики и фонемы
+                   дописываются в неё (ui_export.append_report, format — CSV или Parquet)
+    :return: сводная таблица (DataFrame) в порядке списка файлов
+    """
+    os.makedirs(out_dir, exist_ok=True)
+    rows = {}
+    with ProcessPoolExecutor(max_workers=jobs or os.cpu_count()) as pool:
+        futures = {pool.submit(process_file, f, params, out_dir, stream, block_size, memory_budget,
+                               cache_bytes, profile, format, append is not None, name): f
+                   for f, name in zip(files, report_names(files))}
+        for future in as_completed(futures):
+            row = future.result()
+            stages = row.pop("profile", None)
+            frames = row.pop("frames", None)
+            if frames is not None:
+                append_report(append, row["Файл"], frames, format)
+                row["Отчёт"] = append
+            rows[futures[future]] = row
+            print(f"[{'OK' if row['Статус'] == 'ok' else '!!'}] {row['Файл']} {row['Сообщение']}", file=sys.stderr)
+            if stages is not None:
+                print(json.dumps({"file": row["Файл"], "stages": stages}, ensure_ascii=False))
+    return pd.DataFrame([rows[f] for f in files])
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Пакетная обработка аудиозаписей")
+    parser.add_argument("inputs", nargs="*", help="папки или шаблоны файлов (*.wav, *.mp3)")
+    parser.add_argument("--out", default="reports", help="папка для отчётов")
+    parser.add_argument("--jobs", type=int, default=None, help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument("--stream", action="store_true",
+                        help="потоковый поиск интервалов без загрузки файла целиком "
+                             "(только --energy, огибающая по отсчётам)")
+    parser.add_argument("--block-size", type=int, default=DEFAULT_BLOCK_SIZE, help="размер блока в отсчётах")
+    parser.add_argument("--memory-budget", type=float, default=DEFAULT_MEMORY_BUDGET / 2**20,
+                        help="бюджет памяти на процесс, МБ: сверх него этапы выполняются по блокам")
+    parser.add_argument("--decode-cache", type=float, default=DECODE_CACHE_BYTES / 2**20,
+                        help="предел кэша декодированных mp3, МБ (0 — не кэшировать)")
+    parser.add_argument("--profile", action="store_true",
+                        help="профиль этапов (время, CPU, память): лист отчёта и JSON в stdout")
+    parser.add_argument("--format", choices=REPORT_FORMATS, default=EXCEL,
+                        help="формат отчётов и сводки: Excel, потоковый Excel (память не растёт), CSV, Parquet")
+    parser.add_argument("--append", metavar="ПАПКА", default=None,
+                        help="дописывать интервалы, метрики и фонемы всех файлов в один набор данных "
+                             "(--format CSV или Parquet) вместо отчётов по файлам")
+    parser.add_argument("--clear-cache", action="store_true",
+                        help="очистить кэш декодированных файлов (без входных файлов — только очистить)")
+
+    parser.add_argument("--noise", action="store_true", help="фильтр шума")
+    parser.add_argument("--normalize", action="store_true", help="нормализация")
+    parser.add_argument("--trim", action="store_true", help="обрезка тишины")
+    parser.add_argument("--markers", action="store_true", help="фонемы → зануление вне")
+    parser.add_argument("--energy", action="store_true", help="энергетические интервалы")
+
+    parser.add_argument("--speed", type=float, default=DEFAULT_PARAMS["speed"])
+    parser.add_argument("--speed-mode", choices=SPEED_MODES, default=DEFAULT_PARAMS["speed_mode"],
+                        help="учёт скорости: ресемплингом (по умолчанию) или приближённо аналитически на исходной частоте")
+    parser.add_argument("--quantile", type=float, default=DEFAULT_PARAMS["quantile"])
+    parser.add_argument("--merge", type=float, default=DEFAULT_PARAMS["merge"])
+    parser.add_argument("--window", type=int, default=DEFAULT_PARAMS["window"])
+    parser.add_argument("--experiment", choices=["свободный", "5:6"], default=DEFAULT_PARAMS["experiment"])
+    parser.add_argument("--threshold-mode", choices=THRESHOLD_MODES, default=DEFAULT_PARAMS["threshold_mode"],
+                        help="оценка квантилей: точная, приближённая или потоковая")
+    parser.add_argument("--threshold-error", type=float, default=DEFAULT_PARAMS["threshold_error"],
+                        help="допустимая относительная погрешность приближённых режимов")
+    parser.add_argument("--envelope", choices=ENVELOPES, default=DEFAULT_PARAMS["envelope"],
+                        help="огибающая: по отсчётам или по кадрам (окно сглаживания — в кадрах)")
+    parser.add_argument("--hop", type=int, default=DEFAULT_PARAMS["hop"], help="шаг кадров огибающей в отсчётах")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    params = {key: getattr(args, key) for key in DEFAULT_PARAMS}
+
+    if args.clear_cache:
+        freed = decode_cache().clear()
+        print(f"Кэш декодированных файлов очищен: {freed / 2**20:.0f} МБ", file=sys.stderr)
+        if not args.inputs:
+            return
+
+    if args.append and args.format not in APPEND_FORMATS:
+        raise SystemExit(f"[!!] --append поддерживает только форматы: {', '.join(APPEND_FORMATS)}")
+    try:
+        check_format(args.format)
+    except ImportError as e:
+        raise SystemExit(f"[!!] {e}")
+    files = collect_files(args.inputs)
+    if not files:
+        raise SystemExit("[!!] Не найдено ни одного аудиофайла.")
+
+    summary = run_batch(files, params, args.out, args.jobs, args.stream, args.block_size,
+                        int(args.memory_budget * 2**20), int(args.decode_cache * 2**20), args.profile,
+                        args.format, args.append)
+    summary_path = os.path.join(args.out, f"summary{EXTENSIONS[args.format]}")
+    write_table(summary_path, summary, args.format)
+
+    failed = (summary["Статус"] != "ok").sum()
+    print(f"Обработано: {len(summary)}, с ошибкой: {failed}. Сводка: {summary_path}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,98 @@
+"""
+Варианты вычислений для распознавания речи на CPU: коэффициент реального времени (RTF)
+и сдвиг меток времени слов относительно fp32 whisper-small на одной и той же записи.
+Запуск из корня проекта:
+    python -m benchmarks.bench_asr_backends --file temp.wav --threads 4
+    python -m benchmarks.bench_asr_backends --backends openai/whisper-small:int8 openai/whisper-base:fp32
+Первый вариант в списке — эталон (по умолчанию openai/whisper-small:fp32).
+"""
+import argparse
+import difflib
+import time
+
+import numpy as np
+import torch
+
+from ui_audio_io import load_audio_file
+from ui_phoneme_analysis import (ASR_MODEL, FP32, INT8, PhonemeAnalyzer, load_transcriber)
+
+DEFAULT_BACKENDS = (f"{ASR_MODEL}:{FP32}", f"{ASR_MODEL}:{INT8}",
+                    f"openai/whisper-base:{FP32}", f"openai/whisper-base:{INT8}")
+
+
+def transcribe(transcriber, audio, sr, repeat):
+    """
+    Лучшее время распознавания из repeat запусков (без дискового кэша анализатора) и слова.
+    """
+    inputs = PhonemeAnalyzer(None, audio, sr).model_input(transcriber.feature_extractor.sampling_rate)
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = transcriber(dict(inputs), return_timestamps="word")
+        best = min(best, time.perf_counter() - t0)
+    words = [(chunk["text"].strip().lower(), *chunk["timestamp"]) for chunk in result.get("chunks", [])]
+    return best, words
+
+
+def timestamp_drift(reference, words):
+    """
+    Сопоставляет слова с эталоном (difflib) и считает сдвиг начала/конца совпавших слов.
+    :return: (доля совпавших слов эталона, средний сдвиг, максимальный сдвиг) в секундах
+    """
+    matcher = difflib.SequenceMatcher(a=[w for w, _, _ in reference], b=[w for w, _, _ in words],
+                                      autojunk=False)
+    shifts = []
+    matched = 0
+    for block in matcher.get_matching_blocks():
+        for k in range(block.size):
+            _, s0, e0 = reference[block.a + k]
+            _, s1, e1 = words[block.b + k]
+            matched += 1
+            if s0 is not None and s1 is not None:
+                shifts.append(abs(s1 - s0))
+            if e0 is not None and e1 is not None:
+                shifts.append(abs(e1 - e0))
+    share = matched / len(reference) if reference else 1.0
+    if not shifts:
+        return share, float("nan"), float("nan")
+    return share, float(np.mean(shifts)), float(np.max(shifts))
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк вариантов распознавания речи на CPU")
+    parser.add_argument("--file", default="temp.wav")
+    parser.add_argument("--backends", nargs="+", default=list(DEFAULT_BACKENDS),
+                        help="варианты вида чекпойнт:точность (fp32 или int8)")
+    parser.add_argument("--threads", type=int, default=None)
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    if args.threads:
+        torch.set_num_threads(args.threads)
+    audio, sr = load_audio_file(args.file)
+    duration = len(audio) / sr
+    print(f"Запись: {args.file}, {duration:.1f} с @ {sr} Гц, потоков torch: {torch.get_num_threads()}")
+    print(f"{'вариант':<34} {'загрузка':>9} {'время':>8} {'RTF':>7} {'слов':>6} {'совп.':>6} "
+          f"{'сдвиг ср.':>10} {'сдвиг макс.':>12}")
+
+    reference = None
+    for name in args.backends:
+        model, _, precision = name.rpartition(":")
+        t0 = time.perf_counter()
+        transcriber = load_transcriber(model, precision)
+        load_time = time.perf_counter() - t0
+
+        model_sr = transcriber.feature_extractor.sampling_rate
+        transcriber(PhonemeAnalyzer(None, audio[:sr], sr).model_input(model_sr))  # прогрев
+        elapsed, words = transcribe(transcriber, audio, sr, args.repeat)
+        if reference is None:
+            reference = words
+        share, mean_shift, max_shift = timestamp_drift(reference, words)
+        print(f"{name:<34} {load_time:8.1f}с {elapsed:7.2f}с {elapsed / duration:7.3f} {len(words):6d} "
+              f"{share:6.0%} {mean_shift:9.3f}с {max_shift:11.3f}с")
+        del transcriber
+
+
+if __name__ == "__main__":
+    main()
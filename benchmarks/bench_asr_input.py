@@ -0,0 +1,86 @@
+"""
+Подача аудио в модель распознавания: временный WAV + ffmpeg (исходный путь)
+против отсчётов из памяти. Запуск из корня проекта:
+    python -m benchmarks.bench_asr_input --seconds 120 --sr 22050
+    python -m benchmarks.bench_asr_input --file record.wav --model openai/whisper-tiny
+    python -m benchmarks.bench_asr_input --input-only   # без модели: только подготовка входа
+"""
+import argparse
+import os
+import tempfile
+
+import librosa
+import numpy as np
+import torch
+import torchaudio
+from transformers.pipelines.audio_utils import ffmpeg_read
+
+from benchmarks.common import synthetic_audio, best_time
+from ui_phoneme_analysis import ASR_MODEL, PhonemeAnalyzer, load_transcriber
+
+MODEL_SR = 16000
+
+
+def legacy_input(audio, sr, path):
+    # Исходный путь: тензор -> temp.wav, затем pipeline читает файл и декодирует его через ffmpeg
+    audio_tensor = torch.tensor(np.array(audio)[None, :], dtype=torch.float32)
+    torchaudio.save(path, audio_tensor, sr)
+    with open(path, "rb") as f:
+        return ffmpeg_read(f.read(), MODEL_SR)
+
+
+def memory_input(audio, sr):
+    return PhonemeAnalyzer(None, audio, sr).model_input(MODEL_SR)["raw"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк подачи аудио в распознавание речи")
+    parser.add_argument("--file", help="аудиофайл (по умолчанию — синтетический сигнал)")
+    parser.add_argument("--seconds", type=float, default=120)
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--model", default=ASR_MODEL)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--input-only", action="store_true", help="не запускать модель")
+    args = parser.parse_args()
+
+    if args.file:
+        audio, sr = librosa.load(args.file, sr=None)
+    else:
+        audio, sr = synthetic_audio(args.seconds, args.sr), args.sr
+    print(f"Сигнал: {len(audio) / sr:.0f} с @ {sr} Гц")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "temp.wav")
+
+        t_legacy, legacy = best_time(legacy_input, audio, sr, path, repeat=args.repeat)
+        t_memory, memory = best_time(memory_input, audio, sr, repeat=args.repeat)
+        print("Подготовка входа:")
+        print(f"  temp.wav + ffmpeg   {t_legacy:8.3f} с")
+        print(f"  из памяти           {t_memory:8.3f} с   (x{t_legacy / t_memory:.1f})")
+        print(f"  расхождение входов  {np.abs(legacy[:len(memory)] - memory[:len(legacy)]).max():.2e}"
+              f"   длины {len(legacy)} / {len(memory)}")
+        if args.input_only:
+            return
+
+        transcriber = load_transcriber(args.model)
+
+        def run_legacy():
+            audio_tensor = torch.tensor(np.array(audio)[None, :], dtype=torch.float32)
+            torchaudio.save(path, audio_tensor, sr)
+            return transcriber(path, return_timestamps="word")
+
+        def run_memory():
+            inputs = PhonemeAnalyzer(None, audio, sr).model_input(MODEL_SR)
+            return transcriber(inputs, return_timestamps="word")
+
+        t_legacy, result_legacy = best_time(run_legacy, repeat=args.repeat)
+        t_memory, result_memory = best_time(run_memory, repeat=args.repeat)
+        print(f"Анализ целиком ({args.model}):")
+        print(f"  temp.wav + ffmpeg   {t_legacy:8.3f} с")
+        print(f"  из памяти           {t_memory:8.3f} с   (x{t_legacy / t_memory:.2f})")
+        same = result_legacy["text"] == result_memory["text"]
+        print(f"  текст совпадает: {'да' if same else 'нет'}")
+
+
+if __name__ == "__main__":
+    main()
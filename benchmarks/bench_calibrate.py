@@ -0,0 +1,71 @@
+"""
+Подбор параметров «5:6» по индексу порогов и промежутков против перебора сетки ползунков
+запусками цепочки: время построения индекса, время поиска и проверка — найденные пары дают
+ровно 30 интервалов, а число интервалов по индексу совпадает с цепочкой в случайных точках сетки.
+Запуск из корня проекта:
+    python -m benchmarks.bench_calibrate --minutes 10 --check 50
+"""
+import argparse
+import time
+
+import numpy as np
+
+from benchmarks.common import protocol_audio
+from ui_calibrate import CALIBRATION_MERGES, CALIBRATION_QUANTILES, build_index, calibrate, segment_counts
+from ui_pipeline import DEFAULT_PARAMS, Pipeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк подбора параметров «5:6»")
+    parser.add_argument("--minutes", type=float, default=10)
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--check", type=int, default=50, help="точек сетки для сверки с цепочкой")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    y, _ = protocol_audio(args.minutes * 60, args.sr, seed=args.seed)
+    params = {**DEFAULT_PARAMS, "energy": True, "experiment": "5:6"}
+    pipeline = Pipeline()
+    pipeline.run(y, args.sr, params, check=False)
+    smoothed, rate, envelope, _ = pipeline.smoothed_envelope(y, args.sr, params)
+
+    start = time.perf_counter()
+    index = build_index(smoothed, rate, envelope)
+    built = time.perf_counter() - start
+    start = time.perf_counter()
+    candidates = calibrate(index)
+    searched = time.perf_counter() - start
+
+    # Одна точка перебора — пересчёт порога, участков и слияния, как при движении ползунков
+    start = time.perf_counter()
+    pipeline.run(y, args.sr, {**params, "quantile": 0.5, "merge": 0.1}, check=False)
+    per_cell = time.perf_counter() - start
+    cells = len(CALIBRATION_QUANTILES) * len(CALIBRATION_MERGES)
+
+    print(f"Запись «5:6»: {args.minutes:g} мин @ {args.sr} Гц, сетка {cells} пар")
+    print(f"Индекс: {built:.2f} с, поиск: {searched * 1000:.1f} мс; "
+          f"перебор цепочкой: ~{per_cell * cells:.0f} с ({per_cell * 1000:.0f} мс на пару)")
+
+    counts = segment_counts(index)
+    rng = np.random.default_rng(args.seed)
+    mismatches = 0
+    for i, j in zip(rng.integers(len(CALIBRATION_QUANTILES), size=args.check),
+                    rng.integers(len(CALIBRATION_MERGES), size=args.check)):
+        result = pipeline.run(y, args.sr, {**params, "quantile": float(CALIBRATION_QUANTILES[i]),
+                                           "merge": float(CALIBRATION_MERGES[j])}, check=False)
+        if counts[i, j] >= 0 and counts[i, j] != len(result["segments"]):
+            mismatches += 1
+    if mismatches:
+        raise SystemExit(f"[!!] Число интервалов по индексу расходится с цепочкой в {mismatches} точках")
+
+    if not candidates:
+        raise SystemExit("[!!] Не найдено ни одной пары с 30 интервалами")
+    for candidate in candidates:
+        pipeline.run(y, args.sr, {**params, "quantile": candidate["quantile"], "merge": candidate["merge"]})
+    best = candidates[0]
+    print(f"[OK] {len(candidates)} пар дают 30 интервалов; лучшая: квантиль {best['quantile']:.2f}, "
+          f"слияние {best['merge']:.1f} с (запас {best['quantile_margin']} шагов, {best['merge_margin']:.2f} с)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,59 @@
+"""
+Огибающие по кадрам против |y| по отсчётам: время, пиковая память и длина огибающей
+для энергии и сглаживания, а также время всей цепочки поиска интервалов.
+Запуск из корня проекта:
+    python -m benchmarks.bench_envelope --seconds 1800 --sr 44100 --hops 128 256 512
+"""
+import argparse
+import time
+import tracemalloc
+
+import numpy as np
+
+from benchmarks.common import synthetic_audio
+from ui_envelope import SAMPLES, RMS, PEAK, TKEO, frame_envelope
+from ui_latent_free import smooth_signal
+from ui_pipeline import run_pipeline
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def envelope_and_smoothing(y, feature, hop, window):
+    energy = np.abs(y) if feature == SAMPLES else frame_envelope(y, feature, hop)
+    return smooth_signal(energy, window)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк огибающих по кадрам")
+    parser.add_argument("--seconds", type=float, default=1800)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--hops", type=int, nargs="+", default=[128, 256, 512])
+    parser.add_argument("--window", type=int, default=5)
+    args = parser.parse_args()
+
+    y = synthetic_audio(args.seconds, args.sr)
+    print(f"Сигнал: {args.seconds:.0f} с @ {args.sr} Гц, {len(y):,} отсчётов ({y.nbytes / 2**20:.0f} МБ)")
+    print(f"{'огибающая':<14} {'шаг':>5} {'длина':>12} {'сжатие':>7} {'энергия+сглаж.':>15} "
+          f"{'пик памяти':>11} {'цепочка':>9} {'интервалов':>11}")
+
+    variants = [(SAMPLES, 1)] + [(feature, hop) for feature in (RMS, PEAK, TKEO) for hop in args.hops]
+    for feature, hop in variants:
+        elapsed, peak, smoothed = measure(envelope_and_smoothing, y, feature, hop, args.window)
+        t0 = time.perf_counter()
+        result = run_pipeline(y, args.sr, {"energy": True, "envelope": feature, "hop": hop,
+                                           "window": args.window})
+        total = time.perf_counter() - t0
+        print(f"{feature:<14} {hop:5d} {len(smoothed):12,d} {len(y) / len(smoothed):6.0f}x {elapsed:14.3f}с "
+              f"{peak / 2**20:9.1f}МБ {total:8.3f}с {len(result['segments']):11d}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,79 @@
+"""
+Запись отчёта в разных форматах на длинной таблице фонем (строка на символ): время, прирост RSS
+и размер файлов. Листы должны читаться обратно с теми же значениями.
+Запуск из корня проекта:
+    python -m benchmarks.bench_export --rows 200000
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import pandas as pd
+
+from ui_export import CSV, EXCEL, EXCEL_STREAM, PARQUET, REPORT_FORMATS, check_format, write_report
+from ui_profile import StageProfiler, current_rss
+from ui_report import build_report_frames
+
+
+def phoneme_table(rows, seed=0):
+    rng = np.random.default_rng(seed)
+    letters = np.array(list("абвгдежзийклмнопрстуфхцчшщыэюя"))
+    starts = np.cumsum(rng.uniform(0.05, 0.2, rows))
+    durations = rng.uniform(0.03, 0.15, rows)
+    return pd.DataFrame({
+        "Символ": rng.choice(letters, rows),
+        "Вариант 1": rng.choice(letters, rows),
+        "Вариант 2": rng.choice(letters, rows),
+        "Вариант 3": rng.choice(letters, rows),
+        "Начало (сек)": starts.round(3),
+        "Конец (сек)": (starts + durations).round(3),
+        "Длительность (сек)": durations.round(3),
+    })
+
+
+def read_back(paths, format):
+    if format in (EXCEL, EXCEL_STREAM):
+        return pd.read_excel(paths[0], sheet_name="Фонемы")
+    path = next(p for p in paths if p.endswith(f"_phonemes{os.path.splitext(p)[1]}"))
+    return pd.read_csv(path) if format == CSV else pd.read_parquet(path)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк форматов отчёта")
+    parser.add_argument("--rows", type=int, default=200000, help="строк в таблице фонем")
+    parser.add_argument("--formats", nargs="+", choices=REPORT_FORMATS, default=list(REPORT_FORMATS))
+    args = parser.parse_args()
+
+    phonemes = phoneme_table(args.rows)
+    segments = [(i * 2.0, i * 2.0 + 0.4) for i in range(30)]
+    params = {"speed": 1.0, "quantile": 0.92, "merge": 1.0, "window": 5, "experiment": "5:6",
+              "threshold_mode": "точный"}
+    frames = build_report_frames("session.wav", 22050, {"duration": 600.0, "power": 0.01}, segments, params,
+                                 phonemes)
+    print(f"Таблица фонем: {len(phonemes)} строк")
+
+    with tempfile.TemporaryDirectory() as folder:
+        for format in args.formats:
+            try:
+                check_format(format)
+            except ImportError as e:
+                print(f"{format:<20} пропущен: {e}")
+                continue
+            profiler = StageProfiler(allocations=False)
+            before = current_rss()
+            start = time.perf_counter()
+            with profiler.stage(format) as row:
+                paths = write_report(os.path.join(folder, f"report_{len(os.listdir(folder))}.xlsx"), frames,
+                                     format=format)
+            elapsed = time.perf_counter() - start
+            size = sum(os.path.getsize(p) for p in paths)
+            if not np.allclose(read_back(paths, format)["Длительность (сек)"], phonemes["Длительность (сек)"]):
+                raise SystemExit(f"[!!] {format}: таблица фонем читается с другими значениями")
+            peak = "—" if before is None else f"+{(row['rss_peak'] - before) / 2**20:.0f} МБ"
+            print(f"{format:<20} {elapsed:7.2f} с   пик RSS {peak:>8}   {size / 2**20:6.1f} МБ, файлов: {len(paths)}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+"""
+Время до первого графика для большого PCM WAV: отображение в память и обзор по пробам
+против полной загрузки (librosa.load) с построением пирамиды. Файл создаётся по частям
+во временном каталоге (или берётся готовый --file). RSS после полной пирамиды включает
+прочитанные страницы отображённого файла — это кэш, который система может вытеснить.
+Запуск из корня проекта:
+    python -m benchmarks.bench_lazy_load --gb 2 --max-first 1.0
+"""
+import argparse
+import os
+import tempfile
+import time
+
+import numpy as np
+import soundfile as sf
+
+from benchmarks.common import synthetic_audio
+from ui_audio_io import load_audio_file, open_lazy_wav
+from ui_profile import current_rss
+from ui_waveform import WaveformPyramid
+
+
+def write_wav(path, gigabytes, sr, chunk_seconds=600):
+    """
+    PCM 16 бит моно размером около gigabytes ГБ, по chunk_seconds секунд за запись.
+    """
+    frames = int(gigabytes * 2**30 / 2)
+    with sf.SoundFile(path, "w", samplerate=sr, channels=1, subtype="PCM_16") as f:
+        seed = 0
+        while frames > 0:
+            part = synthetic_audio(min(chunk_seconds, frames / sr), sr, seed=seed)
+            f.write(np.clip(part, -1, 1))
+            frames -= len(part)
+            seed += 1
+
+
+def rss_mb():
+    rss = current_rss()
+    return "—" if rss is None else f"{rss / 2**20:.0f} МБ"
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк ленивой загрузки WAV")
+    parser.add_argument("--file", help="готовый PCM WAV (иначе создаётся временный)")
+    parser.add_argument("--gb", type=float, default=2.0)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--max-first", type=float, default=1.0, help="допустимое время до первого графика, с")
+    parser.add_argument("--full-load", action="store_true", help="сравнить с librosa.load (нужна память под весь сигнал)")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        path = args.file
+        if path is None:
+            path = os.path.join(tmp, "long.wav")
+            t0 = time.perf_counter()
+            write_wav(path, args.gb, args.sr)
+            print(f"Создан {os.path.getsize(path) / 2**30:.2f} ГБ за {time.perf_counter() - t0:.1f} с")
+
+        t0 = time.perf_counter()
+        y = open_lazy_wav(path)
+        if y is None:
+            raise SystemExit("[!!] Файл не PCM WAV — ленивая загрузка недоступна")
+        opened = time.perf_counter() - t0
+        overview = WaveformPyramid.overview(y, y.sr)
+        first = time.perf_counter() - t0
+        print(f"Сигнал: {y.duration / 3600:.2f} ч @ {y.sr} Гц, {y.nbytes / 2**30:.2f} ГБ в float32")
+        print(f"Открытие (заголовок + memmap): {opened * 1000:8.1f} мс")
+        print(f"До первого графика (обзор):    {first * 1000:8.1f} мс, RSS {rss_mb()}")
+
+        t0 = time.perf_counter()
+        x, _ = overview.view(y.duration / 2, y.duration / 2 + 1, 1000)
+        print(f"Видимая секунда в масштабе:    {(time.perf_counter() - t0) * 1000:8.1f} мс ({len(x)} точек)")
+
+        t0 = time.perf_counter()
+        pyramid = WaveformPyramid(y, y.sr)
+        print(f"Полная пирамида (в фоне):      {time.perf_counter() - t0:8.2f} с, RSS {rss_mb()}")
+        lo, hi = pyramid.amplitude_range()
+        print(f"Размах: обзор {overview.amplitude_range()}, полная пирамида ({lo}, {hi})")
+
+        if args.full_load:
+            del pyramid, overview
+            t0 = time.perf_counter()
+            full, sr = load_audio_file(path)
+            WaveformPyramid(full, sr)
+            print(f"librosa.load + пирамида:       {time.perf_counter() - t0:8.2f} с, RSS {rss_mb()}")
+            if not np.array_equal(full[:1 << 20], y[:1 << 20]):
+                raise SystemExit("[!!] Отсчёты LazyAudio отличаются от librosa.load")
+            del full
+
+        del y
+        if first > args.max_first:
+            raise SystemExit(f"[!!] До первого графика {first:.2f} с > {args.max_first} с")
+        print(f"\n[OK] Первый график за {first * 1000:.0f} мс")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,54 @@
+"""
+Память цепочки обработки по этапам: время, пиковый RSS, пик выделений и удержанные массивы
+без ограничения памяти и с бюджетом (поблочное выполнение). Интервалы должны совпадать.
+Запуск из корня проекта:
+    python -m benchmarks.bench_memory --seconds 1800 --sr 44100 --budget-mb 256 --noise --normalize
+"""
+import argparse
+
+from benchmarks.common import synthetic_audio
+from ui_pipeline import STAGE_TITLES, run_pipeline
+from ui_profile import StageProfiler, current_rss
+
+
+def profile_run(y, sr, params, budget):
+    profiler = StageProfiler()
+    with profiler.stage("total"):
+        result = run_pipeline(y, sr, params, memory_budget=budget, profiler=profiler)
+    return result, profiler
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк памяти цепочки обработки")
+    parser.add_argument("--seconds", type=float, default=1800)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--budget-mb", type=float, default=256)
+    for name in ("noise", "normalize", "trim", "markers"):
+        parser.add_argument(f"--{name}", action="store_true")
+    args = parser.parse_args()
+
+    y = synthetic_audio(args.seconds, args.sr)
+    params = {"energy": True, "noise": args.noise, "normalize": args.normalize,
+              "trim": args.trim, "markers": args.markers}
+    rss = current_rss()
+    print(f"Сигнал: {args.seconds:.0f} с @ {args.sr} Гц, {y.nbytes / 2**20:.0f} МБ {y.dtype}"
+          + (f", RSS до запуска {rss / 2**20:.0f} МБ" if rss is not None else ""))
+
+    titles = {**STAGE_TITLES, "total": "Всего"}
+    unlimited, profiler = profile_run(y, args.sr, params, None)
+    print("\nБез ограничения памяти:")
+    print(profiler.table(titles))
+
+    budget = int(args.budget_mb * 2**20)
+    budgeted, profiler = profile_run(y, args.sr, params, budget)
+    print(f"\nБюджет {args.budget_mb:.0f} МБ (по блокам):")
+    print(profiler.table(titles))
+
+    if budgeted["segments"] != unlimited["segments"] or budgeted["threshold"] != unlimited["threshold"]:
+        raise SystemExit("[!!] Результат поблочного выполнения отличается")
+    print(f"\n[OK] Интервалы совпадают ({len(budgeted['segments'])} шт.), "
+          f"тип результата: {budgeted['audio'].dtype}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,74 @@
+"""
+Пропускная способность фильтра шума (отсчётов в секунду): исходная реализация
+(np.where + scipy.signal.medfilt) против блочной в потоках. Результаты должны совпадать побитно.
+Медиана отдельно сравнивается на отфильтрованном сигнале (почти весь из нулей — там medfilt быстрее
+median5) и на плотном исходном (там быстрее median5).
+Запуск из корня проекта:
+    python -m benchmarks.bench_noise --seconds 1800 --sr 44100 --workers 1 4 8
+"""
+import argparse
+import os
+
+import numpy as np
+import scipy.signal
+
+from benchmarks.common import synthetic_audio, best_time
+from ui_noise import apply_noise_filter, median5
+from ui_threshold import EXACT, THRESHOLD_MODES, quantile
+
+
+def legacy_noise_filter(signal, background_quantile=0.1, peak_quantile=0.96, threshold_mode=EXACT):
+    # Исходная реализация — эталон
+    abs_signal = np.abs(signal)
+    bg_level = quantile(abs_signal, background_quantile, threshold_mode)
+    no_bg = np.where(abs_signal >= bg_level, signal, 0)
+    cleaned_abs = np.abs(no_bg)
+    if np.any(cleaned_abs > 0):
+        peak_level = quantile(cleaned_abs, peak_quantile, threshold_mode, positive_only=True)
+        cleaned = np.where(cleaned_abs >= peak_level, no_bg, 0)
+    else:
+        cleaned = no_bg
+    return scipy.signal.medfilt(cleaned, kernel_size=5)
+
+
+def report(name, elapsed, n, same):
+    status = "OK" if same else "!!"
+    print(f"[{status}] {name:<36} {elapsed:8.3f} с   {n / elapsed / 1e6:8.1f} млн отсч./с")
+    return same
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк фильтра шума")
+    parser.add_argument("--seconds", type=float, default=1800)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--workers", type=int, nargs="+", default=sorted({1, os.cpu_count() or 1}))
+    parser.add_argument("--mode", choices=THRESHOLD_MODES, default=EXACT)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    y = synthetic_audio(args.seconds, args.sr)
+    n = len(y)
+    print(f"Сигнал: {args.seconds:.0f} с @ {args.sr} Гц, {n:,} отсчётов, режим порога: {args.mode}")
+
+    ok = True
+    t_ref, ref = best_time(legacy_noise_filter, y, threshold_mode=args.mode, repeat=args.repeat)
+    ok &= report("np.where + medfilt (исходный)", t_ref, n, True)
+
+    for name, x in (("после зануления", ref), ("плотный сигнал", y)):
+        t_med, med = best_time(scipy.signal.medfilt, x, 5, repeat=args.repeat)
+        ok &= report(f"  medfilt, {name}", t_med, n, True)
+        t_med, fast = best_time(median5, x, repeat=args.repeat)
+        ok &= report(f"  median5, {name}", t_med, n, np.array_equal(med, fast))
+
+    for workers in args.workers:
+        elapsed, result = best_time(apply_noise_filter, y, threshold_mode=args.mode, workers=workers,
+                                    repeat=args.repeat)
+        ok &= report(f"apply_noise_filter, потоков: {workers}", elapsed, n,
+                     result.dtype == ref.dtype and np.array_equal(result, ref))
+
+    if not ok:
+        raise SystemExit("[!!] Результат отличается от исходной реализации")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Память и задержка перерисовки за N циклов «ОБРАБОТАТЬ»:
+новая фигура на каждый цикл (как раньше) против одного долгоживущего WaveformPlot.
+Запуск из корня проекта:
+    python -m benchmarks.bench_redraw --seconds 600 --cycles 100
+"""
+import argparse
+import os
+import resource
+import time
+
+import matplotlib
+matplotlib.use("Agg")
+import matplotlib.pyplot as plt
+import librosa.display
+from matplotlib.backends.backend_agg import FigureCanvasAgg
+
+from benchmarks.common import synthetic_audio
+from ui_plot import WaveformPlot
+from ui_waveform import WaveformPyramid
+
+
+def rss_mb():
+    # Текущий RSS процесса (Linux), иначе — пиковый
+    try:
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE") / 2**20
+    except OSError:
+        return resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024
+
+
+def fake_segments(cycle, duration):
+    step = duration / 31
+    return [(step * i + 0.01 * cycle, step * i + step / 2) for i in range(1, 31)]
+
+
+def legacy_cycle(y, processed, sr, cycle):
+    # Прежний draw_waveform: новая фигура через pyplot, waveshow по всему сигналу, фигура не закрывается
+    fig, ax = plt.subplots(figsize=(10, 3), dpi=100)
+    librosa.display.waveshow(y, sr=sr, ax=ax, alpha=0.5, color='gray', label='Оригинал')
+    librosa.display.waveshow(processed, sr=sr, ax=ax, alpha=0.9, color='blue', label='Обработанный')
+    for start, end in fake_segments(cycle, len(y) / sr):
+        ax.axvline(x=start, color='green', linestyle='--')
+        ax.axvline(x=end, color='red', linestyle='--')
+        ax.axvspan(start, end, color='green', alpha=0.2)
+    ax.axhline(y=0.3, color='purple', linestyle='--', label='Порог')
+    ax.legend(loc="upper right")
+    FigureCanvasAgg(fig).draw()
+
+
+def run(name, cycles, step):
+    latencies = []
+    memory = [rss_mb()]
+    for cycle in range(cycles):
+        t0 = time.perf_counter()
+        step(cycle)
+        latencies.append(time.perf_counter() - t0)
+        memory.append(rss_mb())
+    first, last = latencies[:10], latencies[-10:]
+    warm = memory[min(10, cycles)]
+    print(f"{name}: задержка {sum(first) / len(first) * 1000:.0f} → {sum(last) / len(last) * 1000:.0f} мс "
+          f"(первые/последние 10), память {memory[0]:.0f} → {memory[-1]:.0f} МБ "
+          f"(прирост после 10 циклов разогрева: {memory[-1] - warm:+.0f} МБ)")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк перерисовки графика")
+    parser.add_argument("--seconds", type=float, default=600)
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--cycles", type=int, default=100)
+    parser.add_argument("--legacy-cycles", type=int, default=20)
+    args = parser.parse_args()
+
+    y = synthetic_audio(args.seconds, args.sr)
+    duration = len(y) / args.sr
+
+    plot = WaveformPlot(FigureCanvasAgg)
+    original = WaveformPyramid(y, args.sr)
+
+    def persistent_cycle(cycle):
+        processed = y * (0.5 + 0.005 * cycle)
+        plot.set_waveforms(original, WaveformPyramid(processed, args.sr))
+        plot.set_overlays(fake_segments(cycle, duration), 0.3, [duration / 5 * i for i in range(1, 5)])
+        plot.canvas.draw()
+
+    run("Один WaveformPlot", args.cycles, persistent_cycle)
+
+    def overlay_cycle(cycle):
+        plot.set_overlays(fake_segments(cycle, duration), 0.3)
+
+    run("Только наложения (blit)", args.cycles, overlay_cycle)
+
+    if args.legacy_cycles:
+        run("Новая фигура на цикл", args.legacy_cycles,
+            lambda cycle: legacy_cycle(y, y * (0.5 + 0.005 * cycle), args.sr, cycle))
+
+
+if __name__ == "__main__":
+    main()
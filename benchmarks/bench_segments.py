@@ -0,0 +1,68 @@
+"""
+Сравнение поиска интервалов: исходный поэлементный цикл против векторизованного движка.
+Запуск из корня проекта:
+    python -m benchmarks.bench_segments --seconds 3600 --sr 44100
+"""
+import argparse
+
+from benchmarks.common import synthetic_audio, best_time
+from ui_latent_free import smooth_signal, compute_threshold
+from ui_segments import find_segments
+
+
+def legacy_find_nonzero_segments(signal, sr, threshold, merge_threshold):
+    # Исходная реализация из ui_latent_free.py — эталон для сравнения
+    segments = []
+    start = None
+    for i, val in enumerate(signal):
+        if val > threshold and start is None:
+            start = i
+        elif val <= threshold and start is not None:
+            segments.append((start, i))
+            start = None
+    if start is not None:
+        segments.append((start, len(signal)))
+
+    merged = []
+    for start, end in segments:
+        if not merged:
+            merged.append((start, end))
+        else:
+            last_start, last_end = merged[-1]
+            if (start / sr) <= (last_end / sr + merge_threshold):
+                merged[-1] = (last_start, end)
+            else:
+                merged.append((start, end))
+
+    return [(s / sr, e / sr) for s, e in merged]
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк поиска энергетических интервалов")
+    parser.add_argument("--seconds", type=float, default=3600)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--quantile", type=float, default=0.92)
+    parser.add_argument("--merge", type=float, default=1.0)
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    y = synthetic_audio(args.seconds, args.sr)
+    smoothed = smooth_signal(abs(y), args.window)
+    del y
+    threshold = compute_threshold(smoothed, args.quantile)
+    print(f"Сигнал: {args.seconds:.0f} с @ {args.sr} Гц, {len(smoothed):,} отсчётов")
+
+    t_fast, fast = best_time(find_segments, smoothed, args.sr, threshold, args.merge, repeat=args.repeat)
+    print(f"Векторизованный движок: {t_fast:.3f} с")
+
+    t_legacy, legacy = best_time(legacy_find_nonzero_segments, smoothed, args.sr, threshold, args.merge, repeat=1)
+    print(f"Поэлементный цикл:      {t_legacy:.3f} с")
+
+    if fast != legacy:
+        raise SystemExit("[!!] Результаты различаются!")
+    print(f"[OK] Интервалы совпадают ({len(fast)} шт.), ускорение ×{t_legacy / t_fast:.1f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,60 @@
+"""
+Учёт скорости: ресемплинг против аналитического пересчёта окна сглаживания.
+Аналитический режим — приближение (ресемплинг меняет сам сигнал), поэтому проверяется, что
+число интервалов совпадает, а границы расходятся не больше --tolerance-ms, на нескольких seed.
+Запуск из корня проекта:
+    python -m benchmarks.bench_speed --seconds 600 --sr 44100 --speeds 0.5 0.8 1.3 2.0 --seeds 0 1 2 3 4 5
+"""
+import argparse
+import itertools
+
+import numpy as np
+
+from benchmarks.common import synthetic_audio, best_time
+from ui_pipeline import run_pipeline
+from ui_speed import ANALYTIC, RESAMPLE
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк режимов учёта скорости")
+    parser.add_argument("--seconds", type=float, default=600)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--speeds", type=float, nargs="+", default=[0.5, 0.8, 1.3, 2.0])
+    parser.add_argument("--windows", type=int, nargs="+", default=[1, 5, 11])
+    parser.add_argument("--seeds", type=int, nargs="+", default=[0, 1, 2, 3, 4, 5])
+    parser.add_argument("--merge", type=float, default=0.3)
+    parser.add_argument("--tolerance-ms", type=float, default=2.0, help="допустимый сдвиг границ, мс")
+    parser.add_argument("--repeat", type=int, default=2)
+    args = parser.parse_args()
+
+    tolerance = args.tolerance_ms / 1000
+    print(f"Сигнал: {args.seconds:.0f} с @ {args.sr} Гц, seed {args.seeds}, слияние {args.merge} с")
+    print(f"{'seed':>6} {'скорость':>8} {'окно':>5} {'ресемплинг':>11} {'аналит.':>9} {'интервалов':>11} "
+          f"{'макс. сдвиг':>12} {'допуск':>9}")
+
+    ok = True
+    for seed in args.seeds:
+        y = synthetic_audio(args.seconds, args.sr, seed=seed)
+        for speed, window in itertools.product(args.speeds, args.windows):
+            params = {"energy": True, "speed": speed, "window": window, "merge": args.merge}
+            t_res, res = best_time(run_pipeline, y, args.sr, {**params, "speed_mode": RESAMPLE},
+                                   repeat=args.repeat)
+            t_an, an = best_time(run_pipeline, y, args.sr, {**params, "speed_mode": ANALYTIC},
+                                 repeat=args.repeat)
+            if len(res["segments"]) != len(an["segments"]):
+                ok = False
+                print(f"[!!] {seed:4d} {speed:7.2f} {window:5d} число интервалов: "
+                      f"{len(res['segments'])} против {len(an['segments'])}")
+                continue
+            shift = np.abs(np.array(res["segments"]) - np.array(an["segments"])).max(initial=0.0)
+            status = "OK" if shift <= tolerance else "!!"
+            ok &= shift <= tolerance
+            print(f"[{status}] {seed:4d} {speed:5.2f} {window:5d} {t_res:10.3f}с {t_an:8.3f}с "
+                  f"{len(an['segments']):11d} {shift * 1e3:10.3f}мс {args.tolerance_ms:6.2f}мс")
+
+    if not ok:
+        raise SystemExit("[!!] Интервалы аналитического режима расходятся с ресемплингом")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,136 @@
+"""
+Время отдельных этапов обработки на синтетических записях эксперимента "5:6" (protocol_audio)
+нескольких длительностей. Результаты сохраняются в JSON как эталон и сравниваются с ним:
+этап, ставший медленнее эталона больше чем на --tolerance, считается регрессией (код выхода 1).
+Запуск из корня проекта:
+    python -m benchmarks.bench_stages --minutes 1 10 60 120 --save     # записать эталон
+    python -m benchmarks.bench_stages --minutes 1 10 60 120 --compare  # сравнить с эталоном
+"""
+import argparse
+import datetime
+import json
+import os
+import platform
+import sys
+
+import numpy as np
+
+from benchmarks.common import protocol_audio, best_time
+import ui_latent_experiment
+import ui_latent_free
+from ui_noise import apply_noise_filter
+from ui_normalize import apply_normalization
+from ui_pipeline import MARKERS, resample
+from ui_slice_filter import apply_marker_zeroing_filter
+from ui_speed import target_rate
+from ui_trim import apply_trim_silence
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baselines", "stages.json")
+MIN_DELTA = 0.005  # сек: более короткие замедления — шум измерения, а не регрессия
+
+STAGES = ("noise", "normalize", "trim", "markers", "resample", "smooth", "threshold",
+          "segments_free", "segments_5_6")
+
+
+def run_stages(y, sr, bursts, repeat, speed, window):
+    """
+    Время каждого этапа (лучшее из repeat) на сигнале y.
+    Квантиль и порог слияния подбираются по разметке всплесков: порог — на середине их доли
+    в записи, слияние — половина кратчайшего промежутка; в режиме "5:6" должно найтись 30 интервалов.
+    """
+    duration = len(y) / sr
+    quantile = 1 - sum(end - start for start, end in bursts) / duration / 2
+    merge = min(b[0] - a[1] for a, b in zip(bursts, bursts[1:])) / 2
+    times = {}
+    times["noise"], _ = best_time(apply_noise_filter, y, sr, repeat=repeat)
+    times["normalize"], _ = best_time(apply_normalization, y, repeat=repeat)
+    times["trim"], _ = best_time(apply_trim_silence, y, sr, repeat=repeat)
+    times["markers"], _ = best_time(apply_marker_zeroing_filter, y, sr, MARKERS, 0.5, repeat=repeat)
+    times["resample"], _ = best_time(resample, y, sr, target_rate(sr, speed), repeat=repeat)
+    energy = np.abs(y)
+    times["smooth"], smoothed = best_time(ui_latent_free.smooth_signal, energy, window, repeat=repeat)
+    del energy
+    times["threshold"], threshold = best_time(ui_latent_free.compute_threshold, smoothed, quantile, repeat=repeat)
+    times["segments_free"], _ = best_time(ui_latent_free.find_nonzero_segments, smoothed, sr, threshold, merge,
+                                          repeat=repeat)
+    # ValueError, если генератор или поиск интервалов разошлись с протоколом "5:6"
+    times["segments_5_6"], _ = best_time(ui_latent_experiment.find_nonzero_segments, smoothed, sr, threshold,
+                                         merge, repeat=repeat)
+    return times
+
+
+def compare(results, baseline, tolerance):
+    """
+    Печатает отношение времени к эталону по каждой паре (длительность, этап).
+    :return: список регрессий [(минуты, этап, было, стало), ...]
+    """
+    regressions = []
+    print(f"\n{'мин':>5} {'этап':<14} {'эталон':>9} {'сейчас':>9} {'отношение':>10}")
+    for minutes, times in results.items():
+        base = baseline["results"].get(minutes)
+        if base is None:
+            print(f"{minutes:>5} — нет в эталоне")
+            continue
+        for stage, now in times.items():
+            if stage not in base:
+                continue
+            ratio = now / base[stage] if base[stage] else float("inf")
+            slower = ratio > 1 + tolerance and now - base[stage] > MIN_DELTA
+            if slower:
+                regressions.append((minutes, stage, base[stage], now))
+            print(f"{minutes:>5} {stage:<14} {base[stage]:8.3f}с {now:8.3f}с {ratio:9.2f}x"
+                  + ("  [!!]" if slower else ""))
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк этапов обработки с эталоном")
+    parser.add_argument("--minutes", type=float, nargs="+", default=[1, 10, 60, 120])
+    parser.add_argument("--sr", type=int, default=22050)
+    parser.add_argument("--noise", type=float, default=0.01, help="уровень шума генератора")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--speed", type=float, default=1.3, help="скорость для этапа ресемплинга")
+    parser.add_argument("--window", type=int, default=5)
+    parser.add_argument("--baseline", default=BASELINE, help="файл эталона (JSON)")
+    parser.add_argument("--save", action="store_true", help="записать результаты как эталон")
+    parser.add_argument("--compare", action="store_true", help="сравнить с эталоном")
+    parser.add_argument("--tolerance", type=float, default=0.25, help="допустимое замедление (доля)")
+    args = parser.parse_args()
+
+    meta = {"sr": args.sr, "noise": args.noise, "seed": args.seed, "repeat": args.repeat,
+            "speed": args.speed, "window": args.window}
+    results = {}
+    for minutes in args.minutes:
+        y, bursts = protocol_audio(minutes * 60, args.sr, noise=args.noise, seed=args.seed)
+        times = run_stages(y, args.sr, bursts, args.repeat, args.speed, args.window)
+        del y
+        key = f"{minutes:g}"
+        results[key] = times
+        print(f"{key} мин: " + ", ".join(f"{stage} {times[stage] * 1000:.1f} мс" for stage in STAGES))
+
+    if args.compare:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = json.load(f)
+        different = {k: (baseline["meta"].get(k), v) for k, v in meta.items() if baseline["meta"].get(k) != v}
+        if different:
+            print(f"[!] Параметры отличаются от эталона (эталон, сейчас): {different}")
+        regressions = compare(results, baseline, args.tolerance)
+
+    if args.save:
+        os.makedirs(os.path.dirname(os.path.abspath(args.baseline)), exist_ok=True)
+        environment = {"created": datetime.datetime.now().isoformat(timespec="seconds"),
+                       "python": sys.version.split()[0], "numpy": np.__version__,
+                       "platform": platform.platform(), "cpus": os.cpu_count()}
+        with open(args.baseline, "w", encoding="utf-8") as f:
+            json.dump({"meta": {**meta, **environment}, "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"\nЭталон записан: {args.baseline}")
+
+    if args.compare:
+        if regressions:
+            raise SystemExit(f"[!!] Замедлилось этапов: {len(regressions)} (допуск {args.tolerance:.0%})")
+        print(f"\n[OK] Регрессий нет (допуск {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,76 @@
+"""
+Время запуска GUI: импорт main.py в отдельном процессе с -X importtime.
+Проверяет, что тяжёлые библиотеки не загружаются при старте. Запуск из корня проекта:
+    python -m benchmarks.bench_startup --repeat 5 --max-ms 1500
+"""
+import argparse
+import os
+import subprocess
+import sys
+import time
+
+# Нужны только по кнопкам (анализ, отчёт, прослушивание) или после появления окна (график)
+HEAVY = ("torch", "torchaudio", "transformers", "pandas", "openpyxl", "matplotlib", "scipy",
+         "simpleaudio", "numba")
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def import_profile():
+    """
+    Один запуск python -X importtime -c "import main".
+    :return: (время процесса в секундах, {модуль: (вложенность, накопленное время в мкс)})
+    """
+    t0 = time.perf_counter()
+    proc = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"],
+                          cwd=ROOT, capture_output=True, text=True)
+    elapsed = time.perf_counter() - t0
+    if proc.returncode != 0:
+        raise SystemExit(f"[!!] import main завершился с ошибкой:\n{proc.stderr[-2000:]}")
+
+    modules = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        self_us, cumulative, name = line[len("import time:"):].split("|")
+        if not self_us.strip().isdigit():
+            continue  # строка заголовка
+        depth = len(name) - len(name.lstrip()) - 1
+        modules[name.strip()] = (depth, int(cumulative))
+    return elapsed, modules
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк запуска приложения")
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--max-ms", type=float, default=1500, help="допустимое время import main")
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+
+    runs = [import_profile() for _ in range(args.repeat)]
+    wall = min(elapsed for elapsed, _ in runs)
+    _, modules = min(runs, key=lambda run: run[1]["main"][1])
+    main_ms = modules["main"][1] / 1000
+
+    print(f"import main: {main_ms:.0f} мс (процесс целиком: {wall * 1000:.0f} мс, лучший из {args.repeat})")
+    print("Самые долгие модули (накопленное время):")
+    # Модули, импортированные непосредственно из main.py
+    direct = {name: times for name, times in modules.items() if times[0] == 2}
+    for name, (_, cumulative) in sorted(direct.items(), key=lambda item: -item[1][1])[:args.top]:
+        print(f"  {name:<32} {cumulative / 1000:8.1f} мс")
+
+    ok = True
+    loaded = sorted({name.split(".")[0] for name in modules} & set(HEAVY))
+    if loaded:
+        print(f"[!!] При запуске загружаются тяжёлые библиотеки: {', '.join(loaded)}")
+        ok = False
+    if main_ms > args.max_ms:
+        print(f"[!!] Импорт дольше допустимого: {main_ms:.0f} > {args.max_ms:.0f} мс")
+        ok = False
+    if not ok:
+        raise SystemExit(1)
+    print("[OK] Тяжёлые библиотеки не загружаются при запуске")
+
+
+if __name__ == "__main__":
+    main()
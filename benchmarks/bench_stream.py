@@ -0,0 +1,60 @@
+"""
+Пиковая память и время: поиск интервалов в памяти против потокового режима.
+Запуск из корня проекта:
+    python -m benchmarks.bench_stream --seconds 1800 --sr 44100 --block-size 1048576
+"""
+import argparse
+import os
+import tempfile
+import time
+import tracemalloc
+
+import librosa
+import soundfile as sf
+
+from benchmarks.common import synthetic_audio
+from ui_pipeline import DEFAULT_PARAMS, run_pipeline
+from ui_stream import run_stream_pipeline
+
+
+def measure(func, *args):
+    tracemalloc.start()
+    t0 = time.perf_counter()
+    result = func(*args)
+    elapsed = time.perf_counter() - t0
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return elapsed, peak, result
+
+
+def in_memory(path, params):
+    y, sr = librosa.load(path, sr=None)
+    return run_pipeline(y, sr, params)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк потокового поиска интервалов")
+    parser.add_argument("--seconds", type=float, default=1800)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--block-size", type=int, default=1 << 20)
+    args = parser.parse_args()
+
+    params = {**DEFAULT_PARAMS, "energy": True}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "synthetic.wav")
+        sf.write(path, synthetic_audio(args.seconds, args.sr), args.sr, subtype="PCM_16")
+        print(f"Файл: {args.seconds:.0f} с @ {args.sr} Гц, {os.path.getsize(path) / 2**20:.0f} МБ")
+
+        t_stream, peak_stream, streamed = measure(run_stream_pipeline, path, params, args.block_size)
+        print(f"Потоковый режим: {t_stream:.2f} с, пик памяти {peak_stream / 2**20:.1f} МБ")
+
+        t_mem, peak_mem, loaded = measure(in_memory, path, params)
+        print(f"В памяти:        {t_mem:.2f} с, пик памяти {peak_mem / 2**20:.1f} МБ")
+
+    if streamed["segments"] != loaded["segments"]:
+        raise SystemExit("[!!] Интервалы различаются!")
+    print(f"[OK] Интервалы совпадают ({len(streamed['segments'])} шт.)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+"""
+Сравнение режимов оценки порога с исходной сортировкой.
+Запуск из корня проекта:
+    python -m benchmarks.bench_threshold --seconds 1800 --sr 44100 --rel-error 0.01
+"""
+import argparse
+
+import numpy as np
+
+from benchmarks.common import synthetic_audio, best_time
+from ui_latent_free import smooth_signal
+from ui_threshold import EXACT, APPROX, STREAM, compute_threshold, quantile
+
+
+def legacy_compute_threshold(signal, quantile=0.96):
+    # Исходная реализация через полную сортировку — эталон
+    nonzero = signal[signal > 0]
+    if len(nonzero) == 0:
+        return 0
+    sorted_signal = np.sort(nonzero)
+    index = int(len(sorted_signal) * quantile)
+    index = min(index, len(sorted_signal) - 1)
+    return sorted_signal[index]
+
+
+def report(name, elapsed, value, reference, bound):
+    error = abs(value - reference) / reference if reference else 0.0
+    status = "OK" if error <= bound else "!!"
+    print(f"[{status}] {name:<28} {elapsed:8.3f} с   значение {value:.6g}   отн. погрешность {error:.2e}")
+    return error <= bound
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Бенчмарк режимов оценки порога")
+    parser.add_argument("--seconds", type=float, default=1800)
+    parser.add_argument("--sr", type=int, default=44100)
+    parser.add_argument("--quantile", type=float, default=0.92)
+    parser.add_argument("--rel-error", type=float, default=0.01)
+    parser.add_argument("--repeat", type=int, default=3)
+    args = parser.parse_args()
+
+    y = synthetic_audio(args.seconds, args.sr)
+    smoothed = smooth_signal(np.abs(y), 5)
+    print(f"Сигнал: {args.seconds:.0f} с @ {args.sr} Гц, {len(smoothed):,} отсчётов")
+
+    ok = True
+    print("compute_threshold:")
+    t_ref, ref = best_time(legacy_compute_threshold, smoothed, args.quantile, repeat=args.repeat)
+    ok &= report("np.sort (исходный)", t_ref, ref, ref, 0.0)
+    for mode, bound in ((EXACT, 0.0), (APPROX, args.rel_error), (STREAM, args.rel_error)):
+        elapsed, value = best_time(compute_threshold, smoothed, args.quantile, mode, args.rel_error,
+                                   repeat=args.repeat)
+        ok &= report(mode, elapsed, value, ref, bound)
+
+    print("apply_noise_filter, квантиль фона 0.1 по |y|:")
+    abs_y = np.abs(y)
+    t_ref, ref = best_time(np.quantile, abs_y, 0.1, repeat=args.repeat)
+    ok &= report("np.quantile (исходный)", t_ref, ref, ref, 0.0)
+    for mode, bound in ((EXACT, 0.0), (APPROX, args.rel_error), (STREAM, args.rel_error)):
+        elapsed, value = best_time(quantile, abs_y, 0.1, mode, args.rel_error, repeat=args.repeat)
+        ok &= report(mode, elapsed, value, ref, bound)
+
+    if not ok:
+        raise SystemExit("[!!] Погрешность превышает допустимую")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,64 @@
+import time
+import numpy as np
+
+
+def synthetic_audio(seconds, sr=44100, bursts_per_minute=20, seed=0):
+    """
+    Синтетическая запись: слабый шум и короткие тональные всплески-ответы.
+    :return: float32 сигнал длиной seconds * sr
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    y = rng.standard_normal(n, dtype=np.float32)
+    y *= 0.01
+
+    n_bursts = max(1, int(seconds / 60 * bursts_per_minute))
+    burst_len = int(0.4 * sr)
+    tone = 0.5 * np.sin(2 * np.pi * 220 * np.arange(burst_len, dtype=np.float32) / sr)
+    for pos in rng.integers(0, max(1, n - burst_len), n_bursts):
+        y[pos:pos + burst_len] += tone[:n - pos]
+    return y
+
+
+def protocol_audio(seconds, sr=22050, noise=0.01, series=5, per_series=6, burst=0.4, amplitude=0.5, seed=0):
+    """
+    Синтетическая запись эксперимента "5:6": series серий по per_series тональных всплесков-ответов
+    на фоне белого шума с уровнем noise. Серия занимает 5/8 своей доли записи (series-я часть длительности),
+    всплески в ней идут с шагом в 1/8 доли, поэтому промежуток между сериями втрое длиннее шага.
+    Результат полностью определяется аргументами.
+    :param burst: длительность всплеска, сек (не больше шага всплесков)
+    :return: (float32 сигнал длиной seconds * sr, [(начало, конец) всплесков в секундах])
+    """
+    rng = np.random.default_rng(seed)
+    n = int(seconds * sr)
+    y = rng.standard_normal(n, dtype=np.float32)
+    y *= noise
+
+    slot = seconds / series
+    step = slot / 8
+    burst = min(burst, step)
+    burst_len = int(burst * sr)
+    t = np.arange(burst_len, dtype=np.float32) / sr
+    tone = amplitude * np.sin(2 * np.pi * 220 * t) * np.minimum(1, np.minimum(t, burst - t) / 0.01)  # фронты 10 мс
+
+    bursts = []
+    for s in range(series):
+        for k in range(per_series):
+            start = s * slot + (1.5 + k) * step - burst / 2
+            pos = int(start * sr)
+            y[pos:pos + burst_len] += tone[:n - pos]
+            bursts.append((pos / sr, (pos + burst_len) / sr))
+    return y, bursts
+
+
+def best_time(func, *args, repeat=3, **kwargs):
+    """
+    Лучшее время из repeat запусков и результат последнего запуска.
+    """
+    best = float("inf")
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = func(*args, **kwargs)
+        best = min(best, time.perf_counter() - t0)
+    return best, result
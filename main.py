@@ -1,25 +1,34 @@
 # --- 📦 Импорт стандартных и сторонних библиотек ---
+# Тяжёлые библиотеки (matplotlib, pandas, torch/transformers, simpleaudio, soundfile)
+# импортируются при первом использовании, чтобы окно появлялось сразу
 import tkinter as tk
-from tkinter import filedialog, messagebox
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from tkinter import filedialog, messagebox, ttk
 import numpy as np
-import librosa
-import librosa.display
-import simpleaudio as sa
-import soundfile as sf
 import os
-import pandas as pd
+import time
 
 # --- 🔧 Импорт пользовательских фильтров ---
-from ui_noise import apply_noise_filter
-from ui_normalize import apply_normalization
-from ui_trim import apply_trim_silence
-from ui_phoneme_analysis import PhonemeAnalyzer
-from ui_slice_filter import apply_marker_zeroing_filter
-from ui_latent_free import smooth_signal, compute_threshold
-import ui_latent_free
-import ui_latent_experiment
+from ui_phoneme_analysis import (PhonemeAnalyzer, ensure_transcriber, DEFAULT_BACKEND,
+                                 ASR_CHECKPOINTS, ASR_PRECISIONS, ASR_STAGE_TITLES)
+from ui_models import models
+from ui_audio_io import open_audio, decode_cache, write_audio_file
+from ui_pipeline import Pipeline, STAGE_TITLES, resample
+from ui_speed import RESAMPLE, SPEED_MODES
+from ui_envelope import SAMPLES, DEFAULT_HOP, ENVELOPES
+from ui_threshold import EXACT, DEFAULT_REL_ERROR, THRESHOLD_MODES
+from ui_waveform import WaveformPyramid
+from ui_worker import BackgroundJob, Cancelled
+from ui_profile import StageProfiler, stage_of
+from ui_calibrate import build_index, calibrate, closest_count, show_calibration
+from ui_export import (EXCEL, EXTENSIONS, REPORT_FORMATS, APPEND_FORMATS, append_report, check_format,
+                       report_paths, write_report)
+
+# --- 🧠 Модель распознавания речи ---
+ASR_WARM_UP = False         # загружать модель в фоне сразу при запуске (иначе — при первом анализе)
+ASR_IDLE_TIMEOUT = 15 * 60  # выгружать модель после простоя, сек (None — держать до выхода)
+ASR_BATCH_SIZE = 8          # фрагментов в пачке при распознавании по интервалам
+ASR_FULL = "весь сигнал"
+ASR_SEGMENTS = "по интервалам"
 
 
 # --- 🧠 Класс приложения с GUI ---
@@ -32,9 +41,24 @@ class AudioApp:
         self.audio_data = None
         self.original_audio_data = None
         self.sr = None
+        self.original_sr = None
+        self.output_sr = None       # частота для сохранения (с учётом скорости)
+        self.output_audio = None    # сигнал, передискретизированный в output_sr (по запросу)
         self.filepath = ""
         self.current_segments = None
         self.phoneme_table = None
+        self.process_profile = None  # строки профиля последней обработки и распознавания (лист отчёта)
+        self.asr_profile = None
+
+        # --- ⛓ Этапы обработки с запоминанием результатов ---
+        self.pipeline = Pipeline()
+        self.preview_job = None
+        self.calibration = None  # (ключ, индекс порогов и промежутков) для подбора параметров «5:6»
+        self.job = None  # текущая фоновая задача (обработка, анализ, выгрузка)
+
+        # --- 〰 Пирамиды огибающих для графика ---
+        self.original_pyramid = None
+        self.processed_pyramid = None
 
         # --- 📌 Боковая панель слева ---
         self.left_panel = tk.Frame(root, bg="black", width=200)
@@ -64,27 +88,87 @@ class AudioApp:
         tk.Label(self.left_panel, text="Скорость", bg="black", fg="white").pack(anchor="w")
         tk.Scale(self.left_panel, from_=0.5, to=2.0, resolution=0.1, orient="horizontal",
                  variable=self.speed_factor, bg="black", fg="white").pack(fill="x")
+        self.speed_mode = tk.StringVar(value=RESAMPLE)
+        tk.OptionMenu(self.left_panel, self.speed_mode, *SPEED_MODES).pack(fill="x")
 
         self.quantile = tk.DoubleVar(value=0.92)
         tk.Label(self.left_panel, text="Квантиль", bg="black", fg="white").pack(anchor="w")
         tk.Scale(self.left_panel, from_=0.5, to=0.99, resolution=0.01, orient="horizontal",
-                 variable=self.quantile, bg="black", fg="white").pack(fill="x")
+                 variable=self.quantile, bg="black", fg="white",
+                 command=self.schedule_preview).pack(fill="x")
 
         self.merge_threshold = tk.DoubleVar(value=1.0)
         tk.Label(self.left_panel, text="Слияние (сек)", bg="black", fg="white").pack(anchor="w")
         tk.Scale(self.left_panel, from_=0.1, to=3.0, resolution=0.1, orient="horizontal",
-                 variable=self.merge_threshold, bg="black", fg="white").pack(fill="x")
+                 variable=self.merge_threshold, bg="black", fg="white",
+                 command=self.schedule_preview).pack(fill="x")
 
         self.smooth_window = tk.IntVar(value=5)
         tk.Label(self.left_panel, text="Сглаживание", bg="black", fg="white").pack(anchor="w")
         tk.Scale(self.left_panel, from_=1, to=21, resolution=2, orient="horizontal",
-                 variable=self.smooth_window, bg="black", fg="white").pack(fill="x")
+                 variable=self.smooth_window, bg="black", fg="white",
+                 command=self.schedule_preview).pack(fill="x")
+
+        # --- Огибающая: по отсчётам или по кадрам (тогда сглаживание — в кадрах) ---
+        tk.Label(self.left_panel, text="Огибающая", bg="black", fg="white").pack(anchor="w")
+        self.envelope = tk.StringVar(value=SAMPLES)
+        tk.OptionMenu(self.left_panel, self.envelope, *ENVELOPES).pack(fill="x")
+        self.hop = tk.IntVar(value=DEFAULT_HOP)
+        tk.Label(self.left_panel, text="Шаг кадров (отсчётов)", bg="black", fg="white").pack(anchor="w")
+        tk.Scale(self.left_panel, from_=64, to=1024, resolution=64, orient="horizontal",
+                 variable=self.hop, bg="black", fg="white").pack(fill="x")
 
         # --- Выбор режима эксперимента ---
         tk.Label(self.left_panel, text="Тип эксперимента", bg="black", fg="white").pack(anchor="w", pady=(10, 0))
         self.experiment_type = tk.StringVar(value="свободный")
         tk.OptionMenu(self.left_panel, self.experiment_type, "свободный", "5:6").pack(fill="x")
 
+        # --- Режим оценки порога ---
+        tk.Label(self.left_panel, text="Порог", bg="black", fg="white").pack(anchor="w", pady=(10, 0))
+        self.threshold_mode = tk.StringVar(value=EXACT)
+        tk.OptionMenu(self.left_panel, self.threshold_mode, *THRESHOLD_MODES).pack(fill="x")
+
+        # --- Что распознавать: весь сигнал или только энергетические интервалы ---
+        tk.Label(self.left_panel, text="Распознавание", bg="black", fg="white").pack(anchor="w", pady=(10, 0))
+        self.asr_scope = tk.StringVar(value=ASR_FULL)
+        tk.OptionMenu(self.left_panel, self.asr_scope, ASR_FULL, ASR_SEGMENTS).pack(fill="x")
+
+        self.asr_padding = tk.DoubleVar(value=0.3)
+        tk.Label(self.left_panel, text="Отступ вокруг интервала (сек)", bg="black", fg="white").pack(anchor="w")
+        tk.Scale(self.left_panel, from_=0.0, to=1.0, resolution=0.05, orient="horizontal",
+                 variable=self.asr_padding, bg="black", fg="white").pack(fill="x")
+
+        # --- Модель распознавания и вычисления на CPU ---
+        tk.Label(self.left_panel, text="Модель и точность", bg="black", fg="white").pack(anchor="w")
+        self.asr_model = tk.StringVar(value=DEFAULT_BACKEND["model"])
+        tk.OptionMenu(self.left_panel, self.asr_model, *ASR_CHECKPOINTS).pack(fill="x")
+        self.asr_precision = tk.StringVar(value=DEFAULT_BACKEND["precision"])
+        tk.OptionMenu(self.left_panel, self.asr_precision, *ASR_PRECISIONS).pack(fill="x")
+        self.asr_threads = tk.IntVar(value=os.cpu_count() or 1)
+        tk.Label(self.left_panel, text="Потоки распознавания", bg="black", fg="white").pack(anchor="w")
+        tk.Scale(self.left_panel, from_=1, to=os.cpu_count() or 1, resolution=1, orient="horizontal",
+                 variable=self.asr_threads, bg="black", fg="white").pack(fill="x")
+        self.asr_warm_up = tk.BooleanVar(value=ASR_WARM_UP)
+        tk.Checkbutton(self.left_panel, text="Загрузить модель заранее", variable=self.asr_warm_up,
+                       command=self.warm_up_asr, bg="black", fg="white", selectcolor="gray20").pack(anchor="w")
+
+        # --- Профиль этапов (время, CPU, память) для листа "Производительность" ---
+        self.profile_enabled = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.left_panel, text="Профилировать этапы", variable=self.profile_enabled,
+                       bg="black", fg="white", selectcolor="gray20").pack(anchor="w", pady=(10, 0))
+
+        # --- Формат отчёта; CSV и Parquet можно дописывать в общий набор данных ---
+        tk.Label(self.left_panel, text="Формат отчёта", bg="black", fg="white").pack(anchor="w")
+        self.report_format = tk.StringVar(value=EXCEL)
+        tk.OptionMenu(self.left_panel, self.report_format, *REPORT_FORMATS).pack(fill="x")
+        self.report_append = tk.BooleanVar(value=False)
+        tk.Checkbutton(self.left_panel, text="Дописывать в набор данных", variable=self.report_append,
+                       bg="black", fg="white", selectcolor="gray20").pack(anchor="w")
+
+        # --- Результат предпросмотра при перемещении ползунков ---
+        self.preview_label = tk.Label(self.left_panel, text="", bg="black", fg="white", justify="left")
+        self.preview_label.pack(anchor="w", pady=(10, 0))
+
         # --- 🧰 Кнопки управления ---
         self.controls_frame = tk.Frame(self.left_panel, bg="black")
         self.controls_frame.pack(side="bottom", pady=10)
@@ -94,8 +178,19 @@ class AudioApp:
         tk.Button(self.controls_frame, text="💾 Сохранить", command=self.save_audio).pack(fill="x", pady=2)
         tk.Button(self.controls_frame, text="ОБРАБОТАТЬ", command=self.process_audio,
                   font=("Arial", 12), bg="white").pack(fill="x", pady=10)
+        tk.Button(self.controls_frame, text="🎯 Подбор параметров 5:6", command=self.calibrate_parameters).pack(fill="x", pady=2)
         tk.Button(self.controls_frame, text="📊 Анализ речи", command=self.analyze_audio).pack(fill="x", pady=5)
         tk.Button(self.controls_frame, text="📤 Выгрузить отчёт", command=self.export_report).pack(fill="x", pady=5)
+        tk.Button(self.controls_frame, text="🧹 Очистить кэш mp3", command=self.clear_decode_cache).pack(fill="x", pady=2)
+
+        # --- ⏳ Ход фоновой задачи ---
+        self.progress_label = tk.Label(self.controls_frame, text="", bg="black", fg="white")
+        self.progress_label.pack(fill="x")
+        self.progress_bar = ttk.Progressbar(self.controls_frame, mode="determinate", maximum=100)
+        self.progress_bar.pack(fill="x", pady=2)
+        self.cancel_button = tk.Button(self.controls_frame, text="✖ Отмена", command=self.cancel_job,
+                                       state="disabled")
+        self.cancel_button.pack(fill="x", pady=2)
 
         # --- 📊 График ---
         self.graph_frame = tk.Frame(root, bg="orange")
@@ -113,175 +208,429 @@ class AudioApp:
         self.canvas_container.create_window((0, 0), window=self.canvas_frame, anchor="nw")
         self.canvas_frame.bind("<Configure>", lambda e: self.canvas_container.configure(scrollregion=self.canvas_container.bbox("all")))
 
-    def load_audio(self):
-        self.filepath = filedialog.askopenfilename(filetypes=[("Audio Files", "*.wav *.mp3")])
-        if self.filepath:
-            self.original_audio_data, self.sr = librosa.load(self.filepath, sr=None)
-            self.audio_data = self.original_audio_data.copy()
-            self.current_segments = None
-            self.draw_waveform()
+        # График (matplotlib) создаётся, когда окно уже показано
+        self.plot = None
+        self.root.after_idle(self.create_plot)
 
-    def draw_waveform(self, segments=None, threshold=None, series_lines=None):
-        for widget in self.canvas_frame.winfo_children():
-            widget.destroy()
+        models.idle_timeout = ASR_IDLE_TIMEOUT
+        if ASR_WARM_UP:
+            self.root.after_idle(self.warm_up_asr)
 
-        fig, ax = plt.subplots(figsize=(10, 3), dpi=100)
-
-        if self.original_audio_data is not None:
-            librosa.display.waveshow(self.original_audio_data, sr=self.sr, ax=ax,
-                                     alpha=0.5, color='gray', label='Оригинал')
-        if self.audio_data is not None:
-            librosa.display.waveshow(self.audio_data, sr=self.sr, ax=ax,
-                                     alpha=0.9, color='blue', label='Обработанный')
+    def warm_up_asr(self):
+        """
+        Загрузка выбранной модели распознавания в фоне, чтобы первый анализ её не ждал.
+        Отдельная задача: обработка и выгрузка во время загрузки остаются доступны.
+        """
+        if not self.asr_warm_up.get():
+            return
+        BackgroundJob(self.root, lambda job, backend: ensure_transcriber(backend), self.get_backend(),
+                      on_error=lambda e: messagebox.showwarning("Модель не загружена",
+                                                                f"Модель распознавания не загружена заранее: {e}\n"
+                                                                f"Она будет загружена при первом анализе.")).start()
 
-        segments_to_draw = segments if segments is not None else self.current_segments
-        if segments_to_draw:
-            for start, end in segments_to_draw:
-                ax.axvline(x=start, color='green', linestyle='--')
-                ax.axvline(x=end, color='red', linestyle='--')
-                ax.axvspan(start, end, color='green', alpha=0.2)
+    def create_plot(self):
+        if self.plot is not None:
+            return
+        from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+        from ui_plot import WaveformPlot
 
-        if threshold:
-            ax.axhline(y=threshold, color='purple', linestyle='--', label='Порог')
+        self.plot = WaveformPlot(lambda fig: FigureCanvasTkAgg(fig, master=self.canvas_frame))
+        self.plot.canvas.get_tk_widget().pack()
 
-        if series_lines:
-            for x in series_lines:
-                ax.axvline(x=x, color='purple', linestyle='-.', linewidth=2)
+    def load_audio(self):
+        if self.is_busy():
+            return
+        self.filepath = filedialog.askopenfilename(filetypes=[("Audio Files", "*.wav *.mp3")])
+        if self.filepath:
+            # PCM WAV (и mp3, уже декодированный в кэш) отображается в память:
+            # читается только заголовок, отсчёты — по мере надобности
+            try:
+                self.original_audio_data, self.sr = open_audio(self.filepath)
+            except EnvironmentError as e:
+                messagebox.showerror("Ошибка загрузки", str(e))
+                return
+            lazy = None if isinstance(self.original_audio_data, np.ndarray) else self.original_audio_data
+            self.original_sr = self.sr
+            self.output_sr = self.sr
+            self.output_audio = None
+            self.audio_data = self.original_audio_data  # не изменяется: цепочка и фильтры работают с копиями
+            if lazy is not None:
+                # Сразу — приблизительный обзор по пробам, полная пирамида строится в фоне
+                self.original_pyramid = WaveformPyramid.overview(lazy, self.sr)
+            else:
+                self.original_pyramid = WaveformPyramid(self.original_audio_data, self.sr)
+            self.processed_pyramid = self.original_pyramid
+            self.current_segments = None
+            self.process_profile = self.asr_profile = None
+            self.calibration = None
+            self.pipeline.clear()
+            self.preview_label.config(text="")
+            self.draw_waveform(reset_view=True)
+            if lazy is not None:
+                self.start_job(lambda job, y, sr: WaveformPyramid(y, sr, progress=job.progress),
+                               lazy, self.sr, on_done=self._pyramid_done)
+
+    def _pyramid_done(self, pyramid):
+        if pyramid.y is not self.original_audio_data:
+            return
+        if self.processed_pyramid is self.original_pyramid:
+            self.processed_pyramid = pyramid
+        self.original_pyramid = pyramid
+        self.draw_waveform()
 
-        ax.set_title("Сравнение аудиосигналов")
-        ax.legend(loc="upper right")
+    def draw_waveform(self, segments=None, threshold=None, series_lines=None, reset_view=False):
+        # Фигура и холст живут всё время работы приложения — меняются только данные
+        self.create_plot()
+        self.plot.set_waveforms(self.original_pyramid, self.processed_pyramid, reset_view=reset_view)
+        segments_to_draw = segments if segments is not None else self.current_segments
+        self.plot.set_overlays(segments_to_draw, threshold, series_lines)
+
+    def get_params(self):
+        return {
+            "noise": self.flag1.get(),
+            "normalize": self.flag2.get(),
+            "trim": self.flag3.get(),
+            "markers": self.flag4.get(),
+            "energy": self.flag5.get(),
+            "speed": self.speed_factor.get(),
+            "speed_mode": self.speed_mode.get(),
+            "quantile": self.quantile.get(),
+            "merge": self.merge_threshold.get(),
+            "window": self.smooth_window.get(),
+            "envelope": self.envelope.get(),
+            "hop": self.hop.get(),
+            "experiment": self.experiment_type.get(),
+            "threshold_mode": self.threshold_mode.get(),
+            "threshold_error": DEFAULT_REL_ERROR,
+        }
 
-        canvas = FigureCanvasTkAgg(fig, master=self.canvas_frame)
-        canvas.draw()
-        canvas.get_tk_widget().pack()
+    def get_backend(self):
+        return {
+            "model": self.asr_model.get(),
+            "precision": self.asr_precision.get(),
+            "threads": self.asr_threads.get(),
+        }
 
     def process_audio(self):
         if self.original_audio_data is None:
             messagebox.showwarning("Нет файла", "Сначала загрузите файл.")
             return
 
-        y = self.original_audio_data.copy()
-        self.current_segments = None
-        threshold = None
-        series_lines = []
-
-        if self.flag1.get():
-            y = apply_noise_filter(y)
-        if self.flag2.get():
-            y = apply_normalization(y)
-        if self.flag3.get():
-            y = apply_trim_silence(y, self.sr)
-        if self.flag4.get():
-            markers = [1.5, 3.0, 6.2, 7.5]
-            y = apply_marker_zeroing_filter(y, self.sr, markers, buffer=0.5)
-        if self.flag5.get():
-            speed = self.speed_factor.get()
-            quantile = self.quantile.get()
-            merge = self.merge_threshold.get()
-            window = self.smooth_window.get()
-
-            y = librosa.resample(y, orig_sr=self.sr, target_sr=int(self.sr * speed))
-            self.sr = int(self.sr * speed)
-
-            energy = np.abs(y)
-            smoothed = smooth_signal(energy, window)
-            threshold = compute_threshold(smoothed, quantile)
-
-            if self.experiment_type.get() == "свободный":
-                segments = ui_latent_free.find_nonzero_segments(smoothed, self.sr, threshold, merge)
-            else:
-                try:
-                    segments = ui_latent_experiment.find_nonzero_segments(smoothed, self.sr, threshold, merge)
-                except ValueError as e:
-                    messagebox.showerror("Ошибка", str(e))
-                    return
+        if self.is_busy():
+            return
 
-                series_lines = [segments[i * 6][0] for i in range(1, 5)]
+        # Профилирование без tracemalloc: выключенное не стоит ничего, включённое — почти ничего
+        profiler = StageProfiler(allocations=False) if self.profile_enabled.get() else None
+        self.start_job(self._process_job, self.original_audio_data, self.original_sr, self.get_params(), profiler,
+                       on_done=self._process_done, on_error=self._process_failed)
+
+    def _process_job(self, job, y, sr, params, profiler):
+        # Фоновый поток: цепочка обработки и пирамида огибающей для графика
+        with stage_of(profiler, "process", len(y)):
+            result = self.pipeline.run(y, sr, params, progress=job.progress, profiler=profiler)
+            # Без фильтров и ресемплинга сигнал — исходный, и его пирамида уже построена
+            result["pyramid"] = None
+            if result["audio"] is not y:
+                with stage_of(profiler, "waveform", len(result["audio"])):
+                    result["pyramid"] = WaveformPyramid(result["audio"], result["sr"], progress=job.progress)
+        result["profile"] = profiler.records(STAGE_TITLES) if profiler else None
+        return result
+
+    def _process_failed(self, error):
+        self.current_segments = None
+        messagebox.showerror("Ошибка", str(error))
+
+    def _process_done(self, result):
+        self.audio_data = result["audio"]
+        self.sr = result["sr"]
+        self.output_sr = result["output_sr"]
+        self.output_audio = None
+        self.processed_pyramid = result["pyramid"] or self.original_pyramid
+        self.process_profile = result["profile"]
+        self.preview_label.config(text="")
+        segments = result["segments"]
+        self.current_segments = None
 
+        if segments is not None:
             self.current_segments = segments
-            self.audio_data = y
-            self.draw_waveform(segments=segments, threshold=threshold, series_lines=series_lines)
+            self.draw_waveform(segments=segments, threshold=result["threshold"],
+                               series_lines=result["series_lines"])
 
             text = "\n".join([f"{start:.2f} – {end:.2f} сек" for start, end in segments])
             messagebox.showinfo(" Энергетические интервалы", f"Найдено: {len(segments)}\n\n{text}")
             messagebox.showinfo("Готово", "Обработка завершена!")
             return
 
-        self.audio_data = y
         self.draw_waveform()
         messagebox.showinfo("Готово", "Обработка завершена!")
 
+    def schedule_preview(self, _value=None):
+        # Пока ползунок двигается, пересчёт откладывается — выполняется только последний
+        if self.preview_job is not None:
+            self.root.after_cancel(self.preview_job)
+        self.preview_job = self.root.after(50, self.preview_segments)
+
+    def preview_segments(self):
+        """
+        Предпросмотр интервалов при изменении квантиля, слияния или сглаживания.
+        Работает после обработки с поиском интервалов, пока фильтры, скорость и огибающая не менялись:
+        пересчитываются только этапы после изменённого параметра, сигнал не меняется.
+        Пересчёт идёт фоновой задачей; если ползунки сдвинулись, пока он шёл, результат
+        отбрасывается и пересчёт повторяется с текущими значениями.
+        """
+        self.preview_job = None
+        if self.job is not None and self.job.running:
+            return
+        params = self.get_params()
+        if not params["energy"] or not self.pipeline.is_cached(self.original_audio_data, self.original_sr,
+                                                                params, "energy"):
+            return
+        self.start_job(self._preview_job, self.original_audio_data, self.original_sr, params,
+                       on_done=lambda result: self._preview_done(params, result),
+                       on_error=lambda e: self.preview_label.config(text=f"Ошибка пересчёта: {e}"))
+
+    def _preview_job(self, job, y, sr, params):
+        start = time.perf_counter()
+        result = self.pipeline.run(y, sr, params, progress=job.progress, check=False)
+        return result, (time.perf_counter() - start) * 1000
+
+    def _preview_done(self, params, value):
+        if params != self.get_params():
+            # Ползунки сдвинулись во время пересчёта — результат устарел
+            self.schedule_preview()
+            return
+        result, elapsed = value
+        segments = result["segments"]
+
+        if params["experiment"] != "свободный" and len(segments) != 30:
+            # Для "5:6" нужно ровно 30 интервалов — иначе показываем найденное, но не сохраняем
+            self.current_segments = None
+            status = f"Найдено: {len(segments)} из 30"
+        else:
+            self.current_segments = segments
+            status = f"Найдено: {len(segments)}"
+        self.preview_label.config(text=f"{status}\nПересчёт: {elapsed:.0f} мс")
+        self.plot.set_overlays(segments, result["threshold"], result["series_lines"])
+
+    def calibrate_parameters(self):
+        """
+        Подбор квантиля и слияния, дающих ровно 30 интервалов.
+        Индекс строится один раз по сглаженной огибающей последней обработки (в фоне),
+        поиск по сетке ползунков по нему — мгновенный; пока фильтры, скорость, огибающая
+        и сглаживание не менялись, повторный подбор не пересчитывает индекс.
+        """
+        # Кэш этапов цепочки читается только без фоновой задачи: обработка или предпросмотр его меняют
+        if self.is_busy():
+            return
+        params = self.get_params()
+        cached = None
+        if self.original_audio_data is not None and params["energy"]:
+            cached = self.pipeline.smoothed_envelope(self.original_audio_data, self.original_sr, params)
+        if cached is None:
+            messagebox.showwarning("Нет огибающей", "Сначала выполните обработку с поиском энергетических "
+                                                    "интервалов при текущих фильтрах, скорости и сглаживании.")
+            return
+        smoothed, rate, envelope, key = cached
+        key = (key, params["threshold_mode"], params["threshold_error"])
+        if self.calibration is not None and self.calibration[0] == key:
+            self._show_calibration(self.calibration[1])
+            return
+
+        block = self.pipeline.block_size(self.original_audio_data)
+        self.start_job(lambda job: build_index(smoothed, rate, envelope, mode=params["threshold_mode"],
+                                               rel_error=params["threshold_error"], block_size=block,
+                                               progress=job.progress),
+                       on_done=lambda index: self._calibration_done(key, index))
+
+    def _calibration_done(self, key, index):
+        self.calibration = (key, index)
+        self._show_calibration(index)
+
+    def _show_calibration(self, index):
+        candidates = calibrate(index)
+        if candidates:
+            show_calibration(self.root, candidates, self._apply_calibration)
+            return
+        closest = closest_count(index)
+        text = "Ни одна пара квантиля и слияния не даёт ровно 30 интервалов."
+        if closest is not None:
+            count, quantile, merge = closest
+            text += f"\nБлиже всего: {count} при квантиле {quantile:.2f} и слиянии {merge:.1f} сек."
+        messagebox.showinfo("Подбор параметров", text)
+
+    def _apply_calibration(self, quantile, merge):
+        self.quantile.set(quantile)
+        self.merge_threshold.set(merge)
+        self.preview_segments()
+
     def play_audio(self):
         if self.audio_data is not None:
-            audio = (self.audio_data * 32767).astype(np.int16)
+            audio = self.audio_data
+            if not isinstance(audio, np.ndarray):
+                # Файл, отображённый в память, целиком не читается: звучит видимый на графике участок
+                t0, t1 = self.plot.view_range()
+                audio = audio[int(t0 * self.sr):int(np.ceil(t1 * self.sr))]
+            audio = (audio * 32767).astype(np.int16)
+            import simpleaudio as sa
             sa.play_buffer(audio, 1, 2, self.sr)
 
     def save_audio(self):
         if self.audio_data is not None:
+            if self.is_busy():
+                return
             out_path = filedialog.asksaveasfilename(defaultextension=".wav", filetypes=[("WAV", "*.wav")])
-            if out_path:
-                sf.write(out_path, self.audio_data, self.sr)
-                messagebox.showinfo("Сохранено", f"Файл сохранён как {os.path.basename(out_path)}")
+            if not out_path:
+                return
+            if self.output_sr == self.sr or self.output_audio is not None:
+                self._write_audio(out_path)
+                return
+            # Аналитический режим скорости: передискретизация только сейчас, при сохранении
+            self.start_job(lambda job, y, sr, output_sr: resample(y, sr, output_sr, job.progress),
+                           self.audio_data, self.sr, self.output_sr,
+                           on_done=lambda audio: self._resampled(audio, out_path))
+
+    def _resampled(self, audio, out_path):
+        self.output_audio = audio
+        self._write_audio(out_path)
+
+    def _write_audio(self, out_path):
+        if self.output_sr == self.sr:
+            write_audio_file(out_path, self.audio_data, self.sr)
+        else:
+            write_audio_file(out_path, self.output_audio, self.output_sr)
+        messagebox.showinfo("Сохранено", f"Файл сохранён как {os.path.basename(out_path)}")
+
+    def clear_decode_cache(self):
+        freed = decode_cache().clear()
+        messagebox.showinfo("Кэш очищен", f"Удалено декодированных файлов: {freed / 2**20:.0f} МБ")
 
     def analyze_audio(self):
         if self.audio_data is not None:
-            analyzer = PhonemeAnalyzer(self.root, self.audio_data, self.sr)
-            analyzer.analyze()
-            self.phoneme_table = analyzer.get_phoneme_dataframe()
+            if self.is_busy():
+                return
+            segments = None
+            if self.asr_scope.get() == ASR_SEGMENTS:
+                if not self.current_segments:
+                    messagebox.showwarning("Нет интервалов",
+                                           "Сначала выполните обработку с поиском энергетических интервалов.")
+                    return
+                segments = self.current_segments
+            padding = self.asr_padding.get()
+
+            analyzer = PhonemeAnalyzer(self.root, self.audio_data, self.sr, backend=self.get_backend())
+            profiler = StageProfiler(allocations=False) if self.profile_enabled.get() else None
+            self.start_job(lambda job: analyzer.transcribe(progress=job.progress, segments=segments,
+                                                           padding=padding, batch_size=ASR_BATCH_SIZE,
+                                                           profiler=profiler),
+                           on_done=lambda _: self._analysis_done(analyzer, profiler))
         else:
             messagebox.showwarning("Нет аудио", "Сначала загрузите и обработайте аудиофайл.")
 
+    def _analysis_done(self, analyzer, profiler=None):
+        analyzer.display_compact_table()
+        self.phoneme_table = analyzer.get_phoneme_dataframe()
+        self.asr_profile = profiler.records(ASR_STAGE_TITLES) if profiler else None
+
     def export_report(self):
+        if self.is_busy():
+            return
         if not self.current_segments:
             messagebox.showerror("Ошибка", "Сначала выполните обработку аудио с поиском латентных интервалов.")
             return
 
-        save_path = filedialog.asksaveasfilename(defaultextension=".xlsx", filetypes=[("Excel", "*.xlsx")])
+        report_format = self.report_format.get()
+        append = self.report_append.get()
+        if append and report_format not in APPEND_FORMATS:
+            messagebox.showerror("Ошибка", f"Дописывать в набор данных можно только в форматах: "
+                                           f"{', '.join(APPEND_FORMATS)}.")
+            return
+        try:
+            check_format(report_format)
+        except ImportError as e:
+            messagebox.showerror("Ошибка", str(e))
+            return
+        if append:
+            save_path = filedialog.askdirectory(title="Папка набора данных")
+        else:
+            extension = EXTENSIONS[report_format]
+            save_path = filedialog.asksaveasfilename(defaultextension=extension,
+                                                     filetypes=[(report_format, f"*{extension}")])
         if not save_path:
             return
 
-        # --- 📑 1. Латентные интервалы ---
-        df_segments = pd.DataFrame([{
-            "Начало (сек)": start,
-            "Конец (сек)": end,
-            "Длительность (сек)": end - start
-        } for start, end in self.current_segments])
-
-        # --- 📊 2. Статистика латентных интервалов ---
-        stats = df_segments["Длительность (сек)"].describe().rename("Статистика")
-        df_stats = pd.DataFrame(stats)
-
-        # --- ⚙ 3. Общие метрики сигнала ---
-        signal_metrics = {
-            "Имя файла": [os.path.basename(self.filepath)],
-            "Частота дискретизации": [self.sr],
-            "Длительность (сек)": [len(self.audio_data) / self.sr],
-            "Средняя мощность": [np.mean(self.audio_data**2)],
-            "Скорость": [self.speed_factor.get()],
-            "Квантиль": [self.quantile.get()],
-            "Порог слияния": [self.merge_threshold.get()],
-            "Сглаживание": [self.smooth_window.get()],
-            "Тип эксперимента": [self.experiment_type.get()]
-        }
-        df_metrics = pd.DataFrame(signal_metrics)
+        from ui_report import build_report_frames, signal_stats
 
-        # --- 🧠 4. Фонемный анализ ---
-        if self.phoneme_table is not None and not self.phoneme_table.empty:
-            df_phonemes = self.phoneme_table.copy()
-        else:
-            df_phonemes = pd.DataFrame([{"Сообщение": "Фонемный анализ не проводился или не дал результатов."}])
+        frames = build_report_frames(self.filepath, self.sr, signal_stats(self.audio_data, self.sr),
+                                     self.current_segments, self.get_params(), self.phoneme_table,
+                                     (self.process_profile or []) + (self.asr_profile or []))
+
+        # --- 💾 Сохраняем отчёт (в фоне) ---
+        self.start_job(self._export_job, save_path, frames, report_format, append,
+                       on_done=lambda paths: messagebox.showinfo(
+                           "Отчёт сохранён", "Записано: " + ", ".join(os.path.basename(p) for p in paths)),
+                       on_error=lambda e: messagebox.showerror("Ошибка при сохранении", str(e)))
 
-        # --- 💾 Сохраняем всё в Excel ---
+    def _export_job(self, job, save_path, frames, report_format, append):
+        if append:
+            # Дописываются целые таблицы: отмена до записи не оставляет полфайла
+            job.progress("Запись отчёта", None)
+            return append_report(save_path, self.filepath, frames, report_format)
         try:
-            with pd.ExcelWriter(save_path) as writer:
-                df_metrics.to_excel(writer, sheet_name="Общие метрики", index=False)
-                df_segments.to_excel(writer, sheet_name="Латентные интервалы", index=False)
-                df_stats.to_excel(writer, sheet_name="Статистика по длительности")
-                df_phonemes.to_excel(writer, sheet_name="Фонемы", index=False)
-
-            messagebox.showinfo("Отчёт сохранён", f"Файл сохранён как: {os.path.basename(save_path)}")
-        except Exception as e:
-            messagebox.showerror("Ошибка при сохранении", str(e))
+            return write_report(save_path, frames, progress=job.progress, format=report_format)
+        except Cancelled:
+            # Недописанные файлы не оставляем
+            for path in report_paths(save_path, frames, report_format):
+                if os.path.exists(path):
+                    os.remove(path)
+            raise
+
+    # --- ⏳ Фоновые задачи ---
+    def is_busy(self):
+        if self.job is not None and self.job.running:
+            messagebox.showwarning("Задача выполняется", "Дождитесь завершения или нажмите «Отмена».")
+            return True
+        return False
+
+    def start_job(self, func, *args, on_done, on_error=None):
+        """
+        Запускает func(job, *args) в фоновом потоке. Окно остаётся отзывчивым:
+        масштаб, прослушивание и параметры доступны, ход выполнения виден под кнопками.
+        """
+        on_error = on_error or (lambda e: messagebox.showerror("Ошибка", str(e)))
+
+        def finish(callback):
+            def handler(*value):
+                self.finish_job()
+                callback(*value)
+            return handler
+
+        self.job = BackgroundJob(self.root, func, *args,
+                                 on_done=finish(on_done), on_error=finish(on_error),
+                                 on_cancel=finish(lambda: self.progress_label.config(text="Отменено")),
+                                 on_progress=self.show_progress)
+        self.cancel_button.config(state="normal")
+        self.job.start()
+
+    def show_progress(self, stage, fraction):
+        self.progress_label.config(text=STAGE_TITLES.get(stage, stage))
+        self.progress_bar.stop()
+        if fraction is None:
+            # Длительность этапа неизвестна — бегущий индикатор
+            self.progress_bar.config(mode="indeterminate")
+            self.progress_bar.start(10)
+        else:
+            self.progress_bar.config(mode="determinate", value=fraction * 100)
+
+    def cancel_job(self):
+        if self.job is not None and self.job.running:
+            self.job.cancel()
+            self.progress_label.config(text="Отмена…")
+
+    def finish_job(self):
+        self.progress_bar.stop()
+        self.progress_bar.config(mode="determinate", value=0)
+        self.progress_label.config(text="")
+        self.cancel_button.config(state="disabled")
 
 
 
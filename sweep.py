@@ -0,0 +1,191 @@
+"""
+Перебор сетки параметров поиска энергетических интервалов без GUI.
+Запись загружается один раз в разделяемую память, сетка квантиль × слияние × сглаживание × скорость
+раздаётся пулу процессов; результат — таблица «одна строка на точку сетки» (CSV) для кривых
+чувствительности.
+Пример:
+    python sweep.py recordings/ --quantile 0.80:0.99:0.01 --merge 0.5 1.0 2.0 --window 3 5 9 --out sweep.csv
+"""
+import argparse
+import itertools
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from batch import collect_files
+from ui_audio_io import DECODE_CACHE_BYTES, open_audio
+from ui_envelope import ENVELOPES
+from ui_pipeline import DEFAULT_MEMORY_BUDGET, DEFAULT_PARAMS, Pipeline
+from ui_speed import SPEED_MODES
+from ui_threshold import THRESHOLD_MODES
+
+# Оси сетки: всё, что выше по цепочке (скорость, затем сглаживание), меняется реже всего
+UPSTREAM_AXES = ("speed", "window")
+DOWNSTREAM_AXES = ("quantile", "merge")
+SWEEP_AXES = UPSTREAM_AXES + DOWNSTREAM_AXES
+
+_worker = {}  # состояние процесса пула: разделяемая память, сигнал и цепочка с кэшем этапов
+
+
+def grid_values(spec):
+    """
+    Значения оси из строк командной строки: числа или диапазоны "начало:конец:шаг" (конец включается).
+    """
+    values = []
+    for item in spec:
+        if ":" in item:
+            start, stop, step = (float(part) for part in item.split(":"))
+            count = int(round((stop - start) / step)) + 1
+            values.extend(round(start + i * step, 10) for i in range(count))
+        else:
+            values.append(float(item))
+    return values
+
+
+def _attach(name, length, sr, memory_budget):
+    # Инициализатор процесса пула: отсчёты не копируются, массив смотрит в разделяемую память
+    shm = shared_memory.SharedMemory(name=name)
+    _worker["shm"] = shm
+    _worker["y"] = np.ndarray((length,), dtype=np.float32, buffer=shm.buf)
+    _worker["sr"] = sr
+    _worker["pipeline"] = Pipeline(memory_budget)
+
+
+def _sweep_group(params, windows, points):
+    """
+    Точки сетки с общей скоростью: все сглаживания подряд в одном процессе. Цепочка процесса
+    запоминает этапы, поэтому ресемплинг и энергия считаются один раз на группу, сглаживание —
+    один раз на окно, порог — один раз на квантиль, а для каждой точки остаётся слияние.
+    time — время пересчёта для точки: у первой точки окна в него входят и общие этапы.
+    """
+    y, sr, pipeline = _worker["y"], _worker["sr"], _worker["pipeline"]
+    rows = []
+    for window, (quantile, merge) in itertools.product(windows, points):
+        point = {**params, "window": window, "quantile": quantile, "merge": merge}
+        start = time.perf_counter()
+        result = pipeline.run(y, sr, point, check=False)
+        elapsed = time.perf_counter() - start
+        segments = result["segments"]
+        rows.append({
+            **{axis: point[axis] for axis in SWEEP_AXES},
+            "segments": len(segments),
+            "threshold": float(result["threshold"]),
+            "mean_duration": sum(e - s for s, e in segments) / len(segments) if segments else None,
+            "time": elapsed,
+            "recomputed": " ".join(pipeline.recomputed),
+        })
+    return rows
+
+
+def sweep(y, sr, grid, params=None, jobs=None, memory_budget=DEFAULT_MEMORY_BUDGET, on_group=None):
+    """
+    Поиск интервалов во всех точках сетки на пуле процессов.
+    Фильтры (шум, нормализация, обрезка, маркеры) применяются один раз здесь, отфильтрованный
+    сигнал float32 кладётся в разделяемую память, и процессы пула работают с ним без копирования.
+    :param y: сигнал (np.ndarray или ui_audio_io.LazyAudio)
+    :param grid: словарь ось -> список значений (оси — SWEEP_AXES); отсутствующие оси берутся из params
+    :param params: остальные параметры цепочки (см. DEFAULT_PARAMS); режим "5:6" не прерывает перебор —
+                   число интервалов просто попадает в таблицу
+    :param on_group: on_group(скорость) по мере готовности групп точек (группа — все точки одной скорости,
+                     поэтому параллельно обрабатываются разные скорости)
+    :return: список строк: значения осей, segments, threshold, mean_duration, time, recomputed
+    """
+    params = {**DEFAULT_PARAMS, **(params or {}), "energy": True}
+    axes = {axis: list(grid.get(axis) or [params[axis]]) for axis in SWEEP_AXES}
+
+    filtered = Pipeline(memory_budget).run(y, sr, {**params, "energy": False}, check=False)["audio"]
+    shm = shared_memory.SharedMemory(create=True, size=max(len(filtered), 1) * np.dtype(np.float32).itemsize)
+    shared = None
+    try:
+        shared = np.ndarray((len(filtered),), dtype=np.float32, buffer=shm.buf)
+        if isinstance(filtered, np.ndarray):
+            shared[:] = filtered
+        else:
+            filtered.read(0, len(filtered), out=shared)  # файл, отображённый в память, — по блокам
+        del filtered
+        # Фильтры уже применены — процессам пула достаётся только поиск интервалов
+        params = {**params, "noise": False, "normalize": False, "trim": False, "markers": False}
+
+        points = list(itertools.product(axes["quantile"], axes["merge"]))
+        rows = []
+        workers = min(jobs or os.cpu_count(), len(axes["speed"]))
+        with ProcessPoolExecutor(max_workers=workers, initializer=_attach,
+                                 initargs=(shm.name, len(shared), sr, memory_budget)) as pool:
+            futures = {pool.submit(_sweep_group, {**params, "speed": speed}, axes["window"], points): speed
+                       for speed in axes["speed"]}
+            for future in as_completed(futures):
+                rows.extend(future.result())
+                if on_group:
+                    on_group(futures[future])
+    finally:
+        shared = None  # пока на буфер есть ссылки, close() не отпустит память
+        shm.close()
+        shm.unlink()
+    return sorted(rows, key=lambda row: tuple(row[axis] for axis in SWEEP_AXES))
+
+
+def sweep_file(filepath, grid, params=None, jobs=None, memory_budget=DEFAULT_MEMORY_BUDGET,
+               cache_bytes=DECODE_CACHE_BYTES):
+    """
+    sweep для файла: таблица с колонкой file первой.
+    """
+    y, sr = open_audio(filepath, cache_bytes)
+    rows = sweep(y, sr, grid, params, jobs, memory_budget,
+                 on_group=lambda speed: print(f"[OK] {filepath} скорость {speed:g}"))
+    frame = pd.DataFrame(rows)
+    frame.insert(0, "file", filepath)
+    return frame
+
+
+def parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="Перебор сетки параметров поиска энергетических интервалов")
+    parser.add_argument("inputs", nargs="+", help="папки или шаблоны файлов (*.wav, *.mp3)")
+    parser.add_argument("--out", default="sweep.csv", help="таблица результатов (CSV)")
+    parser.add_argument("--jobs", type=int, default=None, help="число процессов (по умолчанию — все ядра)")
+    parser.add_argument("--memory-budget", type=float, default=DEFAULT_MEMORY_BUDGET / 2**20,
+                        help="бюджет памяти на процесс, МБ: сверх него этапы выполняются по блокам")
+    parser.add_argument("--decode-cache", type=float, default=DECODE_CACHE_BYTES / 2**20,
+                        help="предел кэша декодированных mp3, МБ (0 — не кэшировать)")
+
+    for axis in SWEEP_AXES:
+        parser.add_argument(f"--{axis}", nargs="+", default=[str(DEFAULT_PARAMS[axis])],
+                            help="значения или диапазон начало:конец:шаг")
+
+    parser.add_argument("--noise", action="store_true", help="фильтр шума")
+    parser.add_argument("--normalize", action="store_true", help="нормализация")
+    parser.add_argument("--trim", action="store_true", help="обрезка тишины")
+    parser.add_argument("--markers", action="store_true", help="фонемы → зануление вне")
+    parser.add_argument("--speed-mode", choices=SPEED_MODES, default=DEFAULT_PARAMS["speed_mode"],
+                        help="учёт скорости: ресемплингом (по умолчанию) или приближённо аналитически на исходной частоте")
+    parser.add_argument("--threshold-mode", choices=THRESHOLD_MODES, default=DEFAULT_PARAMS["threshold_mode"],
+                        help="оценка квантилей: точная, приближённая или потоковая")
+    parser.add_argument("--threshold-error", type=float, default=DEFAULT_PARAMS["threshold_error"],
+                        help="допустимая относительная погрешность приближённых режимов")
+    parser.add_argument("--envelope", choices=ENVELOPES, default=DEFAULT_PARAMS["envelope"],
+                        help="огибающая: по отсчётам или по кадрам (окно сглаживания — в кадрах)")
+    parser.add_argument("--hop", type=int, default=DEFAULT_PARAMS["hop"], help="шаг кадров огибающей в отсчётах")
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    args = parse_args(argv)
+    params = {key: getattr(args, key) for key in DEFAULT_PARAMS if key not in SWEEP_AXES and hasattr(args, key)}
+    grid = {axis: grid_values(getattr(args, axis)) for axis in SWEEP_AXES}
+
+    files = collect_files(args.inputs)
+    if not files:
+        raise SystemExit("[!!] Не найдено ни одного аудиофайла.")
+
+    frames = [sweep_file(f, grid, params, args.jobs, int(args.memory_budget * 2**20), int(args.decode_cache * 2**20))
+              for f in files]
+    table = pd.concat(frames, ignore_index=True)
+    table.to_csv(args.out, index=False)
+    print(f"Точек сетки: {len(table)} ({len(files)} файлов). Таблица: {args.out}")
+
+
+if __name__ == "__main__":
+    main()
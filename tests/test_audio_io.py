@@ -0,0 +1,46 @@
+"""
+LazyAudio читает те же значения, что librosa.load, для всех поддерживаемых форматов WAV.
+"""
+import librosa
+import numpy as np
+import pytest
+import soundfile as sf
+
+from benchmarks.common import synthetic_audio
+from ui_audio_io import LAZY_BLOCK, open_lazy_wav
+
+SR = 8000
+
+
+@pytest.mark.parametrize("subtype", ["PCM_U8", "PCM_16", "PCM_24", "PCM_32", "FLOAT", "DOUBLE"])
+@pytest.mark.parametrize("channels", [1, 2])
+def test_lazy_matches_librosa(tmp_path, subtype, channels):
+    y = np.clip(synthetic_audio(3, SR, seed=channels), -1, 1)
+    if channels == 2:
+        y = np.stack([y, -0.5 * y], axis=1)
+    path = str(tmp_path / "rec.wav")
+    sf.write(path, y, SR, subtype=subtype)
+
+    lazy = open_lazy_wav(path)
+    expected, sr = librosa.load(path, sr=None)
+    assert lazy is not None and lazy.sr == sr and len(lazy) == len(expected)
+    assert np.array_equal(lazy.to_array(), expected)
+    assert np.array_equal(lazy[1000:5000], expected[1000:5000])
+    assert np.array_equal(lazy[::3], expected[::3])
+    assert lazy[-1] == expected[-1]
+
+
+def test_lazy_reads_across_blocks(tmp_path):
+    y = np.clip(synthetic_audio((LAZY_BLOCK + 1000) / SR, SR), -1, 1)
+    path = str(tmp_path / "long.wav")
+    sf.write(path, y, SR, subtype="PCM_16")
+    lazy = open_lazy_wav(path)
+    expected, _ = librosa.load(path, sr=None)
+    assert np.array_equal(lazy[LAZY_BLOCK - 10:LAZY_BLOCK + 10], expected[LAZY_BLOCK - 10:LAZY_BLOCK + 10])
+    assert np.array_equal(np.asarray(lazy), expected)
+
+
+def test_non_wav_is_not_lazy(tmp_path):
+    path = str(tmp_path / "rec.flac")
+    sf.write(path, synthetic_audio(1, SR), SR)
+    assert open_lazy_wav(path) is None
@@ -0,0 +1,36 @@
+import json
+import os
+
+import soundfile as sf
+
+from batch import main, report_names
+from benchmarks.common import synthetic_audio
+
+
+def test_unique_names_are_kept():
+    assert report_names(["rec/a.wav", "rec/b.mp3"]) == ["a_report", "b_report"]
+
+
+def test_same_name_in_different_folders():
+    files = [os.path.join("rec", "a", "x.wav"), os.path.join("rec", "b", "x.wav")]
+    assert report_names(files) == ["a_x_wav_report", "b_x_wav_report"]
+
+
+def test_same_name_with_different_extensions():
+    assert report_names(["rec/x.wav", "rec/x.mp3", "rec/y.wav"]) == ["x_wav_report", "x_mp3_report", "y_report"]
+
+
+def test_remaining_collisions_are_numbered():
+    files = ["rec/x_wav.wav", "rec/x.wav", "rec/X.WAV", "rec/x_wav.mp3"]
+    names = report_names(files)
+    assert len({name.lower() for name in names}) == len(files)
+
+
+def test_profile_stdout_is_jsonl(tmp_path, capsys):
+    path = str(tmp_path / "rec.wav")
+    sf.write(path, synthetic_audio(5, 22050), 22050)
+    main([path, "--energy", "--profile", "--jobs", "1", "--out", str(tmp_path / "reports")])
+    out = capsys.readouterr().out
+    records = [json.loads(line) for line in out.splitlines()]
+    assert [record["file"] for record in records] == [path]
+    assert records[0]["stages"]
@@ -0,0 +1,47 @@
+"""
+Число интервалов по индексу подбора совпадает с запусками цепочки, а найденные пары дают 30 интервалов.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.common import protocol_audio
+from ui_calibrate import CALIBRATION_MERGES, CALIBRATION_QUANTILES, build_index, calibrate, segment_counts
+from ui_envelope import RMS, SAMPLES
+from ui_pipeline import DEFAULT_PARAMS, Pipeline
+
+SR = 22050
+
+
+@pytest.fixture(scope="module", params=[SAMPLES, RMS])
+def calibration(request):
+    y, _ = protocol_audio(120, SR, seed=2)
+    params = {**DEFAULT_PARAMS, "energy": True, "experiment": "5:6", "envelope": request.param,
+              "window": 5 if request.param == SAMPLES else 3}
+    pipeline = Pipeline()
+    pipeline.run(y, SR, params, check=False)
+    smoothed, rate, envelope, _ = pipeline.smoothed_envelope(y, SR, params)
+    return y, params, pipeline, build_index(smoothed, rate, envelope)
+
+
+def test_counts_match_pipeline(calibration):
+    y, params, pipeline, index = calibration
+    counts = segment_counts(index)
+    rng = np.random.default_rng(0)
+    checked = 0
+    for i, j in zip(rng.integers(len(CALIBRATION_QUANTILES), size=20), rng.integers(len(CALIBRATION_MERGES), size=20)):
+        if counts[i, j] < 0:  # больше TOP_GAPS промежутков — число по индексу неизвестно
+            continue
+        result = pipeline.run(y, SR, {**params, "quantile": float(CALIBRATION_QUANTILES[i]),
+                                      "merge": float(CALIBRATION_MERGES[j])}, check=False)
+        assert counts[i, j] == len(result["segments"])
+        checked += 1
+    assert checked
+
+
+def test_candidates_give_thirty_segments(calibration):
+    y, params, pipeline, index = calibration
+    candidates = calibrate(index)
+    assert candidates
+    for candidate in candidates:
+        result = pipeline.run(y, SR, {**params, "quantile": candidate["quantile"], "merge": candidate["merge"]})
+        assert len(result["segments"]) == 30
@@ -0,0 +1,73 @@
+"""
+Огибающие по кадрам совпадают с наивным расчётом по каждому кадру, уточнённые границы
+участков не выходят за сигнал.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.common import synthetic_audio
+from ui_envelope import BLOCK_CHUNK, DEFAULT_HOP, PEAK, RMS, TKEO, envelope_length, frame_envelope, refine_runs
+from ui_pipeline import run_pipeline
+
+SR = 8000
+
+
+def naive_envelope(y, feature, hop):
+    # Кадр k — отсчёты [(k - 1) * hop, (k + 1) * hop), за краями сигнала — нули
+    y = np.asarray(y, dtype=np.float64)
+    psi = np.zeros(len(y))
+    if len(y) > 2:
+        psi[1:-1] = np.maximum(y[1:-1] ** 2 - y[:-2] * y[2:], 0)
+    values = []
+    for k in range(len(y) // hop + 1):
+        lo, hi = max((k - 1) * hop, 0), min((k + 1) * hop, len(y))
+        if feature == PEAK:
+            values.append(max((abs(v) for v in y[lo:hi]), default=0.0))
+        elif feature == RMS:
+            values.append(np.sqrt(sum(v * v for v in y[lo:hi]) / (2 * hop)))
+        else:
+            values.append(np.sqrt(sum(psi[lo:hi]) / (2 * hop)))
+    return np.array(values)
+
+
+@pytest.mark.parametrize("feature", [RMS, PEAK, TKEO])
+@pytest.mark.parametrize("n", [0, 1, 255, 256, 257, 1000, 3 * 256 + 17])
+def test_matches_naive(feature, n):
+    y = np.random.default_rng(n).standard_normal(n)
+    envelope = frame_envelope(y, feature, hop=256)
+    assert len(envelope) == envelope_length(n, 256)
+    assert np.allclose(envelope, naive_envelope(y, feature, 256))
+
+
+@pytest.mark.parametrize("feature", [RMS, PEAK, TKEO])
+def test_blocks_join_without_seams(feature):
+    # Несколько порций по BLOCK_CHUNK блоков, длина не кратна hop
+    hop = 4
+    y = synthetic_audio((BLOCK_CHUNK * hop * 2 + 13) / SR, SR).astype(np.float32)
+    envelope = frame_envelope(y, feature, hop)
+    assert envelope.dtype == np.float32
+    assert np.allclose(envelope, naive_envelope(y, feature, hop), rtol=1e-5, atol=1e-7)
+
+
+def test_refine_runs_within_frames():
+    signal = np.array([0.0, 0.2, 0.8, 1.0, 0.6, 0.1, 0.9, 0.9])
+    starts, ends = refine_runs(signal, 0.5, [2, 6], [5, 8], length=7.4)
+    assert starts[0] == pytest.approx(1.5) and ends[0] == pytest.approx(4.2)
+    assert 5 < starts[1] <= 6
+    assert ends[1] == 7.4  # последний участок — до конца сигнала, а не до конца кадра за ним
+
+
+@pytest.mark.parametrize("feature", [RMS, PEAK, TKEO])
+@pytest.mark.parametrize("n", [3 * SR, 3 * SR + 100])
+def test_segments_inside_signal(feature, n):
+    rng = np.random.default_rng(n)
+    y = np.zeros(n, dtype=np.float32)
+    y[SR // 8:SR // 4] = rng.uniform(-1, 1, SR // 8)
+    y[n - SR // 2:] = rng.uniform(-1, 1, SR // 2)  # звук до самого конца записи
+    result = run_pipeline(y, SR, {"energy": True, "envelope": feature, "window": 1, "merge": 0.05,
+                                  "quantile": 0.2})
+    segments = result["segments"]
+    assert segments
+    for start, end in segments:
+        assert 0 <= start <= end <= n / SR
+    assert segments[-1][1] > (n - 2 * DEFAULT_HOP) / SR  # последний кадр неполный, его огибающая ниже
@@ -0,0 +1,90 @@
+"""
+Отчёт читается обратно с теми же значениями во всех форматах, дописывание в набор данных
+не дублирует заголовки и пропускает пустые таблицы.
+"""
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from benchmarks.bench_export import phoneme_table
+from ui_export import (CSV, CSV_ENCODING, EXCEL, EXCEL_STREAM, PARQUET, append_report, check_format,
+                       report_paths, write_report)
+from ui_pipeline import DEFAULT_PARAMS
+from ui_report import build_report_frames
+
+SEGMENTS = [(i * 2.0, i * 2.0 + 0.4) for i in range(30)]
+
+
+def report_frames(filepath="session.wav", segments=SEGMENTS, phonemes=None):
+    return build_report_frames(filepath, 22050, {"duration": 60.0, "power": 0.01}, segments, DEFAULT_PARAMS,
+                               phonemes)
+
+
+def read_sheet(paths, format, sheet_name, suffix):
+    if format in (EXCEL, EXCEL_STREAM):
+        return pd.read_excel(paths[0], sheet_name=sheet_name)
+    path = next(p for p in paths if p.endswith(f"_{suffix}{os.path.splitext(p)[1]}"))
+    return pd.read_csv(path, encoding=CSV_ENCODING) if format == CSV else pd.read_parquet(path)
+
+
+def available(format):
+    try:
+        check_format(format)
+    except ImportError as e:
+        pytest.skip(str(e))
+
+
+@pytest.mark.parametrize("format", [EXCEL, EXCEL_STREAM, CSV, PARQUET])
+def test_report_round_trip(tmp_path, format):
+    available(format)
+    phonemes = phoneme_table(500)
+    phonemes.loc[3, "Вариант 2"] = None  # пропуск — пустая ячейка
+    frames = report_frames(phonemes=phonemes)
+    paths = write_report(str(tmp_path / "report.xlsx"), frames, format=format)
+    assert paths == report_paths(str(tmp_path / "report.xlsx"), frames, format)
+    assert all(os.path.exists(p) for p in paths)
+
+    segments = read_sheet(paths, format, "Латентные интервалы", "segments")
+    expected = next(df for sheet_name, df, _ in frames if sheet_name == "Латентные интервалы")
+    pd.testing.assert_frame_equal(segments, expected, check_dtype=False)
+    back = read_sheet(paths, format, "Фонемы", "phonemes")
+    assert back["Символ"].tolist() == phonemes["Символ"].tolist()
+    assert pd.isna(back.loc[3, "Вариант 2"])
+    assert np.allclose(back["Длительность (сек)"], phonemes["Длительность (сек)"])
+
+
+def test_stream_excel_matches_excel(tmp_path):
+    frames = report_frames(phonemes=phoneme_table(200))
+    excel = pd.read_excel(write_report(str(tmp_path / "a.xlsx"), frames, format=EXCEL)[0], sheet_name=None)
+    stream = pd.read_excel(write_report(str(tmp_path / "b.xlsx"), frames, format=EXCEL_STREAM)[0], sheet_name=None)
+    assert list(excel) == list(stream)
+    for sheet_name in excel:
+        pd.testing.assert_frame_equal(excel[sheet_name], stream[sheet_name])
+
+
+@pytest.mark.parametrize("format", [CSV, PARQUET])
+def test_append_round_trip(tmp_path, format):
+    available(format)
+    dataset = str(tmp_path / "dataset")
+    append_report(dataset, "a.wav", report_frames("a.wav"), format)
+    append_report(dataset, "b.wav", report_frames("b.wav", segments=SEGMENTS[:5]), format)
+    append_report(dataset, "c.wav", report_frames("c.wav", segments=[]), format)  # без интервалов
+
+    if format == CSV:
+        with open(os.path.join(dataset, "segments.csv"), "rb") as f:
+            assert f.read().count(b"\xef\xbb\xbf") == 1  # BOM — только в начале файла
+        read = lambda table: pd.read_csv(os.path.join(dataset, f"{table}.csv"), encoding=CSV_ENCODING)
+    else:
+        read = lambda table: pd.read_parquet(os.path.join(dataset, table))
+    segments = read("segments")
+    assert sorted(segments.groupby("Файл").size().items()) == [("a.wav", 30), ("b.wav", 5)]
+    assert sorted(read("metrics")["Файл"]) == ["a.wav", "b.wav", "c.wav"]
+    # Без результатов распознавания лист фонем не дописывается
+    assert not os.path.exists(os.path.join(dataset, "phonemes.csv" if format == CSV else "phonemes"))
+
+
+def test_append_rejects_excel(tmp_path):
+    with pytest.raises(ValueError):
+        append_report(str(tmp_path), "a.wav", report_frames(), EXCEL)
@@ -0,0 +1,65 @@
+import threading
+import time
+
+import pytest
+
+from ui_models import ModelRegistry
+
+
+def test_concurrent_get_loads_once():
+    registry = ModelRegistry()
+    calls = []
+
+    def loader():
+        calls.append(1)
+        time.sleep(0.1)
+        return object()
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(registry.get("asr", loader))) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(calls) == 1
+    assert all(model is results[0] for model in results)
+
+
+def test_loading_does_not_block_registry():
+    registry = ModelRegistry()
+    started, release = threading.Event(), threading.Event()
+
+    def slow_loader():
+        started.set()
+        release.wait(5)
+        return "slow"
+
+    thread = threading.Thread(target=registry.get, args=("slow", slow_loader))
+    thread.start()
+    assert started.wait(5)
+    # Пока "slow" грузится, другой ключ и проверки реестра не ждут его
+    done = threading.Event()
+    threading.Thread(target=lambda: (registry.get("fast", lambda: "fast"), registry.is_loaded("slow"),
+                                     done.set())).start()
+    assert done.wait(1)
+    release.set()
+    thread.join()
+    assert registry.is_loaded("slow") and registry.is_loaded("fast")
+
+
+def test_failed_load_is_retried():
+    registry = ModelRegistry()
+
+    def broken():
+        raise RuntimeError("нет модели")
+
+    with pytest.raises(RuntimeError):
+        registry.get("asr", broken)
+    assert not registry.is_loaded("asr")
+    assert registry.get("asr", lambda: "ok") == "ok"
+    with registry.use("asr", broken) as model:
+        assert model == "ok"
+        registry.evict("asr")
+        assert registry.is_loaded("asr")  # используется — не выгружается
+    registry.evict("asr")
+    assert not registry.is_loaded("asr")
@@ -0,0 +1,35 @@
+"""
+Быстрый фильтр шума совпадает с исходной реализацией (np.where + scipy.signal.medfilt) побитно.
+"""
+import numpy as np
+import pytest
+import scipy.signal
+
+from benchmarks.bench_noise import legacy_noise_filter
+from benchmarks.common import synthetic_audio
+from ui_noise import NOISE_BLOCK, apply_noise_filter, median5
+
+
+@pytest.mark.filterwarnings("ignore:kernel_size exceeds volume extent")  # короткие сигналы
+@pytest.mark.parametrize("n", [0, 1, 2, 4, 5, 6, 1000, NOISE_BLOCK + 3])
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_median5_matches_medfilt(n, dtype):
+    x = np.random.default_rng(n).standard_normal(n).astype(dtype)
+    x[::7] = 0  # повторяющиеся значения, как после зануления
+    assert np.array_equal(median5(x), scipy.signal.medfilt(x, 5))
+
+
+@pytest.mark.parametrize("workers", [1, 4])
+@pytest.mark.parametrize("seed", [0, 1])
+def test_noise_filter_matches_legacy(workers, seed):
+    # Больше нескольких блоков, чтобы проверить стыки
+    y = synthetic_audio(10, 22050, seed=seed).astype(np.float32)
+    expected = legacy_noise_filter(y)
+    result = apply_noise_filter(y, workers=workers)
+    assert result.dtype == expected.dtype
+    assert np.array_equal(result, expected)
+
+
+def test_noise_filter_on_silence():
+    y = np.zeros(NOISE_BLOCK * 2, dtype=np.float32)
+    assert np.array_equal(apply_noise_filter(y), legacy_noise_filter(y))
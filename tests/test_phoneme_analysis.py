@@ -0,0 +1,54 @@
+"""
+Загрузка модели распознавания через реестр: pipeline transformers подменяется заглушкой,
+чтобы не скачивать чекпойнт.
+"""
+import sys
+
+import pytest
+import torch
+
+from ui_models import models
+from ui_phoneme_analysis import (ASR_MODEL, FP32, INT8, PhonemeAnalyzer, backend_key, backend_loader, backend_of,
+                                 ensure_transcriber)
+
+
+class FakeTranscriber:
+    def __init__(self, task, model, **kwargs):
+        self.task, self.name, self.kwargs = task, model, kwargs
+        self.model = torch.nn.Sequential(torch.nn.Linear(4, 4))
+
+
+@pytest.fixture
+def fake_pipeline(monkeypatch):
+    calls = []
+
+    def pipeline(task, model, **kwargs):
+        calls.append(model)
+        return FakeTranscriber(task, model, **kwargs)
+
+    # Первое обращение к transformers.pipeline подменяет ленивый модуль в sys.modules — заглушка ставится после него
+    from transformers import pipeline as _  # noqa: F401
+    monkeypatch.setattr(sys.modules["transformers"], "pipeline", pipeline)
+    models.evict()
+    yield calls
+    models.evict()
+
+
+def test_backend_loader_builds_pipeline(fake_pipeline):
+    transcriber = backend_loader(backend_of(None))()
+    assert fake_pipeline == [ASR_MODEL]
+    assert transcriber.task == "automatic-speech-recognition" and transcriber.name == ASR_MODEL
+
+
+def test_int8_quantizes_linear_layers(fake_pipeline):
+    transcriber = backend_loader(backend_of({"precision": INT8}))()
+    assert transcriber.kwargs["device"] == -1
+    assert not isinstance(transcriber.model[0], torch.nn.Linear)  # заменён квантованным слоем
+
+
+def test_registry_loads_once(fake_pipeline):
+    backend = backend_of({"model": "openai/whisper-tiny", "precision": FP32})
+    transcriber = ensure_transcriber(backend)
+    assert models.is_loaded(backend_key(backend))
+    assert PhonemeAnalyzer(None, None, 16000, backend).load_model() is transcriber
+    assert fake_pipeline == ["openai/whisper-tiny"]
@@ -0,0 +1,57 @@
+"""
+Векторизованный поиск участков и слияние совпадают с исходным поэлементным циклом.
+"""
+import numpy as np
+import pytest
+
+from benchmarks.bench_segments import legacy_find_nonzero_segments
+from ui_segments import detect_runs, find_segments, merge_runs, to_seconds
+
+SR = 100
+THRESHOLD = 0.5
+
+
+def blocked_segments(signal, sr, threshold, merge_threshold, block_size=3):
+    starts, ends = detect_runs(signal, threshold, block_size=block_size)
+    return to_seconds(*merge_runs(starts, ends, sr, merge_threshold), sr)
+
+
+CASES = {
+    "пустой": [],
+    "всё ниже порога": [0.1] * 10,
+    "всё выше порога": [0.9] * 10,
+    "на краях": [0.9, 0.9, 0.1, 0.1, 0.9, 0.1, 0.1, 0.9, 0.9],
+    "равно порогу": [0.5, 0.9, 0.5, 0.9, 0.9, 0.5],
+    "NaN внутри и на краях": [np.nan, 0.9, np.nan, 0.1, np.nan, 0.9, 0.9, np.nan, 0.1, np.nan],
+    "один отсчёт": [0.9],
+}
+
+
+@pytest.mark.parametrize("merge", [0.0, 0.02, 0.03, 1.0])
+@pytest.mark.parametrize("name", list(CASES))
+def test_matches_legacy_loop(name, merge):
+    signal = np.array(CASES[name], dtype=np.float64)
+    expected = legacy_find_nonzero_segments(signal, SR, THRESHOLD, merge)
+    assert find_segments(signal, SR, THRESHOLD, merge) == expected
+    assert blocked_segments(signal, SR, THRESHOLD, merge) == expected
+
+
+def test_gap_equal_to_merge_threshold_is_merged():
+    # Участки [0, 2) и [5, 7): зазор ровно 3 отсчёта = 0.03 с — сливаются, как в цикле (<=)
+    signal = np.array([0.9, 0.9, 0, 0, 0, 0.9, 0.9, 0])
+    expected = legacy_find_nonzero_segments(signal, SR, THRESHOLD, 0.03)
+    assert expected == [(0.0, 0.07)]
+    assert find_segments(signal, SR, THRESHOLD, 0.03) == expected
+    assert find_segments(signal, SR, THRESHOLD, 0.029) == [(0.0, 0.02), (0.05, 0.07)]
+
+
+@pytest.mark.parametrize("seed", range(5))
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_random_signals(seed, dtype):
+    rng = np.random.default_rng(seed)
+    signal = rng.random(5000).astype(dtype)
+    signal[rng.random(5000) < 0.01] = np.nan
+    for merge in (0.0, 0.05, 0.5):
+        expected = legacy_find_nonzero_segments(signal, SR, THRESHOLD, merge)
+        assert find_segments(signal, SR, THRESHOLD, merge) == expected
+        assert blocked_segments(signal, SR, THRESHOLD, merge, block_size=997) == expected
@@ -0,0 +1,52 @@
+"""
+Режимы учёта скорости: ресемплинг — по умолчанию, аналитический режим — приближение к нему
+с измеренной погрешностью (см. ui_speed).
+"""
+import os
+
+import librosa
+import numpy as np
+import pytest
+
+from benchmarks.common import synthetic_audio
+from ui_pipeline import DEFAULT_PARAMS, run_pipeline
+from ui_speed import ANALYTIC, RESAMPLE, frame_hop, smoothing_width
+
+TEMP_WAV = os.path.join(os.path.dirname(__file__), os.pardir, "temp.wav")
+MERGE = 0.3
+TOLERANCE = 2e-3  # сек: измеренный сдвиг границ — до ~1.2 мс на temp.wav
+
+
+def compare_modes(y, sr, speed, window):
+    params = {"energy": True, "speed": speed, "window": window, "merge": MERGE}
+    resampled = run_pipeline(y, sr, {**params, "speed_mode": RESAMPLE})["segments"]
+    analytic = run_pipeline(y, sr, {**params, "speed_mode": ANALYTIC})["segments"]
+    assert len(analytic) == len(resampled)
+    assert np.abs(np.array(analytic) - np.array(resampled)).max(initial=0.0) <= TOLERANCE
+
+
+def test_resample_is_default():
+    assert DEFAULT_PARAMS["speed_mode"] == RESAMPLE
+    assert smoothing_width(5, 2.0) == 5
+    assert frame_hop(256, 2.0) == 256
+
+
+def test_modes_match_at_unit_speed():
+    y = synthetic_audio(30, 22050, seed=1)
+    params = {"energy": True, "speed": 1.0}
+    assert (run_pipeline(y, 22050, {**params, "speed_mode": RESAMPLE})["segments"]
+            == run_pipeline(y, 22050, {**params, "speed_mode": ANALYTIC})["segments"])
+
+
+@pytest.mark.parametrize("speed", [0.8, 1.5, 2.0])
+@pytest.mark.parametrize("window", [1, 5, 11])
+def test_analytic_close_to_resample_on_temp_wav(speed, window):
+    y, sr = librosa.load(TEMP_WAV, sr=None)
+    compare_modes(y, sr, speed, window)
+
+
+@pytest.mark.parametrize("seed", range(6))
+@pytest.mark.parametrize("speed", [0.8, 1.5])
+@pytest.mark.parametrize("window", [1, 5])
+def test_analytic_close_to_resample_on_synthetic(seed, speed, window):
+    compare_modes(synthetic_audio(30, 22050, seed=seed), 22050, speed, window)
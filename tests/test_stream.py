@@ -0,0 +1,50 @@
+"""
+Потоковый режим и обработка по блокам дают те же интервалы, что и обработка в памяти.
+"""
+import numpy as np
+import pytest
+import soundfile as sf
+
+from benchmarks.common import protocol_audio, synthetic_audio
+from ui_audio_io import open_audio
+from ui_pipeline import Pipeline, run_pipeline
+from ui_stream import run_stream_pipeline
+
+SR = 22050
+
+
+@pytest.fixture(params=[0, 1, 2])
+def recording(request, tmp_path):
+    path = str(tmp_path / "rec.wav")
+    sf.write(path, synthetic_audio(60, SR, seed=request.param), SR, subtype="FLOAT")
+    return path
+
+
+@pytest.mark.parametrize("window", [1, 5])
+def test_stream_matches_in_memory(recording, window):
+    params = {"energy": True, "window": window}
+    y, sr = open_audio(recording, 0)
+    expected = run_pipeline(y, sr, params)
+    # Недостающие параметры берутся из DEFAULT_PARAMS, как у run_pipeline
+    streamed = run_stream_pipeline(recording, params, block_size=65536)
+    assert streamed["threshold"] == pytest.approx(expected["threshold"])
+    assert streamed["segments"] == expected["segments"]
+
+
+def test_blocks_match_in_memory(recording):
+    params = {"energy": True, "window": 5}
+    y, sr = open_audio(recording, 0)
+    expected = run_pipeline(y, sr, params)["segments"]
+    # Бюджет меньше сигнала — энергия, сглаживание и поиск участков идут по блокам
+    blocked = Pipeline(memory_budget=2**20).run(y, sr, params)["segments"]
+    assert blocked == expected
+
+
+def test_stream_protocol(tmp_path):
+    y, bursts = protocol_audio(120, SR, seed=3)
+    path = str(tmp_path / "protocol.wav")
+    sf.write(path, y, SR, subtype="FLOAT")
+    result = run_stream_pipeline(path, {"energy": True, "experiment": "5:6"})
+    assert len(result["segments"]) == 30
+    assert result["segments"] == run_pipeline(np.asarray(y, dtype=np.float32), SR,
+                                              {"energy": True, "experiment": "5:6"})["segments"]
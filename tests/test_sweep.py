@@ -0,0 +1,22 @@
+"""
+Перебор сетки даёт те же интервалы, что и отдельные запуски цепочки, и переиспользует её этапы.
+"""
+from benchmarks.common import synthetic_audio
+from sweep import sweep
+from ui_pipeline import run_pipeline
+
+SR = 22050
+GRID = {"speed": [1.0, 1.5], "window": [3, 5], "quantile": [0.9, 0.95], "merge": [0.5, 1.0]}
+
+
+def test_sweep_matches_pipeline_and_reuses_stages():
+    y = synthetic_audio(20, SR, seed=4)
+    rows = sweep(y, SR, GRID, jobs=2)
+    assert len(rows) == 16
+    for row in rows:
+        point = {"energy": True, **{axis: row[axis] for axis in GRID}}
+        assert row["segments"] == len(run_pipeline(y, SR, point)["segments"])
+        # Ресемплинг и энергия — один раз на скорость, сглаживание — один раз на окно
+        first_of_speed = row["window"] == 3 and row["quantile"] == 0.9 and row["merge"] == 0.5
+        assert ("energy" in row["recomputed"].split()) == first_of_speed
+        assert ("smoothing" in row["recomputed"].split()) == (row["quantile"] == 0.9 and row["merge"] == 0.5)
@@ -0,0 +1,82 @@
+"""
+Точный порог совпадает с сортировкой, приближённые режимы укладываются в threshold_error.
+"""
+import numpy as np
+import pytest
+
+from ui_threshold import (APPROX, EXACT, STREAM, QuantileSketch, compute_threshold, quantile, select_threshold,
+                          sketch_of)
+
+QUANTILES = [0.0, 0.1, 0.5, 0.92, 0.99, 1.0]
+
+
+def sorted_threshold(signal, q):
+    # Исходная реализация compute_threshold — полная сортировка
+    nonzero = np.sort(signal[signal > 0])
+    if len(nonzero) == 0:
+        return 0
+    return nonzero[min(int(len(nonzero) * q), len(nonzero) - 1)]
+
+
+def samples(kind, n=20000, seed=0):
+    rng = np.random.default_rng(seed)
+    if kind == "равномерное":
+        x = rng.random(n)
+    elif kind == "логнормальное":
+        x = rng.lognormal(0, 3, n)
+    else:  # Парето — тяжёлый хвост
+        x = rng.pareto(1.1, n) * 1e-3
+    x[rng.random(n) < 0.2] = 0  # нули, как после зануления фона
+    return x
+
+
+@pytest.mark.parametrize("q", QUANTILES)
+@pytest.mark.parametrize("dtype", [np.float32, np.float64])
+def test_partition_matches_sort(q, dtype):
+    signal = samples("логнормальное", seed=1).astype(dtype)
+    assert select_threshold(signal, q) == sorted_threshold(signal, q)
+    assert compute_threshold(signal, q, EXACT) == sorted_threshold(signal, q)
+
+
+def test_partition_edge_cases():
+    assert select_threshold(np.zeros(10), 0.5) == 0
+    assert select_threshold(np.array([]), 0.5) == 0
+    assert select_threshold(np.array([0.0, 3.0]), 0.99) == 3.0
+
+
+@pytest.mark.parametrize("q", QUANTILES)
+def test_exact_quantile_matches_numpy(q):
+    values = samples("равномерное", seed=2)
+    assert quantile(values, q, EXACT) == np.quantile(values, q)
+    assert quantile(values, q, EXACT, positive_only=True) == np.quantile(values[values > 0], q)
+
+
+@pytest.mark.parametrize("rel_error", [0.01, 0.001])
+@pytest.mark.parametrize("kind", ["равномерное", "логнормальное", "Парето"])
+@pytest.mark.parametrize("q", QUANTILES)
+def test_sketch_within_rel_error(kind, q, rel_error):
+    values = samples(kind, seed=3)
+    exact = sorted_threshold(values, q)
+    for mode in (APPROX, STREAM):
+        assert compute_threshold(values, q, mode, rel_error) == pytest.approx(exact, rel=rel_error)
+        assert quantile(values, q, mode, rel_error) == pytest.approx(np.quantile(values, q), rel=rel_error)
+        assert (quantile(values, q, mode, rel_error, positive_only=True)
+                == pytest.approx(np.quantile(values[values > 0], q), rel=rel_error))
+
+
+def test_sketch_merge_and_blocks():
+    values = samples("Парето", seed=4)
+    whole = QuantileSketch(0.01).update(values)
+    merged = QuantileSketch(0.01).update(values[:7000]).merge(QuantileSketch(0.01).update(values[7000:]))
+    blocks = sketch_of(np.array_split(values, 5), 0.01)
+    for sketch in (merged, blocks):
+        assert sketch.count == whole.count and sketch.zeros == whole.zeros
+        assert np.array_equal(sketch.counts, whole.counts)
+    with pytest.raises(ValueError):
+        whole.merge(QuantileSketch(0.1))
+
+
+def test_sketch_ignores_nan_and_handles_empty():
+    sketch = QuantileSketch().update(np.array([np.nan, 0.0, 0.0]))
+    assert sketch.count == 2 and sketch.threshold(0.5) == 0
+    assert np.isnan(QuantileSketch().quantile(0.5))
@@ -0,0 +1,254 @@
+import hashlib
+import os
+import shutil
+
+import numpy as np
+
+from ui_cache import CACHE_DIR, DiskCache
+
+# Каталог с ffmpeg на рабочей машине (Windows); на других системах ffmpeg ищется в PATH
+FFMPEG_DIR = r"B:\\ffmpeg-7.1.1-full_build\\bin"
+
+
+def ensure_ffmpeg():
+    """
+    Проверяет, что ffmpeg доступен: в PATH или в FFMPEG_DIR (тогда каталог добавляется в PATH).
+    Нужен только для форматов, которые не читает soundfile (декодирование через audioread).
+    :raises EnvironmentError: если ffmpeg не найден
+    """
+    if shutil.which("ffmpeg") is not None:
+        return
+    if os.path.isdir(FFMPEG_DIR) and FFMPEG_DIR not in os.environ["PATH"].split(os.pathsep):
+        os.environ["PATH"] += os.pathsep + FFMPEG_DIR
+    if shutil.which("ffmpeg") is None:
+        raise EnvironmentError(
+            f"[FFMPEG NOT FOUND] ffmpeg не найден ни в PATH, ни по пути: {FFMPEG_DIR}. "
+            f"Он нужен для чтения этого файла — установите ffmpeg или проверьте путь."
+        )
+
+
+def load_audio_file(filepath, sr=None):
+    """
+    Загрузка аудиофайла (как librosa.load, моно).
+    ffmpeg проверяется только если файл не читается через soundfile.
+    :return: (сигнал, частота дискретизации)
+    """
+    import librosa
+    import soundfile as sf
+
+    try:
+        sf.info(filepath)
+    except RuntimeError:
+        ensure_ffmpeg()
+    return librosa.load(filepath, sr=sr)
+
+
+# --- 🗺️ Ленивое чтение PCM WAV ---
+LAZY_BLOCK = 1 << 20  # кадров за одно преобразование при чтении больших диапазонов
+
+_WAVE_PCM, _WAVE_FLOAT, _WAVE_EXTENSIBLE = 1, 3, 0xFFFE
+_PCM_DTYPES = {(_WAVE_PCM, 8): "u1", (_WAVE_PCM, 16): "<i2", (_WAVE_PCM, 24): "u1", (_WAVE_PCM, 32): "<i4",
+               (_WAVE_FLOAT, 32): "<f4", (_WAVE_FLOAT, 64): "<f8"}
+
+
+def _wav_layout(filepath):
+    """
+    Разбор заголовка RIFF/WAVE: (формат, каналы, частота, бит на отсчёт, смещение данных, кадров)
+    или None, если файл — не WAV с PCM/float данными, которые можно отобразить в память.
+    """
+    import struct
+
+    with open(filepath, "rb") as f:
+        header = f.read(12)
+        if len(header) < 12 or header[:4] != b"RIFF" or header[8:12] != b"WAVE":
+            return None
+        file_size = os.fstat(f.fileno()).st_size
+        fmt = None
+        while True:
+            chunk = f.read(8)
+            if len(chunk) < 8:
+                return None
+            chunk_id, size = struct.unpack("<4sI", chunk)
+            if chunk_id == b"fmt ":
+                body = f.read(size)
+                if len(body) < 16:
+                    return None
+                code, channels, sr, _, block_align, bits = struct.unpack("<HHIIHH", body[:16])
+                if code == _WAVE_EXTENSIBLE and len(body) >= 26:
+                    code = struct.unpack("<H", body[24:26])[0]  # первые байты GUID подформата
+                fmt = (code, channels, sr, block_align, bits)
+                f.seek(size % 2, os.SEEK_CUR)
+            elif chunk_id == b"data":
+                if fmt is None:
+                    return None
+                code, channels, sr, block_align, bits = fmt
+                if (code, bits) not in _PCM_DTYPES or not channels or block_align != channels * bits // 8:
+                    return None
+                offset = f.tell()
+                # Размер 0 или 0xFFFFFFFF пишут потоковые программы: данные идут до конца файла
+                available = file_size - offset
+                size = available if size in (0, 0xFFFFFFFF) else min(size, available)
+                return code, channels, sr, bits, offset, size // block_align
+            else:
+                f.seek(size + size % 2, os.SEEK_CUR)
+
+
+class LazyAudio:
+    """
+    Моно-сигнал float32 поверх PCM WAV, отображённого в память (np.memmap): при открытии
+    читается только заголовок, а срез y[a:b] читает и преобразует только кадры [a, b).
+    Значения те же, что даёт librosa.load (soundfile: целые делятся на 2^(бит - 1),
+    каналы усредняются). Полный массив создаётся только явно — to_array() или np.asarray(y),
+    например фильтрами, которым нужен весь сигнал.
+    """
+
+    dtype = np.dtype(np.float32)
+    itemsize = dtype.itemsize
+    ndim = 1
+
+    def __init__(self, filepath, layout):
+        code, self.channels, self.sr, self.bits, offset, frames = layout
+        self.filepath = filepath
+        raw = np.dtype(_PCM_DTYPES[(code, self.bits)])
+        width = 3 if self.bits == 24 else 1  # 24 бита — тройки байтов
+        shape = (frames, self.channels * width)
+        # np.memmap не отображает пустой участок
+        self.raw = np.memmap(filepath, dtype=raw, mode="r", offset=offset, shape=shape) if frames else np.empty(shape, raw)
+
+    def __len__(self):
+        return len(self.raw)
+
+    @property
+    def shape(self):
+        return (len(self),)
+
+    @property
+    def nbytes(self):
+        return len(self) * self.itemsize
+
+    @property
+    def duration(self):
+        return len(self) / self.sr
+
+    def _convert(self, raw):
+        # Кадры (n, каналы) → моно float32, как soundfile с dtype="float32" и librosa.to_mono
+        if self.bits == 24:
+            b = raw.reshape(len(raw), self.channels, 3).astype(np.int32)
+            raw = (b[..., 0] << 8) | (b[..., 1] << 16) | (b[..., 2] << 24)
+            frames = raw.astype(np.float32) * np.float32(2.0 ** -31)
+        elif self.bits == 8:
+            frames = (raw.astype(np.float32) - 128) * np.float32(2.0 ** -7)
+        elif raw.dtype.kind == "i":
+            frames = raw.astype(np.float32) * np.float32(2.0 ** (1 - self.bits))
+        else:
+            frames = raw.astype(np.float32)
+        return frames[:, 0] if self.channels == 1 else np.mean(frames, axis=1)
+
+    def read(self, start, stop, out=None):
+        """
+        Отсчёты [start, stop) как массив float32 (в out, если он задан).
+        """
+        start, stop, _ = slice(start, stop).indices(len(self))
+        stop = max(stop, start)
+        if out is None:
+            out = np.empty(stop - start, dtype=self.dtype)
+        for pos in range(start, stop, LAZY_BLOCK):
+            end = min(pos + LAZY_BLOCK, stop)
+            out[pos - start:end - start] = self._convert(self.raw[pos:end])
+        return out
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            start, stop, step = index.indices(len(self))
+            if step == 1:
+                return self.read(start, stop)
+            return self._convert(self.raw[index])
+        return self.read(index, index + 1 or None)[0]
+
+    def to_array(self):
+        """
+        Весь сигнал в памяти (читается блоками по LAZY_BLOCK кадров).
+        """
+        return self.read(0, len(self))
+
+    def __array__(self, dtype=None, copy=None):
+        y = self.to_array()
+        return y if dtype is None else y.astype(dtype, copy=False)
+
+
+def write_audio_file(filepath, y, sr, subtype=None, format=None):
+    """
+    Запись моно-сигнала (как soundfile.write, по умолчанию формат по расширению) блоками:
+    LazyAudio при сохранении не читается в память целиком.
+    """
+    import soundfile as sf
+
+    with sf.SoundFile(filepath, "w", samplerate=sr, channels=1, subtype=subtype, format=format) as f:
+        for start in range(0, len(y), LAZY_BLOCK):
+            f.write(np.asarray(y[start:start + LAZY_BLOCK]))
+
+
+def open_lazy_wav(filepath):
+    """
+    LazyAudio для PCM/float WAV или None, если файл нужно загружать целиком (load_audio_file).
+    """
+    try:
+        layout = _wav_layout(filepath)
+    except OSError:
+        return None
+    return None if layout is None else LazyAudio(filepath, layout)
+
+
+# --- 💽 Кэш декодированных файлов ---
+# Сжатые форматы (mp3) декодируются один раз: отсчёты сохраняются как float32 WAV,
+# который при следующих открытиях отображается в память (LazyAudio) без декодирования
+DECODE_CACHE_DIR = os.path.join(CACHE_DIR, "decoded")
+DECODE_CACHE_BYTES = 4 * 1024 ** 3
+RIFF_LIMIT = 2 ** 32 - 2 ** 16  # байт данных, которые адресует заголовок WAV (RIFF)
+
+
+def decode_cache(max_bytes=DECODE_CACHE_BYTES):
+    return DiskCache(DECODE_CACHE_DIR, max_bytes=max_bytes, suffix=".wav")
+
+
+def decode_key(filepath):
+    """
+    Ключ записи: абсолютный путь, размер и время изменения файла —
+    перезаписанный или заменённый файл декодируется заново.
+    """
+    stat = os.stat(filepath)
+    ident = f"{os.path.abspath(filepath)}|{stat.st_size}|{stat.st_mtime_ns}"
+    return hashlib.sha256(ident.encode("utf-8")).hexdigest()
+
+
+def open_audio(filepath, cache_bytes=DECODE_CACHE_BYTES):
+    """
+    Открывает файл для обработки без лишнего чтения и декодирования:
+    PCM WAV отображается в память; остальные форматы берутся из кэша декодированных
+    файлов, а при промахе декодируются (load_audio_file) и кладутся в кэш.
+    Отсчёты в обоих случаях те же, что у load_audio_file.
+    :param cache_bytes: предел кэша в байтах (старые записи вытесняются); 0 — без кэша
+    :return: (LazyAudio или np.ndarray, частота дискретизации)
+    """
+    y = open_lazy_wav(filepath)
+    if y is not None:
+        return y, y.sr
+    if cache_bytes <= 0:
+        return load_audio_file(filepath)
+
+    cache = decode_cache(cache_bytes)
+    key = decode_key(filepath)
+    path = cache.get_path(key)
+    if path is not None:
+        y = open_lazy_wav(path)
+        if y is not None:
+            return y, y.sr
+        cache.remove(key)  # повреждённая запись
+
+    y, sr = load_audio_file(filepath)
+    if len(y) * y.itemsize <= RIFF_LIMIT:
+        try:
+            cache.put_file(key, lambda tmp: write_audio_file(tmp, y, sr, subtype="FLOAT", format="WAV"))
+        except (OSError, RuntimeError):
+            pass  # без кэша файл всё равно открыт; RuntimeError — ошибка записи в soundfile
+    return y, sr
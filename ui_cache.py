@@ -0,0 +1,137 @@
+import gzip
+import json
+import os
+import tempfile
+
+# Общий каталог кэшей приложения (распознавание, декодированные файлы и т.п.)
+CACHE_DIR = os.path.join(os.path.expanduser("~"), ".cache", "audio_analyzer")
+
+
+class DiskCache:
+    """
+    Кэш на диске: одна запись — один файл с именем-ключом (обычно хеш содержимого).
+    Время последнего обращения хранится во времени изменения файла: при переполнении
+    (больше max_bytes) удаляются записи, к которым дольше всего не обращались.
+    Запись выполняется через временный файл и атомарную замену, так что
+    недописанная запись никогда не читается.
+    """
+
+    def __init__(self, directory, max_bytes=256 * 1024 * 1024, suffix=".bin"):
+        self.directory = directory
+        self.max_bytes = max_bytes
+        self.suffix = suffix
+
+    def path_for(self, key):
+        return os.path.join(self.directory, key + self.suffix)
+
+    def get_path(self, key):
+        """
+        Путь к записи, если она есть (и отметка об обращении), иначе None.
+        """
+        path = self.path_for(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def put_file(self, key, write):
+        """
+        Создаёт запись: write(path) пишет содержимое во временный файл.
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix=".tmp")
+        os.close(fd)
+        try:
+            write(tmp)
+            os.replace(tmp, self.path_for(key))
+        except BaseException:
+            if os.path.exists(tmp):
+                os.remove(tmp)
+            raise
+        self.evict(keep=self.path_for(key))
+        return self.path_for(key)
+
+    def get_bytes(self, key):
+        path = self.get_path(key)
+        if path is None:
+            return None
+        with open(path, "rb") as f:
+            return f.read()
+
+    def put_bytes(self, key, data):
+        def write(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        return self.put_file(key, write)
+
+    def get_json(self, key):
+        """
+        Запись в формате JSON, сжатом gzip; повреждённая запись считается отсутствующей.
+        """
+        data = self.get_bytes(key)
+        if data is None:
+            return None
+        try:
+            return json.loads(gzip.decompress(data).decode("utf-8"))
+        except (OSError, ValueError):
+            self.remove(key)
+            return None
+
+    def put_json(self, key, value):
+        return self.put_bytes(key, gzip.compress(json.dumps(value, ensure_ascii=False).encode("utf-8")))
+
+    def entries(self):
+        """
+        Записи кэша: [(путь, размер, время обращения), ...] от самых старых.
+        """
+        if not os.path.isdir(self.directory):
+            return []
+        result = []
+        for entry in os.scandir(self.directory):
+            if entry.is_file() and entry.name.endswith(self.suffix):
+                stat = entry.stat()
+                result.append((entry.path, stat.st_size, stat.st_mtime))
+        return sorted(result, key=lambda item: item[2])
+
+    def size(self):
+        return sum(size for _, size, _ in self.entries())
+
+    def evict(self, keep=None):
+        """
+        Удаляет самые давние записи, пока кэш больше max_bytes (запись keep не трогает).
+        """
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries)
+        for path, size, _ in entries:
+            if total <= self.max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except PermissionError:
+                continue  # файл открыт (на Windows — отображён в память): удалится в следующий раз
+            total -= size
+
+    def remove(self, key):
+        try:
+            os.remove(self.path_for(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        """
+        Удаляет все записи.
+        :return: сколько байт освобождено (открытые файлы пропускаются)
+        """
+        freed = 0
+        for path, size, _ in self.entries():
+            try:
+                os.remove(path)
+            except (FileNotFoundError, PermissionError):
+                continue
+            freed += size
+        return freed
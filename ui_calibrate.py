@@ -0,0 +1,184 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from tkinter import Toplevel, Frame, Button, BOTH, ttk
+
+import numpy as np
+
+from ui_segments import detect_runs
+from ui_threshold import EXACT, DEFAULT_REL_ERROR, QuantileSketch
+from ui_envelope import SAMPLES, refine_runs
+
+# Сетка поиска — шаги ползунков GUI: квантиль 0.50–0.99 через 0.01, слияние 0.1–3.0 с через 0.1
+CALIBRATION_QUANTILES = np.arange(50, 100) / 100
+CALIBRATION_MERGES = np.arange(1, 31) / 10
+EXPECTED_SEGMENTS = 30
+TOP_GAPS = 64  # промежутков на уровень: больше EXPECTED_SEGMENTS, чтобы видеть и соседние исходы
+
+
+def level_thresholds(signal, quantiles, mode=EXACT, rel_error=DEFAULT_REL_ERROR):
+    """
+    Пороги compute_threshold для всех квантилей сразу.
+    Точный режим — одна частичная сортировка np.partition сразу по всем порядковым статистикам
+    (значения те же, что у select_threshold); приближённые — один скетч на все уровни.
+    """
+    if mode != EXACT:
+        sketch = QuantileSketch(rel_error).update(signal)
+        return np.array([sketch.threshold(q) for q in quantiles], dtype=np.float64)
+    nonzero = signal[signal > 0]
+    if len(nonzero) == 0:
+        return np.zeros(len(quantiles))
+    index = np.minimum((len(nonzero) * np.asarray(quantiles)).astype(np.intp), len(nonzero) - 1)
+    nonzero.partition(np.unique(index))
+    return nonzero[index]
+
+
+def _level(signal, threshold, envelope, block_size):
+    # Участки выше порога (как этап "runs" цепочки) и TOP_GAPS самых длинных промежутков между ними
+    starts, ends = detect_runs(signal, threshold, block_size=block_size)
+    if envelope != SAMPLES:
+        starts, ends = refine_runs(signal, threshold, starts, ends)
+    gaps = starts[1:] - ends[:-1]
+    k = min(TOP_GAPS, len(gaps))
+    top = np.argpartition(gaps, len(gaps) - k)[len(gaps) - k:] if k else np.empty(0, dtype=np.intp)
+    top = top[np.argsort(-gaps[top], kind="stable")]
+    return {"threshold": threshold, "runs": len(starts), "gap_starts": starts[1:][top], "gap_ends": ends[:-1][top]}
+
+
+def build_index(signal, rate, envelope=SAMPLES, quantiles=CALIBRATION_QUANTILES, mode=EXACT,
+                rel_error=DEFAULT_REL_ERROR, block_size=None, progress=None, workers=None):
+    """
+    Индекс для подбора (квантиль, слияние) по одной сглаженной огибающей: для каждого уровня
+    квантиля — порог, число участков выше него и самые длинные промежутки между участками.
+    Число интервалов после слияния с порогом m — это 1 + число промежутков, которые слияние
+    не закрывает, поэтому дальше любой (квантиль, слияние) оценивается без прохода по сигналу.
+    Уровни считаются в workers потоках (numpy отпускает GIL).
+    :param rate: частота отсчётов огибающей (sr / hop)
+    :param envelope: тип огибающей (ui_envelope): для огибающих по кадрам границы уточняются внутри кадра
+    :param progress: progress("calibration", доля) по мере готовности уровней; может прервать построение исключением
+    :return: словарь rate, quantiles, levels
+    """
+    quantiles = np.asarray(quantiles)
+    if progress:
+        progress("calibration", 0.0)
+    thresholds = level_thresholds(signal, quantiles, mode, rel_error)
+    levels = [None] * len(quantiles)
+    pool = ThreadPoolExecutor(max_workers=workers or os.cpu_count())
+    try:
+        futures = [pool.submit(_level, signal, threshold, envelope, block_size) for threshold in thresholds]
+        for i, future in enumerate(futures):
+            levels[i] = future.result()
+            if progress:
+                progress("calibration", (i + 1) / len(futures))
+    finally:
+        pool.shutdown(cancel_futures=True)  # при отмене оставшиеся уровни не считаются
+    return {"rate": rate, "quantiles": quantiles, "levels": levels}
+
+
+def segment_counts(index, merges=CALIBRATION_MERGES):
+    """
+    Число интервалов для каждой пары (уровень квантиля, порог слияния).
+    Условие слияния то же, что в merge_runs: start / rate <= end / rate + m.
+    :return: матрица (уровни × merges); -1 — интервалов больше, чем видно по TOP_GAPS промежуткам
+    """
+    rate = index["rate"]
+    merges = np.asarray(merges, dtype=np.float64)
+    counts = np.empty((len(index["levels"]), len(merges)), dtype=np.int64)
+    for i, level in enumerate(index["levels"]):
+        if level["runs"] == 0:
+            counts[i] = 0
+            continue
+        starts = level["gap_starts"][:, None] / rate
+        ends = level["gap_ends"][:, None] / rate
+        open_gaps = starts > ends + merges[None, :]  # промежутки, которые слияние не закрывает
+        counts[i] = 1 + open_gaps.sum(axis=0)
+        if len(level["gap_starts"]) < level["runs"] - 1:
+            # Промежутки вне TOP_GAPS не длиннее самого короткого из видимых: если он открыт,
+            # открыты, возможно, и они — точное число неизвестно
+            counts[i][open_gaps[-1]] = -1
+    return counts
+
+
+def calibrate(index, expected=EXPECTED_SEGMENTS, merges=CALIBRATION_MERGES, limit=10):
+    """
+    Пары (квантиль, слияние) из сетки, дающие ровно expected интервалов, от самых устойчивых:
+    сначала по запасу по квантилю (сколько шагов квантиля в обе стороны число не меняется),
+    затем по запасу по слиянию (расстояние, сек, до ближайшей длины промежутка, на которой
+    число интервалов изменится).
+    :return: список словарей quantile, merge, threshold, quantile_margin, merge_margin
+    """
+    merges = np.asarray(merges, dtype=np.float64)
+    counts = segment_counts(index, merges)
+    hits = counts == expected
+    rate = index["rate"]
+    candidates = []
+    for i, j in zip(*np.nonzero(hits)):
+        down = 0
+        while i - down - 1 >= 0 and hits[i - down - 1, j]:
+            down += 1
+        up = 0
+        while i + up + 1 < len(hits) and hits[i + up + 1, j]:
+            up += 1
+
+        level = index["levels"][i]
+        gaps = level["gap_starts"] / rate - level["gap_ends"] / rate
+        # Открыты ровно expected - 1 самых длинных промежутков: граница сверху — самый короткий из них,
+        # снизу — следующий за ним (или 0, если других промежутков нет)
+        upper = gaps[expected - 2] if expected >= 2 else np.inf
+        lower = gaps[expected - 1] if len(gaps) >= expected else 0.0
+        candidates.append({
+            "quantile": float(index["quantiles"][i]),
+            "merge": float(merges[j]),
+            "threshold": float(level["threshold"]),
+            "quantile_margin": min(down, up),
+            "merge_margin": float(min(upper - merges[j], merges[j] - lower)),
+        })
+    candidates.sort(key=lambda c: (-c["quantile_margin"], -c["merge_margin"], c["quantile"], c["merge"]))
+    return candidates[:limit]
+
+
+def closest_count(index, expected=EXPECTED_SEGMENTS, merges=CALIBRATION_MERGES):
+    """
+    Ближайшее к expected число интервалов на сетке — для сообщения, если точных совпадений нет.
+    :return: (число, квантиль, слияние) или None
+    """
+    counts = segment_counts(index, merges)
+    known = np.argwhere(counts >= 0)
+    if len(known) == 0:
+        return None
+    i, j = min(known, key=lambda ij: abs(counts[ij[0], ij[1]] - expected))
+    return int(counts[i, j]), float(index["quantiles"][i]), float(np.asarray(merges)[j])
+
+
+def show_calibration(parent, candidates, on_apply):
+    """
+    Окно с найденными параметрами: выбор строки и «Применить» (или двойной щелчок)
+    вызывает on_apply(quantile, merge).
+    """
+    window = Toplevel(parent)
+    window.title("Подбор параметров «5:6»")
+    frame = Frame(window)
+    frame.pack(fill=BOTH, expand=True)
+
+    columns = ("Квантиль", "Слияние (сек)", "Порог", "Запас по квантилю (шагов)", "Запас по слиянию (сек)")
+    tree = ttk.Treeview(frame, columns=columns, show='headings', height=len(candidates))
+    for col in columns:
+        tree.heading(col, text=col)
+        tree.column(col, width=150)
+    for candidate in candidates:
+        tree.insert('', 'end', values=(f"{candidate['quantile']:.2f}", f"{candidate['merge']:.1f}",
+                                       f"{candidate['threshold']:.4g}", candidate["quantile_margin"],
+                                       f"{candidate['merge_margin']:.2f}"))
+    tree.pack(fill=BOTH, expand=True)
+    children = tree.get_children()
+    if children:
+        tree.selection_set(children[0])
+
+    def apply(_event=None):
+        selected = tree.selection()
+        if selected:
+            candidate = candidates[tree.index(selected[0])]
+            on_apply(candidate["quantile"], candidate["merge"])
+
+    tree.bind("<Double-1>", apply)
+    Button(window, text="Применить", command=apply).pack(fill="x")
+    return window
@@ -0,0 +1,102 @@
+import numpy as np
+
+# Огибающие для поиска энергетических интервалов
+SAMPLES = "отсчёты"  # |y| на полной частоте дискретизации (исходный вариант)
+RMS = "RMS"          # среднеквадратичное значение кадра
+PEAK = "пик"         # максимум |y| в кадре
+TKEO = "Тигер–Кайзер"  # оператор энергии Тигера–Кайзера, среднее по кадру (в единицах амплитуды)
+ENVELOPES = (SAMPLES, RMS, PEAK, TKEO)
+
+DEFAULT_HOP = 256       # шаг кадров в отсчётах: огибающая в DEFAULT_HOP раз короче сигнала
+BLOCK_CHUNK = 1 << 12   # блоков по hop отсчётов за один проход (ограничивает временные массивы)
+
+
+def envelope_length(n_samples, hop):
+    return n_samples // hop + 1
+
+
+def _block_values(y, start, end, feature):
+    """
+    Значения признака для отсчётов y[start:end] (для Тигера–Кайзера нужны соседние отсчёты).
+    """
+    if feature == RMS:
+        part = y[start:end].astype(np.float64)
+        return np.square(part, out=part)
+    if feature == PEAK:
+        return np.abs(y[start:end])
+    if feature == TKEO:
+        # psi[n] = y[n]^2 - y[n-1] * y[n+1], на краях сигнала 0; отрицательные значения не несут энергии
+        lo, hi = max(start - 1, 0), min(end + 1, len(y))
+        ext = y[lo:hi].astype(np.float64)
+        psi = np.zeros(end - start)
+        inner = ext[1:-1] * ext[1:-1] - ext[:-2] * ext[2:]
+        offset = start - lo  # 1, если есть левый сосед, иначе 0 (psi[0] = 0)
+        psi[1 - offset:1 - offset + len(inner)] = inner
+        return np.maximum(psi, 0, out=psi)
+    raise ValueError(f"Неизвестная огибающая: {feature}")
+
+
+def frame_envelope(y, feature=RMS, hop=DEFAULT_HOP):
+    """
+    Огибающая по кадрам длиной 2 * hop с шагом hop.
+    Кадр k охватывает отсчёты [(k - 1) * hop, (k + 1) * hop) — он центрирован на отсчёте k * hop
+    (за краями сигнала — нули), поэтому кадру k соответствует момент k * hop / sr.
+    Сигнал делится на блоки по hop отсчётов (reshape без копирования), блоки сворачиваются
+    порциями по BLOCK_CHUNK, а кадр — сумма (или максимум) двух соседних блоков.
+    Полноразмерных временных массивов нет.
+    :param feature: RMS, PEAK или TKEO
+    :return: огибающая длиной len(y) // hop + 1 (float32 для float32 сигнала)
+    """
+    if not hasattr(y, "dtype"):
+        y = np.asarray(y)  # LazyAudio не материализуется: читается кусками по BLOCK_CHUNK блоков
+    dtype = np.result_type(y.dtype, np.float32)
+    n_blocks = envelope_length(len(y), hop)  # последний блок неполный (возможно, пустой)
+    blocks = np.zeros(n_blocks + 1)  # blocks[j + 1] — блок j, blocks[0] — нули перед сигналом
+    reduce = np.max if feature == PEAK else np.sum
+    step = BLOCK_CHUNK * hop
+    for start in range(0, len(y), step):
+        end = min(start + step, len(y))
+        values = _block_values(y, start, end, feature)
+        full = len(values) // hop
+        first = start // hop + 1
+        blocks[first:first + full] = reduce(values[:full * hop].reshape(full, hop), axis=1)
+        if full * hop < len(values):
+            blocks[first + full] = reduce(values[full * hop:])
+
+    if feature == PEAK:
+        envelope = np.maximum(blocks[:-1], blocks[1:])
+    else:
+        envelope = np.sqrt((blocks[:-1] + blocks[1:]) / (2 * hop))
+    return envelope.astype(dtype, copy=False)
+
+
+def refine_runs(signal, threshold, starts, ends, length=None):
+    """
+    Уточняет границы участков внутри кадра линейной интерполяцией огибающей
+    между соседними кадрами: граница — точка пересечения порога.
+    Начало лежит в (start - 1, start], конец — в [end - 1, end); границы на краях
+    огибающей и там, где интерполяция невозможна (NaN), не меняются.
+    :param length: длина сигнала в кадрах (len(y) / hop): участок, доходящий до последнего кадра,
+                   заканчивается на конце сигнала, а не на конце кадра за ним
+    :return: (starts, ends) — дробные индексы кадров
+    """
+    signal = np.asarray(signal, dtype=np.float64)
+    starts = np.asarray(starts, dtype=np.float64)
+    ends = np.asarray(ends, dtype=np.float64)
+
+    inner = starts > 0
+    i = starts[inner].astype(np.int64)
+    before, after = signal[i - 1], signal[i]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.nan_to_num((threshold - before) / (after - before), nan=1.0)
+    starts[inner] = i - 1 + np.clip(t, 0.0, 1.0)
+
+    inner = ends < len(signal)
+    i = ends[inner].astype(np.int64)
+    before, after = signal[i - 1], signal[i]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        t = np.nan_to_num((before - threshold) / (before - after), nan=1.0)
+    ends[inner] = i - 1 + np.clip(t, 0.0, 1.0)
+    if length is not None:
+        np.minimum(ends, length, out=ends)
+    return starts, ends
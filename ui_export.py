@@ -0,0 +1,153 @@
+import os
+import uuid
+
+# Форматы отчёта. pandas и openpyxl здесь не импортируются: модуль нужен GUI при запуске (список форматов),
+# а таблицы приходят уже готовыми DataFrame из ui_report
+EXCEL = "Excel"
+EXCEL_STREAM = "Excel (потоковый)"
+CSV = "CSV"
+PARQUET = "Parquet"
+REPORT_FORMATS = (EXCEL, EXCEL_STREAM, CSV, PARQUET)
+EXTENSIONS = {EXCEL: ".xlsx", EXCEL_STREAM: ".xlsx", CSV: ".csv", PARQUET: ".parquet"}
+APPEND_FORMATS = (CSV, PARQUET)  # дописываются без чтения уже записанного
+
+# Файлы листов для CSV и Parquet: <имя отчёта>_<суффикс>.csv
+SHEET_FILES = {
+    "Общие метрики": "metrics",
+    "Латентные интервалы": "segments",
+    "Статистика по длительности": "stats",
+    "Фонемы": "phonemes",
+    "Производительность": "performance",
+}
+APPEND_SHEETS = ("Общие метрики", "Латентные интервалы", "Фонемы")  # таблицы набора данных
+CSV_ENCODING = "utf-8-sig"  # с BOM — Excel открывает кириллицу без выбора кодировки
+STREAM_ROWS = 10000         # строк между проверками progress при потоковой записи xlsx
+
+
+def check_format(format):
+    """
+    Проверяет формат до обработки, чтобы не узнать о недостающей библиотеке на записи.
+    :raises ValueError: неизвестный формат
+    :raises ImportError: для Parquet не установлены ни pyarrow, ни fastparquet
+    """
+    if format not in REPORT_FORMATS:
+        raise ValueError(f"Неизвестный формат отчёта: {format}")
+    if format == PARQUET:
+        import importlib.util
+
+        if not any(importlib.util.find_spec(name) for name in ("pyarrow", "fastparquet")):
+            raise ImportError("Для Parquet нужен pyarrow или fastparquet: pip install pyarrow")
+
+
+def report_paths(save_path, frames, format=EXCEL):
+    """
+    Файлы, которые запишет write_report: одна книга для Excel, по файлу на лист для CSV и Parquet.
+    """
+    if format in (EXCEL, EXCEL_STREAM):
+        return [save_path]
+    root = os.path.splitext(save_path)[0]
+    return [f"{root}_{SHEET_FILES.get(sheet_name, i)}{EXTENSIONS[format]}"
+            for i, (sheet_name, _, _) in enumerate(frames)]
+
+
+def _write_stream_sheet(book, sheet_name, df, index, progress, done, total):
+    # Лист в книге write_only: строки сразу уходят во временный файл, в памяти книга не растёт
+    sheet = book.create_sheet(sheet_name)
+    header = list(map(str, df.columns))
+    sheet.append([df.index.name or ""] + header if index else header)
+    for start in range(0, len(df), STREAM_ROWS):
+        if progress and start:
+            progress("Запись отчёта", (done + start / len(df)) / total)
+        # NaN и пропуски pandas — пустые ячейки, как у to_excel (по кускам: копия — не больше STREAM_ROWS строк)
+        chunk = df.iloc[start:start + STREAM_ROWS].astype(object)
+        chunk = chunk.where(chunk.notna(), None)
+        for row in chunk.itertuples(index=index, name=None):
+            sheet.append(row)
+
+
+def write_report(save_path, frames, progress=None, format=EXCEL):
+    """
+    Сохраняет таблицы отчёта (см. ui_report.build_report_frames).
+    EXCEL — книга через pd.ExcelWriter, EXCEL_STREAM — книга openpyxl в режиме write_only
+    (память не растёт с числом строк), CSV и PARQUET — по файлу на лист (см. report_paths).
+    Parquet требует pyarrow или fastparquet.
+    :param progress: progress(этап, доля) перед каждым листом (для потокового xlsx — и внутри листа)
+    :return: список записанных файлов
+    """
+    # Первая проверка — до создания файла: книгу без листов ExcelWriter закрыть не может
+    if progress:
+        progress("Запись отчёта", 0.0)
+    paths = report_paths(save_path, frames, format)
+    if format == EXCEL:
+        import pandas as pd
+
+        with pd.ExcelWriter(save_path) as writer:
+            for i, (sheet_name, df, index) in enumerate(frames):
+                if progress and i:
+                    progress("Запись отчёта", i / len(frames))
+                df.to_excel(writer, sheet_name=sheet_name, index=index)
+    elif format == EXCEL_STREAM:
+        from openpyxl import Workbook
+
+        book = Workbook(write_only=True)
+        for i, (sheet_name, df, index) in enumerate(frames):
+            if progress and i:
+                progress("Запись отчёта", i / len(frames))
+            _write_stream_sheet(book, sheet_name, df, index, progress, i, len(frames))
+        book.save(save_path)
+    elif format in (CSV, PARQUET):
+        for i, ((_, df, index), path) in enumerate(zip(frames, paths)):
+            if progress and i:
+                progress("Запись отчёта", i / len(frames))
+            if format == CSV:
+                df.to_csv(path, index=index, encoding=CSV_ENCODING)
+            else:
+                df.to_parquet(path, index=index)
+    else:
+        raise ValueError(f"Неизвестный формат отчёта: {format}")
+    return paths
+
+
+def write_table(path, df, format=EXCEL):
+    """
+    Одна таблица (например, сводка пакетной обработки) в файл path выбранного формата.
+    """
+    if format == CSV:
+        df.to_csv(path, index=False, encoding=CSV_ENCODING)
+    elif format == PARQUET:
+        df.to_parquet(path, index=False)
+    else:
+        write_report(path, [("Сводка", df, False)], format=format)
+
+
+def append_report(dataset_dir, filepath, frames, format=CSV):
+    """
+    Дописывает интервалы, общие метрики и фонемы записи в набор данных dataset_dir:
+    у каждой строки — колонка "Файл" (путь к записи). Уже записанное не перечитывается:
+    CSV — дописывание в конец metrics.csv, segments.csv, phonemes.csv (заголовок — только в новый файл);
+    Parquet — новый файл-часть в папках metrics/, segments/, phonemes/ (pd.read_parquet читает папку целиком).
+    Пустые таблицы и лист фонем без результатов распознавания пропускаются.
+    :return: список записанных файлов
+    :raises ValueError: для форматов вне APPEND_FORMATS — книгу xlsx нельзя дописать, не перечитав её
+    """
+    if format not in APPEND_FORMATS:
+        raise ValueError(f"Дописывание в набор данных поддерживается только для {', '.join(APPEND_FORMATS)}")
+    os.makedirs(dataset_dir, exist_ok=True)
+    part = uuid.uuid4().hex
+    paths = []
+    for sheet_name, df, _ in frames:
+        if sheet_name not in APPEND_SHEETS or df.empty or list(df.columns) == ["Сообщение"]:
+            continue
+        table = SHEET_FILES[sheet_name]
+        df = df.copy()
+        df.insert(0, "Файл", filepath)
+        if format == CSV:
+            path = os.path.join(dataset_dir, f"{table}.csv")
+            new = not os.path.exists(path) or os.path.getsize(path) == 0
+            df.to_csv(path, mode="a", header=new, index=False, encoding=CSV_ENCODING)
+        else:
+            os.makedirs(os.path.join(dataset_dir, table), exist_ok=True)
+            path = os.path.join(dataset_dir, table, f"{part}.parquet")
+            df.to_parquet(path, index=False)
+        paths.append(path)
+    return paths
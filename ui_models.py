@@ -0,0 +1,107 @@
+import gc
+import threading
+import time
+from contextlib import contextmanager
+
+
+class ModelRegistry:
+    """
+    Общий на процесс кэш тяжёлых моделей (распознавание речи и т.п.).
+    Модель загружается при первом обращении и дальше
+    переиспользуется всеми анализаторами. Если задан idle_timeout, модель,
+    которой не пользовались столько секунд, выгружается и память освобождается;
+    следующее обращение загрузит её заново.
+    """
+
+    def __init__(self, idle_timeout=None):
+        self.idle_timeout = idle_timeout
+        self.lock = threading.RLock()
+        self.entries = {}  # ключ -> {"model", "users", "last_used"}
+        self.loading = {}  # ключ -> блокировка загрузки этого ключа
+        self.timer = None
+
+    def get(self, key, loader):
+        """
+        Модель по ключу; при отсутствии — загружается вызовом loader().
+        Параллельные обращения к одному ключу ждут одной загрузки, а не грузят модель дважды.
+        loader() выполняется вне общей блокировки: пока модель грузится, другие ключи,
+        is_loaded и выгрузка по простою не ждут её.
+        """
+        while True:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    entry["last_used"] = time.monotonic()
+                    self._schedule_eviction()
+                    return entry["model"]
+                key_lock = self.loading.setdefault(key, threading.Lock())
+            with key_lock:
+                with self.lock:
+                    if key in self.entries:  # загрузил поток, которого мы ждали
+                        continue
+                # Ошибка загрузки уходит вызывающему; следующий get попробует снова
+                model = loader()
+                with self.lock:
+                    self.entries[key] = {"model": model, "users": 0, "last_used": time.monotonic()}
+
+    @contextmanager
+    def use(self, key, loader):
+        """
+        Модель на время работы с ней: пока блок выполняется, выгрузка по простою её не трогает.
+        """
+        while True:
+            model = self.get(key, loader)
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None and entry["model"] is model:  # не выгружена между get и захватом
+                    entry["users"] += 1
+                    break
+        try:
+            yield model
+        finally:
+            with self.lock:
+                entry = self.entries.get(key)
+                if entry is not None:
+                    entry["users"] -= 1
+                    entry["last_used"] = time.monotonic()
+                self._schedule_eviction()
+
+    def is_loaded(self, key):
+        with self.lock:
+            return key in self.entries
+
+    def evict(self, key=None):
+        """
+        Выгружает модель (или все модели), если она сейчас не используется.
+        """
+        with self.lock:
+            keys = [key] if key is not None else list(self.entries)
+            for k in keys:
+                entry = self.entries.get(k)
+                if entry is not None and entry["users"] == 0:
+                    del self.entries[k]
+        gc.collect()
+
+    def evict_idle(self):
+        if self.idle_timeout is None:
+            return
+        now = time.monotonic()
+        with self.lock:
+            for key, entry in list(self.entries.items()):
+                if entry["users"] == 0 and now - entry["last_used"] >= self.idle_timeout:
+                    del self.entries[key]
+        gc.collect()
+
+    def _schedule_eviction(self):
+        # Один таймер на реестр: перезапускается при каждом обращении
+        if self.idle_timeout is None:
+            return
+        if self.timer is not None:
+            self.timer.cancel()
+        self.timer = threading.Timer(self.idle_timeout, self.evict_idle)
+        self.timer.daemon = True
+        self.timer.start()
+
+
+# --- 🧠 Реестр моделей приложения ---
+models = ModelRegistry()
@@ -1,26 +1,95 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+
 import numpy as np
-import scipy.signal
 
-def apply_noise_filter(signal, sr=22050, background_quantile=0.1, peak_quantile=0.96):
+from ui_threshold import EXACT, DEFAULT_REL_ERROR, quantile
+
+MEDIAN_KERNEL = 5     # окно медианного сглаживания в отсчётах
+NOISE_BLOCK = 1 << 16  # отсчётов в блоке при обработке в потоках (блок помещается в кэш)
+
+
+def median5(x, out=None):
+    """
+    Медиана по окну из 5 отсчётов с нулями за краями — то же, что scipy.signal.medfilt(x, 5).
+    Сеть выбора из сравнений (np.minimum / np.maximum) по сдвинутым представлениям массива:
+    результат — всегда один из входных отсчётов, поэтому совпадает с medfilt побитно.
+    Сама по себе сеть быстрее medfilt только на плотном сигнале (600 с @ 44.1 кГц, float32, одно ядро:
+    0.42 с против 1.16 с); на сигнале после зануления, почти целиком из нулей, medfilt быстрее
+    (0.24 с против 0.35–0.40 с). Выигрыш apply_noise_filter в целом (1.0–1.15 с против 1.3–1.6 с
+    у исходной реализации) дают блоки, помещающиеся в кэш, и зануление без полноразмерных копий,
+    а не медиана — поэтому блочный путь быстрее и в одном потоке (см. benchmarks/bench_noise).
+    """
+    x = np.asarray(x)
+    n = len(x)
+    padded = np.zeros(n + 4, dtype=x.dtype)
+    padded[2:n + 2] = x
+    return _median5_padded(padded, out)
+
+
+def _median5_padded(padded, out=None):
+    # padded — сигнал с двумя отсчётами контекста с каждой стороны; результат длиной len(padded) - 4
+    n = len(padded) - 4
+    a, b, c, d, e = (padded[k:k + n] for k in range(5))
+    # медиана пяти = медиана трёх: c, max(min(a, b), min(d, e)), min(max(a, b), max(d, e))
+    low = np.maximum(np.minimum(a, b), np.minimum(d, e))
+    high = np.minimum(np.maximum(a, b), np.maximum(d, e))
+    if out is None:
+        out = np.empty(n, dtype=padded.dtype)
+    np.minimum(c, low, out=out)
+    np.maximum(c, low, out=low)
+    np.minimum(low, high, out=low)
+    return np.maximum(out, low, out=out)
+
+
+def _filter_block(signal, abs_signal, levels, start, end, out):
+    """
+    Зануление отсчётов ниже уровней и медиана для out[start:end].
+    Блок читает по 2 отсчёта соседних блоков, поэтому стыки не отличаются от целого сигнала.
+    """
+    half = MEDIAN_KERNEL // 2
+    lo, hi = max(start - half, 0), min(end + half, len(signal))
+    padded = np.zeros(end - start + 2 * half, dtype=out.dtype)
+    part = padded[lo - start + half:hi - start + half]
+    part[:] = signal[lo:hi]
+    magnitude = abs_signal[lo:hi]
+    keep = magnitude >= levels[0]
+    for level in levels[1:]:
+        keep &= magnitude >= level
+    np.copyto(part, 0, where=~keep)
+    _median5_padded(padded, out=out[start:end])
+
+
+def apply_noise_filter(signal, sr=22050, background_quantile=0.1, peak_quantile=0.96,
+                       threshold_mode=EXACT, rel_error=DEFAULT_REL_ERROR, workers=None):
     """
     Убирает шум и фон из аудиосигнала:
     - Фон убирается по нижнему квантилю амплитуд
     - Затем отбрасываются значения ниже верхнего квантиля (максимумов)
-    - Сглаживание применяется для финальной чистки
+    - Сглаживание (медиана по 5 отсчётам) применяется для финальной чистки
+    Квантили оцениваются в режиме threshold_mode (см. ui_threshold) по всему сигналу,
+    зануление и медиана выполняются по блокам NOISE_BLOCK в workers потоках.
+    Результат совпадает с исходной реализацией (np.where + scipy.signal.medfilt).
+    sr не используется: окно медианы — 5 отсчётов при любой частоте, как и раньше.
     """
-    # --- Удаление фоновой активности ---
+    signal = np.asarray(signal)
     abs_signal = np.abs(signal)
-    bg_level = np.quantile(abs_signal, background_quantile)
-    no_bg = np.where(abs_signal >= bg_level, signal, 0)
 
-    # --- Удаление слабых шумов по квантилю максимума ---
-    cleaned_abs = np.abs(no_bg)
-    if np.any(cleaned_abs > 0):
-        peak_level = np.quantile(cleaned_abs[cleaned_abs > 0], peak_quantile)
-        cleaned = np.where(cleaned_abs >= peak_level, no_bg, 0)
-    else:
-        cleaned = no_bg
+    # --- Удаление фоновой активности ---
+    bg_level = quantile(abs_signal, background_quantile, threshold_mode, rel_error)
+    levels = [bg_level]
+
+    # --- Удаление слабых шумов по квантилю максимума (среди оставшихся ненулевых) ---
+    remaining = abs_signal[(abs_signal >= bg_level) & (abs_signal > 0)]
+    if len(remaining):
+        levels.append(quantile(remaining, peak_quantile, threshold_mode, rel_error, overwrite_input=True))
+    del remaining
 
     # --- Сглаживание для устранения скачков ---
-    smoothed = scipy.signal.medfilt(cleaned, kernel_size=5)
-    return smoothed
+    out = np.empty(len(signal), dtype=np.result_type(signal.dtype, np.float32))
+    blocks = [(start, min(start + NOISE_BLOCK, len(signal))) for start in range(0, len(signal), NOISE_BLOCK)]
+    with ThreadPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        for future in [pool.submit(_filter_block, signal, abs_signal, levels, start, end, out)
+                       for start, end in blocks]:
+            future.result()
+    return out
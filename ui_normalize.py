@@ -1,6 +1,14 @@
 import numpy as np
 
-def apply_normalization(y):
-    if np.max(np.abs(y)) == 0:
+def apply_normalization(y, copy=True):
+    """
+    Нормализация по максимуму модуля.
+    :param copy: False — делить на месте (y должен принадлежать вызывающему)
+    """
+    peak = np.maximum(np.max(y), -np.min(y))  # = max(|y|) без временного массива
+    if peak == 0:
         return y
-    return y / np.max(np.abs(y))
+    if copy:
+        return y / peak
+    y /= peak
+    return y
@@ -1,52 +1,210 @@
 import os
-import shutil
-import torch
-import torchaudio
+import math
+import json
+import hashlib
+import contextlib
 import numpy as np
-import pandas as pd
-from transformers import pipeline
 from tkinter import Toplevel, Frame, BOTH, ttk
 
-# Жёсткая регистрация пути к ffmpeg
-ffmpeg_dir = r"B:\\ffmpeg-7.1.1-full_build\\bin"
-if ffmpeg_dir not in os.environ["PATH"]:
-    os.environ["PATH"] += ";" + ffmpeg_dir
+from ui_models import models
+from ui_cache import CACHE_DIR, DiskCache
+from ui_profile import stage_of
 
-if shutil.which("ffmpeg") is None:
-    raise EnvironmentError(
-        f"[FFMPEG NOT FOUND] ffmpeg.exe не найден по пути: {ffmpeg_dir}. "
-        f"Убедитесь, что файл существует и путь корректен."
+# torch, transformers, librosa и pandas импортируются при первом использовании:
+# модуль подключается при запуске приложения, а модель нужна только для "Анализ речи".
+# ffmpeg для распознавания не нужен — отсчёты передаются в модель из памяти.
+
+ASR_MODEL = "openai/whisper-small"
+ASR_CHUNK_LENGTH = 30
+ASR_GENERATE_KWARGS = {"language": "russian"}
+
+# --- ⚙ Варианты вычислений на CPU ---
+# Чекпойнты меньше whisper-small быстрее, но грубее распознают речь
+ASR_CHECKPOINTS = ("openai/whisper-small", "openai/whisper-base", "openai/whisper-tiny")
+FP32 = "fp32"
+INT8 = "int8"  # динамическое квантование весов Linear, только CPU
+ASR_PRECISIONS = (FP32, INT8)
+# Этапы распознавания в профиле производительности (см. ui_profile.StageProfiler)
+ASR_STAGE_TITLES = {
+    "asr": "Распознавание речи",
+    "asr_cache": "Поиск в кэше распознавания",
+    "asr_model": "Загрузка модели",
+    "asr_input": "Подготовка входа модели",
+    "asr_inference": "Whisper",
+}
+
+DEFAULT_BACKEND = {
+    "model": ASR_MODEL,
+    "precision": FP32,
+    "threads": None,  # потоков torch на распознавание; None — как настроено в torch
+}
+
+# Результаты распознавания по содержимому сигнала и параметрам (см. PhonemeAnalyzer.cache_key)
+asr_cache = DiskCache(os.path.join(CACHE_DIR, "asr"), max_bytes=64 * 1024 * 1024, suffix=".json.gz")
+
+
+def load_transcriber(model=ASR_MODEL, precision=FP32):
+    import torch
+    from transformers import pipeline
+
+    quantized = precision == INT8
+    transcriber = pipeline(
+        "automatic-speech-recognition",
+        model=model,
+        chunk_length_s=ASR_CHUNK_LENGTH,
+        device=0 if torch.cuda.is_available() and not quantized else -1,
+        generate_kwargs=ASR_GENERATE_KWARGS,
     )
+    if quantized:
+        # Веса линейных слоёв — int8, активации квантуются на лету; остальное остаётся fp32
+        transcriber.model = torch.ao.quantization.quantize_dynamic(
+            transcriber.model, {torch.nn.Linear}, dtype=torch.qint8)
+    return transcriber
+
+
+def backend_of(backend=None):
+    return {**DEFAULT_BACKEND, **(backend or {})}
+
+
+def backend_key(backend):
+    """
+    Ключ модели в реестре: чекпойнт и точность (число потоков на веса не влияет).
+    """
+    return f"{backend['model']}:{backend['precision']}"
+
+
+def backend_loader(backend):
+    return lambda: load_transcriber(backend["model"], backend["precision"])
+
+
+def ensure_transcriber(backend=None):
+    """
+    Загружает модель распознавания в реестр (если её там ещё нет) в текущем потоке —
+    для фоновой задачи GUI, которая сама сообщает об ошибке.
+    """
+    backend = backend_of(backend)
+    return models.get(backend_key(backend), backend_loader(backend))
+
+
+def speech_windows(segments, n_samples, sr, padding):
+    """
+    Окна для распознавания по интервалам речи: каждый интервал расширяется на padding
+    секунд с обеих сторон и обрезается по границам записи, пересекающиеся окна сливаются.
+    :return: [(start, end), ...] в отсчётах при частоте sr
+    """
+    windows = []
+    for start, end in sorted(segments):
+        start = max(0, int((start - padding) * sr))
+        end = min(n_samples, int(np.ceil((end + padding) * sr)))
+        if end <= start:
+            continue
+        if windows and start <= windows[-1][1]:
+            windows[-1][1] = max(windows[-1][1], end)
+        else:
+            windows.append([start, end])
+    return [tuple(window) for window in windows]
+
 
 class PhonemeAnalyzer:
-    def __init__(self, parent, audio_data, sample_rate):
+    def __init__(self, parent, audio_data, sample_rate, backend=None):
         self.parent = parent
         self.audio_data = audio_data
         self.sample_rate = sample_rate
-        self.transcriber = None
+        self.backend = backend_of(backend)  # чекпойнт, точность, потоки (см. DEFAULT_BACKEND)
+        self.chunks = []     # Слова с временем от начала записи
         self.positions = []  # Сохраняем для экспорта
 
     def load_model(self):
-        self.transcriber = pipeline(
-            "automatic-speech-recognition",
-            model="openai/whisper-small",
-            chunk_length_s=30,
-            device=0 if torch.cuda.is_available() else -1,
-            generate_kwargs={"language": "russian"},
-        )
+        # Модель общая на процесс (ui_models): повторные анализы её не перезагружают
+        return models.get(backend_key(self.backend), backend_loader(self.backend))
 
     def analyze(self):
-        if self.transcriber is None:
-            self.load_model()
+        self.transcribe()
+        self.display_compact_table()
+
+    def transcribe(self, progress=None, segments=None, padding=0.3, batch_size=8, profiler=None):
+        """
+        Распознавание без обращения к окну — можно вызывать из фонового потока.
+        :param progress: progress(этап, доля или None); вызывается перед каждым
+                         обращением к кодировщику и может прервать распознавание исключением
+        :param segments: интервалы речи [(start, end), ...] в секундах — распознаются только они
+                         (с отступом padding), пачками по batch_size фрагментов; None — весь сигнал
+        :param profiler: ui_profile.StageProfiler — этапы ASR_STAGE_TITLES; None — без профилирования
+        """
+        with stage_of(profiler, "asr", len(self.audio_data)):
+            self._transcribe(progress, segments, padding, batch_size, profiler)
+
+    def _transcribe(self, progress, segments, padding, batch_size, profiler):
+        if progress:
+            progress("Поиск в кэше", None)
+        with stage_of(profiler, "asr_cache", len(self.audio_data)):
+            key = self.cache_key(segments, padding, batch_size)
+            cached = asr_cache.get_json(key)
+        if cached is not None:
+            self.chunks = cached["chunks"]
+            self.positions = [(label, variants, tuple(times)) for label, variants, times in cached["positions"]]
+            return
+
+        model_key = backend_key(self.backend)
+        if progress and not models.is_loaded(model_key):
+            progress("Загрузка модели", None)
+        if self.backend["threads"]:
+            import torch
+            torch.set_num_threads(self.backend["threads"])
+
+        with contextlib.ExitStack() as stack:
+            with stage_of(profiler, "asr_model"):
+                transcriber = stack.enter_context(models.use(model_key, backend_loader(self.backend)))
+            model_sr = transcriber.feature_extractor.sampling_rate
+            with stage_of(profiler, "asr_input", len(self.audio_data)):
+                inputs = self.model_input(model_sr)
+            audio = inputs["raw"]
 
-        audio_np = np.array(self.audio_data)
-        audio_tensor = torch.tensor([audio_np], dtype=torch.float32)
-        torchaudio.save("temp.wav", audio_tensor, self.sample_rate)
-        result = self.transcriber("temp.wav", return_timestamps="word")
+            if segments is None:
+                windows = [(0, len(audio))]
+                requests, kwargs = inputs, {}
+            else:
+                windows = speech_windows(segments, len(audio), model_sr, padding)
+                requests = [{"raw": audio[s:e], "sampling_rate": model_sr} for s, e in windows]
+                kwargs = {"batch_size": batch_size}
 
+            # Фрагменты по chunk_length_s=30 с перекрытием 5 с с каждой стороны идут с шагом 20 с;
+            # кодировщик вызывается один раз на пачку фрагментов — по этим вызовам и считаем прогресс
+            n_chunks = sum(max(1, math.ceil((e - s) / model_sr / 20)) for s, e in windows)
+            total = max(1, math.ceil(n_chunks / kwargs.get("batch_size", 1)))
+            done = [0]
+
+            def on_chunk(module, args):
+                if progress:
+                    progress("Распознавание", min(done[0] / total, 1.0))
+                done[0] += 1
+
+            results = []
+            if windows:
+                hook = transcriber.model.get_encoder().register_forward_pre_hook(on_chunk)
+                try:
+                    with stage_of(profiler, "asr_inference", sum(e - s for s, e in windows)):
+                        results = transcriber(requests, return_timestamps="word", **kwargs)
+                finally:
+                    hook.remove()
+            if segments is None:
+                results = [results]
+
+        # Время слов внутри фрагмента -> время от начала записи
+        chunks = []
+        for (offset, _), result in zip(windows, results):
+            for chunk in result.get("chunks", []):
+                start, end = chunk.get("timestamp", [None, None])
+                if start is not None:
+                    start += offset / model_sr
+                if end is not None:
+                    end += offset / model_sr
+                chunks.append({"text": chunk["text"], "timestamp": (start, end)})
+
+        self.chunks = chunks
         self.positions = []
 
-        for chunk in result.get("chunks", []):
+        for chunk in chunks:
             word = chunk["text"].strip()
             start, end = chunk.get("timestamp", [None, None])
             if not word or start is None or end is None:
@@ -76,7 +234,40 @@ class PhonemeAnalyzer:
                 label = f"{ch.upper()} ({char_start:.1f}–{char_end:.1f}с)"
                 self.positions.append((label, formatted, (char_start, char_end)))
 
-        self.display_compact_table()
+        try:
+            asr_cache.put_json(key, {"chunks": self.chunks, "positions": self.positions})
+        except OSError:
+            pass  # без кэша анализ всё равно состоялся
+
+    def cache_key(self, segments=None, padding=0.3, batch_size=8):
+        """
+        Ключ кэша: хеш отсчётов (float32) и частоты вместе с моделью, параметрами
+        генерации и выбором фрагментов — всё, от чего зависит результат распознавания.
+        """
+        digest = hashlib.sha256()
+        digest.update(np.ascontiguousarray(self.audio_data, dtype=np.float32).view(np.uint8))
+        digest.update(json.dumps({
+            "sr": self.sample_rate,
+            "model": self.backend["model"],
+            "precision": self.backend["precision"],
+            "chunk_length_s": ASR_CHUNK_LENGTH,
+            "generate_kwargs": ASR_GENERATE_KWARGS,
+            "segments": segments and [list(segment) for segment in segments],
+            "padding": padding if segments is not None else None,
+            "batch_size": batch_size if segments is not None else None,
+        }, sort_keys=True).encode("utf-8"))
+        return digest.hexdigest()
+
+    def model_input(self, model_sr):
+        """
+        Отсчёты для модели прямо из памяти, без временного файла и ffmpeg:
+        float32, при другой частоте — передискретизация в model_sr.
+        """
+        audio = np.asarray(self.audio_data, dtype=np.float32)
+        if self.sample_rate != model_sr:
+            import librosa
+            audio = librosa.resample(audio, orig_sr=self.sample_rate, target_sr=model_sr)
+        return {"raw": audio, "sampling_rate": model_sr}
 
     def display_compact_table(self):
         if not self.positions:
@@ -103,6 +294,8 @@ class PhonemeAnalyzer:
         tree.pack(fill=BOTH, expand=True)
 
     def get_phoneme_dataframe(self):
+        import pandas as pd
+
         if not self.positions:
             return pd.DataFrame()
 
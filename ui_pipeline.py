@@ -0,0 +1,314 @@
+import numpy as np
+import librosa
+import soxr
+
+from ui_noise import apply_noise_filter
+from ui_normalize import apply_normalization
+from ui_trim import apply_trim_silence
+from ui_slice_filter import apply_marker_zeroing_filter
+from ui_latent_free import smooth_signal, compute_threshold
+from ui_segments import detect_runs, merge_runs, to_seconds
+import ui_latent_experiment
+from ui_threshold import EXACT, DEFAULT_REL_ERROR
+from ui_speed import RESAMPLE, frame_hop, smoothing_width, target_rate
+from ui_envelope import SAMPLES, DEFAULT_HOP, frame_envelope, refine_runs
+from ui_profile import stage_of
+
+# --- ⚙ Параметры обработки по умолчанию (совпадают с начальными значениями GUI) ---
+DEFAULT_PARAMS = {
+    "noise": False,        # Фильтр шума
+    "normalize": False,    # Нормализация
+    "trim": False,         # Обрезка тишины
+    "markers": False,      # Фонемы → зануление вне
+    "energy": False,       # Энергетические интервалы
+    "speed": 1.0,
+    "speed_mode": RESAMPLE,  # учёт скорости: ресемплингом или (приближённо) аналитически, см. ui_speed
+    "quantile": 0.92,
+    "merge": 1.0,
+    "window": 5,
+    "envelope": SAMPLES,   # огибающая: |y| по отсчётам или по кадрам (RMS, пик, Тигер–Кайзер, см. ui_envelope)
+    "hop": DEFAULT_HOP,    # шаг кадров огибающей в отсчётах (для огибающих по кадрам)
+    "experiment": "свободный",
+    "threshold_mode": EXACT,              # режим оценки квантилей (см. ui_threshold)
+    "threshold_error": DEFAULT_REL_ERROR,  # допустимая отн. погрешность приближённых режимов
+}
+
+MARKERS = [1.5, 3.0, 6.2, 7.5]
+
+
+# Этапы цепочки в порядке выполнения: изменение параметра этапа сбрасывает его и все последующие
+STAGES = ("filters", "speed", "energy", "smoothing", "threshold", "runs", "merge")
+FILTERS = ("noise", "normalize", "trim", "markers")
+
+STAGE_TITLES = {
+    "process": "Обработка",
+    "open": "Открытие файла",
+    "load": "Чтение файла целиком",
+    "stream": "Потоковый поиск интервалов",
+    "waveform": "Построение графика",
+    "filters": "Фильтры",
+    "noise": "Фильтр шума",
+    "normalize": "Нормализация",
+    "trim": "Обрезка тишины",
+    "markers": "Зануление вне фонем",
+    "speed": "Смена скорости",
+    "energy": "Энергия",
+    "smoothing": "Сглаживание",
+    "threshold": "Порог",
+    "runs": "Участки выше порога",
+    "merge": "Слияние",
+    "calibration": "Подбор параметров",
+}
+
+RESAMPLE_BLOCK = 1 << 18
+
+# Бюджет памяти на временные массивы этапов: если сигнал с ними не помещается,
+# энергия со сглаживанием и поиск участков выполняются по блокам (результат тот же)
+DEFAULT_MEMORY_BUDGET = 1 << 30
+STAGE_TEMPORARIES = 3       # полноразмерных массивов у этапов энергии и сглаживания: |y|, свёртка, результат
+MIN_BLOCK, MAX_BLOCK = 1 << 16, 1 << 22
+
+
+def resample(y, orig_sr, target_sr, progress=None, block_size=RESAMPLE_BLOCK):
+    """
+    То же, что librosa.resample (soxr_hq, длина ceil(len * target_sr / orig_sr)),
+    но по блокам через потоковый soxr — результат совпадает побитно.
+    Между блоками вызывается progress("speed", доля), который может прервать пересчёт.
+    """
+    if orig_sr == target_sr:
+        return y
+    size = int(np.ceil(len(y) * target_sr / orig_sr))
+    stream = soxr.ResampleStream(orig_sr, target_sr, 1, dtype=y.dtype, quality="soxr_hq")
+    parts = []
+    for start in range(0, max(len(y), 1), block_size):
+        if progress:
+            progress("speed", start / max(len(y), 1))
+        end = start + block_size
+        parts.append(stream.resample_chunk(y[start:end], last=end >= len(y)))
+    return librosa.util.fix_length(np.concatenate(parts), size=size)
+
+
+class Pipeline:
+    """
+    Цепочка обработки из явных этапов: фильтры → смена скорости → энергия →
+    сглаживание → порог → участки выше порога → слияние.
+    Результат каждого этапа запоминается вместе с ключом — параметрами этапа и
+    ключом предыдущего этапа. Поэтому изменение, например, порога слияния
+    пересчитывает только слияние, а квантиль — порог, участки и слияние.
+    Хранится по одному результату на этап (последний).
+    Вычисления идут в типе исходного сигнала (float32 не повышается до float64),
+    фильтры работают на месте над единственной копией сигнала.
+    """
+
+    def __init__(self, memory_budget=DEFAULT_MEMORY_BUDGET):
+        self.source = None
+        self.generation = 0  # номер исходного сигнала: меняется при подаче нового массива
+        self.cache = {}      # этап -> (ключ, результат)
+        self.recomputed = []  # этапы, пересчитанные при последнем запуске
+        self.progress = None
+        self.profiler = None
+        self.memory_budget = memory_budget  # байт; None — без ограничения
+
+    def clear(self):
+        self.source = None
+        self.cache.clear()
+
+    def keys(self, sr, params):
+        """
+        Ключи всех этапов для заданных параметров.
+        """
+        p = {**DEFAULT_PARAMS, **params}
+        noise_mode = (p["threshold_mode"], p["threshold_error"]) if p["noise"] else None
+        keys = {}
+        keys["filters"] = (self.generation, sr, p["noise"], noise_mode, p["normalize"], p["trim"], p["markers"])
+        resampled = p["speed_mode"] == RESAMPLE
+        keys["speed"] = (keys["filters"], p["speed"] if resampled else 1.0)
+        if p["envelope"] == SAMPLES:
+            keys["energy"] = (keys["speed"], SAMPLES, 1)
+            window = smoothing_width(p["window"], p["speed"], p["speed_mode"])
+        else:
+            # Окно сглаживания считается в кадрах, скорость учитывается в шаге кадров
+            keys["energy"] = (keys["speed"], p["envelope"], frame_hop(p["hop"], p["speed"], p["speed_mode"]))
+            window = p["window"]
+        keys["smoothing"] = (keys["energy"], window)
+        keys["threshold"] = (keys["smoothing"], p["quantile"], p["threshold_mode"], p["threshold_error"])
+        keys["runs"] = (keys["threshold"],)
+        keys["merge"] = (keys["runs"], p["merge"])
+        return keys
+
+    def is_cached(self, y, sr, params, stage):
+        """
+        Готов ли результат этапа stage для сигнала y и параметров params без пересчёта.
+        """
+        if y is not self.source:
+            return False
+        entry = self.cache.get(stage)
+        return entry is not None and entry[0] == self.keys(sr, params)[stage]
+
+    def smoothed_envelope(self, y, sr, params):
+        """
+        Сглаженная огибающая из кэша последнего запуска для сигнала y и параметров params.
+        :return: (огибающая, частота её отсчётов, тип огибающей, ключ этапа "smoothing")
+                 или None, если этап не готов (см. is_cached)
+        """
+        if not self.is_cached(y, sr, params, "smoothing"):
+            return None
+        params = {**DEFAULT_PARAMS, **params}
+        key, smoothed = self.cache["smoothing"]
+        _, envelope, hop = key[0]
+        speed_sr = target_rate(sr, params["speed"]) if params["speed_mode"] == RESAMPLE else sr
+        return smoothed, speed_sr / hop, envelope, key
+
+    def block_size(self, y):
+        """
+        Размер блока для поблочного выполнения или None, если этапы укладываются в бюджет памяти.
+        Сигнал, отображённый в память (ui_audio_io.LazyAudio), всегда читается по блокам.
+        """
+        lazy = not isinstance(y, np.ndarray)
+        if not lazy and (self.memory_budget is None or STAGE_TEMPORARIES * y.nbytes <= self.memory_budget):
+            return None
+        budget = self.memory_budget or DEFAULT_MEMORY_BUDGET
+        return int(np.clip(budget // (8 * y.itemsize), MIN_BLOCK, MAX_BLOCK))
+
+    def _profile(self, name, size=None):
+        return stage_of(self.profiler, name, size)
+
+    def _stage(self, name, key, compute, size=None):
+        entry = self.cache.get(name)
+        if entry is None or entry[0] != key:
+            if self.progress:
+                self.progress(name, None)
+            with self._profile(name, size):
+                entry = (key, compute())
+            self.cache[name] = entry
+            self.recomputed.append(name)
+        return entry[1]
+
+    def run(self, y, sr, params, check=True, progress=None, profiler=None):
+        """
+        Полная цепочка обработки без GUI: фильтры и поиск энергетических интервалов.
+        :param y: исходный сигнал (не изменяется)
+        :param sr: частота дискретизации
+        :param params: словарь параметров (см. DEFAULT_PARAMS)
+        :param check: в режиме "5:6" требовать ровно 30 интервалов
+        :param progress: progress(этап, доля или None) перед каждым пересчитываемым этапом;
+                         может прервать выполнение исключением — готовые этапы останутся в кэше
+        :param profiler: ui_profile.StageProfiler — время и память пересчитываемых этапов
+        В режиме скорости по умолчанию (ресемплинг) сигнал передискретизируется на частоту
+        target_rate(sr, speed), и дальнейшие этапы идут на ней. В аналитическом режиме
+        (приближение, см. ui_speed) сигнал не передискретизируется: поиск идёт на исходной частоте
+        с окном сглаживания window / speed, audio и sr — исходные, а output_sr — частота, которую
+        дал бы ресемплинг (для сохранения, см. resample).
+        Для огибающих по кадрам порог и участки ищутся на огибающей в hop раз короче сигнала,
+        окно сглаживания — в кадрах, границы уточняются внутри кадра (см. ui_envelope.refine_runs).
+        :return: словарь audio, sr, output_sr, segments, threshold, series_lines
+        :raises ValueError: в режиме "5:6", если найдено не 30 интервалов
+        """
+        params = {**DEFAULT_PARAMS, **params}
+        if y is not self.source:
+            self.clear()
+            self.source = y
+            self.generation += 1
+        keys = self.keys(sr, params)
+        self.recomputed = []
+        self.progress = progress
+        self.profiler = profiler
+        block = self.block_size(self.source)
+
+        y = self._stage("filters", keys["filters"], lambda: self._filters(self.source, sr, params), len(y))
+        output_sr = sr
+        segments = None
+        threshold = None
+        series_lines = []
+
+        if params["energy"]:
+            output_sr = target_rate(sr, params["speed"])
+            speed_sr = output_sr if params["speed_mode"] == RESAMPLE else sr
+            y = self._stage("speed", keys["speed"], lambda: resample(y, sr, speed_sr, progress), len(y))
+            sr = speed_sr
+            _, envelope, hop = keys["energy"]
+            window = keys["smoothing"][1]
+            rate = sr / hop  # частота отсчётов огибающей
+
+            if envelope != SAMPLES:
+                energy = self._stage("energy", keys["energy"], lambda: frame_envelope(y, envelope, hop), len(y))
+            else:
+                # Сверх бюджета |y| не хранится: считается по блокам вместе со сглаживанием
+                energy = self._stage("energy", keys["energy"], lambda: None if block else np.abs(y), len(y))
+            smoothed = self._stage("smoothing", keys["smoothing"],
+                                   lambda: self._smooth(y, energy, window, block),
+                                   len(y) if energy is None else len(energy))
+            threshold = self._stage("threshold", keys["threshold"],
+                                    lambda: compute_threshold(smoothed, params["quantile"],
+                                                              params["threshold_mode"],
+                                                              params["threshold_error"]), len(smoothed))
+            starts, ends = self._stage("runs", keys["runs"],
+                                       lambda: self._runs(smoothed, threshold, envelope, block, len(y) / hop),
+                                       len(smoothed))
+            segments = self._stage("merge", keys["merge"],
+                                   lambda: to_seconds(*merge_runs(starts, ends, rate, params["merge"]), rate),
+                                   len(starts))
+
+            if params["experiment"] != "свободный":
+                if check:
+                    ui_latent_experiment.check_segment_count(segments)
+                if len(segments) == 30:
+                    series_lines = [segments[i * 6][0] for i in range(1, 5)]
+
+        return {
+            "audio": y,
+            "sr": sr,
+            "output_sr": output_sr,
+            "segments": segments,
+            "threshold": threshold,
+            "series_lines": series_lines,
+        }
+
+    @staticmethod
+    def _smooth(y, energy, window, block):
+        if energy is None:
+            from ui_stream import smooth_energy_blocks
+            return smooth_energy_blocks(y, window, block)
+        return smooth_signal(energy, window)
+
+    @staticmethod
+    def _runs(smoothed, threshold, envelope, block=None, length=None):
+        starts, ends = detect_runs(smoothed, threshold, block_size=block)
+        if envelope != SAMPLES:
+            starts, ends = refine_runs(smoothed, threshold, starts, ends, length)
+        return starts, ends
+
+    def _filters(self, y, sr, params):
+        # Без фильтров возвращается сам исходный сигнал; первый фильтр создаёт копию,
+        # остальные меняют её на месте (owned — копия принадлежит цепочке).
+        # Фильтрам нужен весь сигнал: файл, отображённый в память, читается целиком только здесь
+        owned = False
+        if not isinstance(y, np.ndarray) and any(params[name] for name in FILTERS):
+            with self._profile("load", len(y)):
+                y = np.asarray(y)
+            owned = True
+        if params["noise"]:
+            with self._profile("noise", len(y)):
+                y = apply_noise_filter(y, sr, threshold_mode=params["threshold_mode"],
+                                       rel_error=params["threshold_error"])
+            owned = True
+        if params["normalize"]:
+            with self._profile("normalize", len(y)):
+                normalized = apply_normalization(y, copy=not owned)
+            owned = owned or normalized is not y
+            y = normalized
+        if params["trim"]:
+            with self._profile("trim", len(y)):
+                y = apply_trim_silence(y, sr)  # срез — представление без копирования
+        if params["markers"]:
+            with self._profile("markers", len(y)):
+                y = apply_marker_zeroing_filter(y, sr, MARKERS, buffer=0.5, copy=not owned)
+        return y
+
+
+def run_pipeline(y, sr, params, memory_budget=DEFAULT_MEMORY_BUDGET, profiler=None):
+    """
+    Однократный запуск цепочки (без сохранения результатов между вызовами).
+    :raises ValueError: в режиме "5:6", если найдено не 30 интервалов
+    """
+    return Pipeline(memory_budget).run(y, sr, params, profiler=profiler)
@@ -0,0 +1,181 @@
+from matplotlib.figure import Figure
+from matplotlib.collections import LineCollection, PolyCollection
+
+
+class WaveformPlot:
+    """
+    Один долгоживущий график: фигура, холст и все элементы создаются один раз,
+    дальше меняются только их данные. Огибающие сигналов рисуются в фон,
+    интервалы, порог и границы серий — поверх фона через blitting.
+    :param make_canvas: функция, создающая холст для фигуры (Tk или Agg)
+    """
+
+    def __init__(self, make_canvas, figsize=(10, 3), dpi=100):
+        self.figure = Figure(figsize=figsize, dpi=dpi)
+        self.ax = self.figure.add_subplot()
+        self.figure.subplots_adjust(bottom=0.18)
+        self.canvas = make_canvas(self.figure)
+
+        ax = self.ax
+        ax.set_title("Сравнение аудиосигналов")
+        ax.set_xlabel("Время (сек)")
+
+        # --- 〰 Огибающие (фон) ---
+        self.original_line, = ax.plot([], [], color='gray', alpha=0.5, linewidth=0.8, label='Оригинал')
+        self.processed_line, = ax.plot([], [], color='blue', alpha=0.9, linewidth=0.8, label='Обработанный')
+        self.pyramids = {self.original_line: None, self.processed_line: None}
+
+        # --- 🟩 Накладываемые элементы (blitting) ---
+        # x — в секундах, y — в долях высоты осей: линии всегда во всю высоту
+        bands = ax.get_xaxis_transform()
+        self.spans = PolyCollection([], facecolors='green', alpha=0.2, transform=bands, animated=True)
+        self.starts = LineCollection([], colors='green', linestyles='--', transform=bands, animated=True)
+        self.ends = LineCollection([], colors='red', linestyles='--', transform=bands, animated=True)
+        self.series = LineCollection([], colors='purple', linestyles='-.', linewidths=2,
+                                     transform=bands, animated=True)
+        for artist in (self.spans, self.starts, self.ends, self.series):
+            ax.add_collection(artist, autolim=False)
+        self.threshold_line = ax.axhline(0, color='purple', linestyle='--', label='Порог',
+                                         visible=False, animated=True)
+        self.overlays = (self.spans, self.starts, self.ends, self.threshold_line, self.series)
+        self._update_legend()
+
+        self.background = None
+        self.draw_pending = False
+        self.drag_origin = None
+        self.canvas.mpl_connect('draw_event', self._on_draw)
+        self.canvas.mpl_connect('scroll_event', self.on_scroll)
+        self.canvas.mpl_connect('button_press_event', self.on_press)
+        self.canvas.mpl_connect('motion_notify_event', self.on_drag)
+        self.canvas.mpl_connect('button_release_event', self.on_release)
+        ax.callbacks.connect('xlim_changed', lambda _: self.refresh_waveforms())
+
+    # --- 〰 Огибающие ---
+    def set_waveforms(self, original=None, processed=None, reset_view=False):
+        """
+        Подменяет пирамиды огибающих (WaveformPyramid) и перерисовывает фон.
+        """
+        self.pyramids[self.original_line] = original
+        self.pyramids[self.processed_line] = processed
+
+        y_min, y_max = 0.0, 0.0
+        for pyramid in (original, processed):
+            if pyramid is not None:
+                lo, hi = pyramid.amplitude_range()
+                y_min, y_max = min(y_min, lo), max(y_max, hi)
+        margin = 0.05 * (y_max - y_min) or 1.0
+        self.ax.set_ylim(y_min - margin, y_max + margin)
+
+        t0, t1 = self.ax.get_xlim()
+        if reset_view or t1 > self.total_duration():
+            self.set_view(0, self.total_duration())
+        else:
+            self.refresh_waveforms()
+            self.request_draw()
+
+    def total_duration(self):
+        durations = [pyramid.duration for pyramid in self.pyramids.values() if pyramid is not None]
+        return max(durations) if durations else 1.0
+
+    def refresh_waveforms(self):
+        # Перечитываем из пирамид только видимый участок на нужном уровне детализации
+        t0, t1 = self.ax.get_xlim()
+        width = self.ax.bbox.width
+        for line, pyramid in self.pyramids.items():
+            if pyramid is None:
+                line.set_data([], [])
+            else:
+                line.set_data(*pyramid.view(t0, t1, width))
+
+    # --- 🟩 Интервалы, порог, серии ---
+    def set_overlays(self, segments=None, threshold=None, series_lines=None):
+        """
+        Обновляет накладываемые элементы без перерисовки огибающих.
+        """
+        segments = segments or []
+        self.spans.set_verts([[(s, 0), (e, 0), (e, 1), (s, 1)] for s, e in segments])
+        self.starts.set_segments([[(s, 0), (s, 1)] for s, _ in segments])
+        self.ends.set_segments([[(e, 0), (e, 1)] for _, e in segments])
+        self.series.set_segments([[(x, 0), (x, 1)] for x in series_lines or []])
+
+        visible = bool(threshold)
+        legend_changed = visible != self.threshold_line.get_visible()
+        self.threshold_line.set_visible(visible)
+        if visible:
+            self.threshold_line.set_ydata([threshold, threshold])
+
+        if legend_changed:
+            # Легенда в фоне — при её изменении нужна полная перерисовка
+            self._update_legend()
+            self.request_draw()
+        else:
+            self.blit_overlays()
+
+    def _update_legend(self):
+        handles = [self.original_line, self.processed_line]
+        if self.threshold_line.get_visible():
+            handles.append(self.threshold_line)
+        self.ax.legend(handles=handles, loc="upper right")
+
+    def request_draw(self):
+        # Полная перерисовка (фон + накладываемые элементы) при ближайшем простое
+        self.draw_pending = True
+        self.canvas.draw_idle()
+
+    def _on_draw(self, event):
+        self.draw_pending = False
+        self.background = self.canvas.copy_from_bbox(self.figure.bbox)
+        self._draw_overlays()
+
+    def _draw_overlays(self):
+        for artist in self.overlays:
+            if artist.get_visible():
+                self.ax.draw_artist(artist)
+
+    def blit_overlays(self):
+        if self.background is None or self.draw_pending:
+            self.request_draw()
+            return
+        self.canvas.restore_region(self.background)
+        self._draw_overlays()
+        self.canvas.blit(self.figure.bbox)
+
+    # --- 🔍 Масштаб колесом мыши и сдвиг перетаскиванием ---
+    def view_range(self):
+        t0, t1 = self.ax.get_xlim()
+        return max(t0, 0.0), t1
+
+    def set_view(self, t0, t1):
+        duration = self.total_duration()
+        srs = [pyramid.sr for pyramid in self.pyramids.values() if pyramid is not None]
+        min_span = 10 / max(srs) if srs else 0.0
+        span = min(max(t1 - t0, min_span), duration)
+        t0 = min(max(t0, 0.0), duration - span)
+        self.ax.set_xlim(t0, t0 + span)
+        self.request_draw()
+
+    def on_scroll(self, event):
+        if event.inaxes is not self.ax or event.xdata is None:
+            return
+        t0, t1 = self.ax.get_xlim()
+        scale = 0.8 if event.button == 'up' else 1.25
+        x = event.xdata
+        self.set_view(x - (x - t0) * scale, x + (t1 - x) * scale)
+
+    def on_press(self, event):
+        if event.inaxes is not self.ax:
+            return
+        if event.dblclick:
+            self.set_view(0, self.total_duration())
+            return
+        self.drag_origin = (event.x, self.ax.get_xlim())
+
+    def on_drag(self, event):
+        if self.drag_origin is None or event.x is None:
+            return
+        x0, (t0, t1) = self.drag_origin
+        shift = (event.x - x0) * (t1 - t0) / self.ax.bbox.width
+        self.set_view(t0 - shift, t1 - shift)
+
+    def on_release(self, event):
+        self.drag_origin = None
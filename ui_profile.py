@@ -0,0 +1,182 @@
+import contextlib
+import os
+import sys
+import threading
+import time
+import tracemalloc
+
+import numpy as np
+
+RSS_INTERVAL = 0.002  # период опроса RSS во время этапа (сек)
+
+
+def current_rss():
+    """
+    Текущий объём резидентной памяти процесса в байтах (None, если его не узнать).
+    Только стандартная библиотека: /proc на Linux, GetProcessMemoryInfo на Windows.
+    """
+    if sys.platform.startswith("linux"):
+        with open("/proc/self/statm") as f:
+            return int(f.read().split()[1]) * os.sysconf("SC_PAGE_SIZE")
+    if sys.platform == "win32":
+        import ctypes
+        from ctypes import wintypes
+
+        class Counters(ctypes.Structure):
+            _fields_ = [("cb", wintypes.DWORD), ("PageFaultCount", wintypes.DWORD),
+                        ("PeakWorkingSetSize", ctypes.c_size_t), ("WorkingSetSize", ctypes.c_size_t),
+                        ("QuotaPeakPagedPoolUsage", ctypes.c_size_t), ("QuotaPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaPeakNonPagedPoolUsage", ctypes.c_size_t),
+                        ("QuotaNonPagedPoolUsage", ctypes.c_size_t),
+                        ("PagefileUsage", ctypes.c_size_t), ("PeakPagefileUsage", ctypes.c_size_t)]
+
+        counters = Counters()
+        counters.cb = ctypes.sizeof(Counters)
+        process = ctypes.windll.kernel32.GetCurrentProcess()
+        if ctypes.windll.psapi.GetProcessMemoryInfo(process, ctypes.byref(counters), counters.cb):
+            return counters.WorkingSetSize
+    return None
+
+
+def numpy_blocks():
+    """
+    Живые буферы массивов numpy по данным tracemalloc: (число, байт).
+    """
+    traces = tracemalloc.take_snapshot().filter_traces(
+        [tracemalloc.DomainFilter(True, np.lib.tracemalloc_domain)]).traces
+    return len(traces), sum(trace.size for trace in traces)
+
+
+def stage_of(profiler, name, size=None):
+    """
+    profiler.stage(name, size) или пустой контекст, если профилирование выключено
+    (profiler is None) — тогда этап ничего не стоит.
+    """
+    return profiler.stage(name, size) if profiler else contextlib.nullcontext()
+
+
+class StageProfiler:
+    """
+    Профиль этапов обработки: время (настенное и процессорное — всех потоков процесса),
+    размер входа этапа, пиковый RSS (опрос в фоновом потоке), пик выделенной памяти сверх
+    уровня на начало этапа (tracemalloc — учитывает и временные массивы) и сколько буферов
+    numpy этап оставил после себя (число и объём).
+    Этапы могут быть вложенными (например, отдельные фильтры внутри "filters").
+    allocations=False — лёгкий режим без tracemalloc (он замедляет выделение памяти):
+    из памяти остаётся только пиковый RSS.
+
+        profiler = StageProfiler()
+        with profiler.stage("smoothing", len(y)):
+            ...
+        print(profiler.table(STAGE_TITLES))
+    """
+
+    def __init__(self, interval=RSS_INTERVAL, allocations=True):
+        self.interval = interval
+        self.allocations = allocations
+        self.rows = []
+        self.active = []  # открытые этапы: [строка, пик tracemalloc вложенных этапов]
+        self.lock = threading.Lock()
+        self.sampler = None
+        self.started_tracing = False
+
+    @contextlib.contextmanager
+    def stage(self, name, size=None):
+        """
+        :param size: размер входа этапа (отсчётов, кадров, участков) — для отчёта
+        """
+        if not self.active:
+            self._start()
+        elif self.allocations:
+            # Пик родителя до вложенного этапа запоминается: reset_peak() его сбросит
+            self.active[-1][1] = max(self.active[-1][1], tracemalloc.get_traced_memory()[1])
+        rss = current_rss()
+        row = {"stage": name, "depth": len(self.active), "time": 0.0, "cpu": 0.0, "input": size,
+               "rss_peak": rss, "rss_delta": 0, "alloc_peak": None,
+               "retained": None, "arrays": None}
+        if self.allocations:
+            blocks, retained = numpy_blocks()
+            traced = tracemalloc.get_traced_memory()[0]
+            tracemalloc.reset_peak()
+        with self.lock:
+            self.rows.append(row)
+            self.active.append([row, 0])
+        start = time.perf_counter()
+        cpu = time.process_time()
+        try:
+            yield row
+        finally:
+            row["time"] = time.perf_counter() - start
+            row["cpu"] = time.process_time() - cpu
+            self._sample()
+            with self.lock:
+                _, nested_peak = self.active.pop()
+            if self.allocations:
+                peak = max(nested_peak, tracemalloc.get_traced_memory()[1])
+                row["alloc_peak"] = peak - traced
+                end_blocks, end_retained = numpy_blocks()
+                row["arrays"] = end_blocks - blocks
+                row["retained"] = end_retained - retained
+            if rss is not None:
+                row["rss_delta"] = current_rss() - rss
+            if self.active:
+                if self.allocations:
+                    self.active[-1][1] = max(self.active[-1][1], peak)
+                    tracemalloc.reset_peak()
+            else:
+                self._stop()
+
+    def _sample(self):
+        rss = current_rss()
+        if rss is None:
+            return
+        with self.lock:
+            for row, _ in self.active:
+                row["rss_peak"] = max(row["rss_peak"], rss)
+
+    def _poll(self, stop):
+        while not stop.wait(self.interval):
+            self._sample()
+
+    def _start(self):
+        if self.allocations and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            self.started_tracing = True
+        stop = threading.Event()
+        thread = threading.Thread(target=self._poll, args=(stop,), daemon=True)
+        thread.start()
+        self.sampler = (thread, stop)
+
+    def _stop(self):
+        thread, stop = self.sampler
+        stop.set()
+        thread.join()
+        self.sampler = None
+        if self.started_tracing:
+            tracemalloc.stop()
+            self.started_tracing = False
+
+    def table(self, titles=None):
+        """
+        Текстовая таблица по этапам (вложенные — с отступом).
+        """
+        titles = titles or {}
+        def mb(value, width):
+            return f"{'—':>{width}}" if value is None else f"{value / 2**20:{width - 3}.0f} МБ"
+
+        lines = [f"{'этап':<28} {'время':>9} {'CPU':>9} {'пик RSS':>10} {'Δ RSS':>9} {'пик выдел.':>11} "
+                 f"{'удержано':>10} {'массивов':>9}"]
+        for row in self.rows:
+            name = "  " * row["depth"] + titles.get(row["stage"], row["stage"])
+            arrays = "—" if row["arrays"] is None else row["arrays"]
+            lines.append(f"{name:<28} {row['time']:8.3f}с {row['cpu']:8.3f}с {mb(row['rss_peak'], 10)} "
+                         f"{mb(row['rss_delta'], 9)} {mb(row['alloc_peak'], 11)} {mb(row['retained'], 10)} "
+                         f"{arrays:>9}")
+        return "\n".join(lines)
+
+    def records(self, titles=None):
+        """
+        Строки профиля для отчёта и JSON: словари с названием этапа (titles) и числами в секундах и байтах.
+        """
+        titles = titles or {}
+        return [{**row, "title": titles.get(row["stage"], row["stage"])} for row in self.rows]
@@ -0,0 +1,98 @@
+import os
+import numpy as np
+import pandas as pd
+
+from ui_envelope import SAMPLES, DEFAULT_HOP
+from ui_speed import RESAMPLE
+
+STATS_BLOCK = 1 << 20  # отсчётов за одно чтение при подсчёте мощности
+
+
+def signal_stats(audio, sr):
+    """
+    Длительность и средняя мощность сигнала для листа "Общие метрики".
+    Мощность накапливается по блокам в float64 — так же, как в потоковом режиме, поэтому
+    массив, файл, отображённый в память (ui_audio_io.LazyAudio), и поток считаются одинаково.
+    """
+    energy = 0.0
+    for start in range(0, len(audio), STATS_BLOCK):
+        block = audio[start:start + STATS_BLOCK]
+        energy += float(np.dot(block.astype(np.float64), block))
+    return {"duration": len(audio) / sr, "power": energy / max(len(audio), 1)}
+
+
+def performance_frame(records):
+    """
+    Лист "Производительность": строки профиля (ui_profile.StageProfiler.records),
+    вложенные этапы — с отступом. Память — в МБ; пусто, где величина не измерялась.
+    """
+    def mb(value):
+        return None if value is None else value / 2**20
+
+    return pd.DataFrame([{
+        "Этап": "    " * row["depth"] + row["title"],
+        "Время (сек)": row["time"],
+        "CPU (сек)": row["cpu"],
+        "Размер входа": row["input"],
+        "Пик RSS (МБ)": mb(row["rss_peak"]),
+        "Прирост RSS (МБ)": mb(row["rss_delta"]),
+        "Пик выделений (МБ)": mb(row["alloc_peak"]),
+    } for row in records], columns=["Этап", "Время (сек)", "CPU (сек)", "Размер входа", "Пик RSS (МБ)",
+                                    "Прирост RSS (МБ)", "Пик выделений (МБ)"])
+
+
+def build_report_frames(filepath, sr, stats, segments, params, phoneme_table=None, profile=None):
+    """
+    Собирает таблицы отчёта.
+    :param stats: словарь duration, power (см. signal_stats)
+    :param profile: строки профиля производительности (см. performance_frame) или None — без листа
+    :return: список (имя листа, DataFrame, писать ли индекс)
+    """
+    # --- 📑 1. Латентные интервалы ---
+    df_segments = pd.DataFrame([{
+        "Начало (сек)": start,
+        "Конец (сек)": end,
+        "Длительность (сек)": end - start
+    } for start, end in segments or []], columns=["Начало (сек)", "Конец (сек)", "Длительность (сек)"])
+
+    # --- 📊 2. Статистика латентных интервалов ---
+    df_stats = pd.DataFrame(df_segments["Длительность (сек)"].describe().rename("Статистика"))
+
+    # --- ⚙ 3. Общие метрики сигнала ---
+    signal_metrics = {
+        "Имя файла": [os.path.basename(filepath)],
+        "Частота дискретизации": [sr],
+        "Длительность (сек)": [stats["duration"]],
+        "Средняя мощность": [stats["power"]],
+        "Скорость": [params["speed"]],
+        "Режим скорости": [params.get("speed_mode", RESAMPLE)],
+        "Квантиль": [params["quantile"]],
+        "Порог слияния": [params["merge"]],
+        "Сглаживание": [params["window"]],
+        "Огибающая": [params.get("envelope", SAMPLES)],
+        # Целое с пропуском (Int64): тип колонки не зависит от огибающей — наборы Parquet из разных записей совместимы
+        "Шаг кадров": pd.array([params.get("hop", DEFAULT_HOP) if params.get("envelope", SAMPLES) != SAMPLES
+                                else None], dtype="Int64"),
+        "Тип эксперимента": [params["experiment"]],
+        "Режим порога": [params["threshold_mode"]]
+    }
+    df_metrics = pd.DataFrame(signal_metrics)
+
+    # --- 🧠 4. Фонемный анализ ---
+    if phoneme_table is not None and not phoneme_table.empty:
+        df_phonemes = phoneme_table.copy()
+    else:
+        df_phonemes = pd.DataFrame([{"Сообщение": "Фонемный анализ не проводился или не дал результатов."}])
+
+    frames = [
+        ("Общие метрики", df_metrics, False),
+        ("Латентные интервалы", df_segments, False),
+        ("Статистика по длительности", df_stats, True),
+        ("Фонемы", df_phonemes, False),
+    ]
+
+    # --- ⏱ 5. Производительность (если обработка профилировалась) ---
+    if profile:
+        frames.append(("Производительность", performance_frame(profile), False))
+    return frames
+
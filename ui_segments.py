@@ -0,0 +1,105 @@
+import numpy as np
+
+
+def box_kernel(width, dtype=np.float64):
+    """
+    Ядро скользящего среднего шириной width отсчётов.
+    Для целой ширины — np.ones(width) / width, как и раньше. Для дробной — симметричное
+    ядро нечётной длины: крайние отсчёты входят с долей, остальные с весом 1, сумма весов — 1.
+    Ширина меньше отсчёта — без сглаживания.
+    :param dtype: тип ядра — тип сигнала, чтобы свёртка не повышала float32 до float64
+    """
+    if float(width).is_integer():
+        width = int(width)
+        return (np.ones(width) / width).astype(dtype)
+    width = max(width, 1.0)
+    half = (width - 1) / 2
+    kernel = np.ones(2 * int(np.ceil(half)) + 1)
+    if half % 1:
+        kernel[0] = kernel[-1] = half % 1
+    return (kernel / width).astype(dtype)
+
+
+def above_threshold(signal, threshold, initial=False):
+    """
+    Маска отсчётов выше порога.
+    NaN не открывает и не закрывает участок — как и в поэлементном цикле,
+    состояние в такой точке берётся от предыдущего отсчёта (initial — до начала сигнала).
+    """
+    signal = np.asarray(signal)
+    above = signal > threshold
+    if signal.dtype.kind == 'f':
+        undecided = np.isnan(signal)
+        if undecided.any():
+            idx = np.where(undecided, -1, np.arange(len(signal)))
+            np.maximum.accumulate(idx, out=idx)
+            above = np.where(idx >= 0, above[idx], initial)
+    return above
+
+
+def detect_runs(signal, threshold, block_size=None):
+    """
+    Находит непрерывные участки, где сигнал строго выше порога.
+    Вместо цикла по отсчётам ищет фронты маски (signal > threshold) через np.diff.
+    :param signal: огибающая сигнала (np.ndarray)
+    :param threshold: порог
+    :param block_size: если задан — маска строится по блокам (временные массивы — размера блока),
+                       состояние на стыке переносится, результат тот же
+    :return: (starts, ends) — индексы начала и конца (не включая) каждого участка
+    """
+    if block_size is None or len(signal) <= block_size:
+        above = above_threshold(signal, threshold)
+        edges = np.diff(above.view(np.int8), prepend=np.int8(0), append=np.int8(0))
+        return np.flatnonzero(edges == 1), np.flatnonzero(edges == -1)
+
+    starts, ends = [], []
+    state = False
+    for offset in range(0, len(signal), block_size):
+        above = above_threshold(signal[offset:offset + block_size], threshold, initial=state)
+        edges = np.diff(above.view(np.int8), prepend=np.int8(state))
+        starts.append(np.flatnonzero(edges == 1) + offset)
+        ends.append(np.flatnonzero(edges == -1) + offset)
+        state = bool(above[-1])
+    if state:
+        ends.append(np.array([len(signal)]))
+    return np.concatenate(starts), np.concatenate(ends)
+
+
+def merge_runs(starts, ends, sr, merge_threshold):
+    """
+    Объединяет участки, расположенные ближе merge_threshold (в секундах).
+    Условие слияния то же, что и в исходном цикле: start / sr <= last_end / sr + merge_threshold.
+    :return: (starts, ends) объединённых участков в отсчётах
+    """
+    starts = np.asarray(starts)
+    ends = np.asarray(ends)
+    if len(starts) == 0:
+        return starts, ends
+
+    joined = (starts[1:] / sr) <= (ends[:-1] / sr + merge_threshold)
+    first = np.flatnonzero(~joined) + 1
+
+    merged_starts = np.concatenate((starts[:1], starts[first]))
+    merged_ends = np.concatenate((ends[first - 1], ends[-1:]))
+    return merged_starts, merged_ends
+
+
+def to_seconds(starts, ends, sr):
+    """
+    Переводит границы участков из отсчётов в секунды: [(start, end), ...].
+    """
+    return list(zip((np.asarray(starts) / sr).tolist(), (np.asarray(ends) / sr).tolist()))
+
+
+def find_segments(signal, sr, threshold, merge_threshold):
+    """
+    Общий движок поиска энергетических интервалов для режимов "свободный" и "5:6".
+    :param signal: сглаженная огибающая
+    :param sr: частота дискретизации
+    :param threshold: порог
+    :param merge_threshold: максимальный зазор для слияния (в секундах)
+    :return: список интервалов [(start, end), ...] в секундах
+    """
+    starts, ends = detect_runs(signal, threshold)
+    starts, ends = merge_runs(starts, ends, sr, merge_threshold)
+    return to_seconds(starts, ends, sr)
@@ -1,12 +1,13 @@
 import numpy as np
 
-def apply_marker_zeroing_filter(y, sr, markers, buffer=4.0):
+def apply_marker_zeroing_filter(y, sr, markers, buffer=4.0, copy=True):
     """
     Зануляет участки аудио вне указанных временных маркеров (с учётом буфера).
     :param y: аудиосигнал (np.ndarray)
     :param sr: частота дискретизации
     :param markers: список float — временные точки (например, начала и конца фраз)
     :param buffer: дополнительное время до/после маркеров (в секундах)
+    :param copy: False — занулять на месте (y должен принадлежать вызывающему)
     :return: отфильтрованный сигнал
     """
     duration = len(y) / sr
@@ -25,7 +26,7 @@ def apply_marker_zeroing_filter(y, sr, markers, buffer=4.0):
     if filtered_elements and filtered_elements[-1] + buffer < duration:
         intervals.append((filtered_elements[-1] + buffer, duration))
 
-    y_filtered = y.copy()
+    y_filtered = y.copy() if copy else y
     for start, end in intervals:
         start_idx = int(start * sr)
         end_idx = int(end * sr)
@@ -0,0 +1,36 @@
+# Режимы учёта коэффициента скорости при поиске интервалов
+RESAMPLE = "ресемплинг"    # сигнал передискретизируется в sr * speed, анализ на новой частоте
+ANALYTIC = "аналитический"  # анализ на исходной частоте, окно сглаживания пересчитывается через speed
+SPEED_MODES = (RESAMPLE, ANALYTIC)
+# Аналитический режим — приближение, а не тот же результат: ресемплинг меняет сам сигнал
+# (фильтр soxr срезает частоты выше новой частоты Найквиста), поэтому огибающая и порог другие.
+# Измерено (tests/test_speed.py): порог расходится до ~25% при speed < 1, границы — до ~1.2 мс
+# при слиянии от 0.3 с; при очень малом слиянии (миллисекунды) может различаться и число интервалов.
+
+
+def target_rate(sr, speed):
+    """
+    Частота дискретизации после смены скорости (как в режиме ресемплинга).
+    """
+    return int(sr * speed)
+
+
+def smoothing_width(window, speed, mode=RESAMPLE):
+    """
+    Ширина окна сглаживания в отсчётах исходного сигнала.
+    При ресемплинге окно из window отсчётов на частоте sr * speed длится window / (sr * speed)
+    секунд — на исходной частоте это window / speed отсчётов (в общем случае дробное).
+    """
+    if mode == RESAMPLE or speed == 1.0:
+        return window
+    return window / speed
+
+
+def frame_hop(hop, speed, mode=RESAMPLE):
+    """
+    Шаг кадров огибающей в отсчётах исходного сигнала: hop отсчётов на частоте
+    sr * speed — это hop / speed исходных (округляется до целого, не меньше 1).
+    """
+    if mode == RESAMPLE or speed == 1.0:
+        return hop
+    return max(1, int(round(hop / speed)))
@@ -0,0 +1,293 @@
+import numpy as np
+import soundfile as sf
+
+from ui_segments import above_threshold, box_kernel, merge_runs, to_seconds
+import ui_latent_experiment
+from ui_pipeline import DEFAULT_PARAMS
+from ui_speed import RESAMPLE, smoothing_width
+from ui_envelope import SAMPLES
+from ui_threshold import EXACT, sketch_of
+
+# Размер блока по умолчанию (в отсчётах): пиковая память ~ несколько таких блоков
+DEFAULT_BLOCK_SIZE = 1 << 20
+
+
+def iter_file_blocks(filepath, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Читает файл блоками через soundfile и сводит каналы в моно так же, как librosa.load.
+    """
+    with sf.SoundFile(filepath) as f:
+        for block in f.blocks(blocksize=block_size, dtype="float32", always_2d=True):
+            yield block[:, 0] if block.shape[1] == 1 else np.mean(block, axis=1)
+
+
+def iter_array_blocks(y, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Режет массив в памяти на блоки (без копирования).
+    """
+    for start in range(0, len(y), block_size):
+        yield y[start:start + block_size]
+
+
+class StreamingSmoother:
+    """
+    Скользящее среднее smooth_signal (np.convolve, mode='same') по блокам.
+    Между блоками переносятся последние len(ядра) отсчётов, поэтому
+    результат совпадает с обработкой всего сигнала целиком.
+    window_size может быть дробным (см. box_kernel).
+    """
+
+    def __init__(self, window_size=5, dtype=np.float32):
+        self.kernel = box_kernel(window_size, dtype)
+        self.size = len(self.kernel)
+        self.offset = (self.size - 1) // 2  # сдвиг режима 'same' относительно 'full'
+        self.buffer = np.empty(0, dtype=dtype)  # контекст + ещё не обработанные отсчёты
+        self.context = 0
+        self.position = 0  # индекс следующего отсчёта полной свёртки
+        self.total = 0
+
+    def _emit(self, full, stop=None):
+        start = self.position
+        self.position += len(full)
+        lo = max(self.offset - start, 0)
+        hi = len(full) if stop is None else max(min(stop - start, len(full)), lo)
+        return full[lo:hi]
+
+    def feed(self, block):
+        self.total += len(block)
+        ext = np.concatenate((self.buffer, block))
+        if len(ext) < self.size:
+            self.buffer = ext
+            return np.empty(0)
+
+        # Массив не короче ядра — np.convolve не меняет аргументы местами,
+        # и каждое окно считается тем же скалярным произведением, что и в smooth_signal
+        full = np.convolve(ext, self.kernel, mode='full')[self.context:len(ext)]
+        self.buffer = ext[-self.size:].copy()
+        self.context = self.size
+        return self._emit(full)
+
+    def finish(self):
+        if self.context == 0:
+            # Сигнал короче окна — считаем целиком, как smooth_signal
+            if self.total == 0:
+                return np.empty(0)
+            return np.convolve(self.buffer, self.kernel, mode='same')
+
+        # Остаток и правый край: неполные окна по последним отсчётам сигнала
+        full = np.convolve(self.buffer, self.kernel, mode='full')[self.context:]
+        return self._emit(full, stop=self.offset + self.total)
+
+
+def smooth_energy_blocks(y, window_size, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    smooth_signal(np.abs(y), window_size) по блокам: |y| считается в переиспользуемый
+    буфер размера блока, результат пишется в заранее выделенный массив.
+    Полноразмерный массив |y| не создаётся; результат совпадает со сглаживанием целиком.
+    y может быть ui_audio_io.LazyAudio — тогда с диска читается по одному блоку.
+    """
+    if len(y) <= max(block_size, len(box_kernel(window_size))):
+        return ui_latent_experiment.smooth_signal(np.abs(y), window_size)
+    dtype = np.result_type(y.dtype, np.float32)
+    smoother = StreamingSmoother(window_size, dtype)
+    out = np.empty(len(y), dtype=dtype)
+    scratch = np.empty(min(block_size, len(y)), dtype=dtype)
+    position = 0
+    for start in range(0, len(y), block_size):
+        block = y[start:start + block_size]
+        part = smoother.feed(np.abs(block, out=scratch[:len(block)]))  # feed копирует блок
+        out[position:position + len(part)] = part
+        position += len(part)
+    part = smoother.finish()
+    out[position:position + len(part)] = part
+    return out
+
+
+class StreamingSegmenter:
+    """
+    Поиск и слияние интервалов по блокам огибающей.
+    Возвращает объединённые интервалы, как только они гарантированно завершены.
+    """
+
+    def __init__(self, sr, threshold, merge_threshold):
+        self.sr = sr
+        self.threshold = threshold
+        self.merge_threshold = merge_threshold
+        self.offset = 0
+        self.state = False       # был ли предыдущий отсчёт выше порога
+        self.open_start = None   # начало незакрытого участка
+        self.last = None         # последний объединённый участок (может ещё расшириться)
+
+    def _runs(self, signal):
+        above = above_threshold(signal, self.threshold, initial=self.state)
+        edges = np.diff(above.view(np.int8), prepend=np.int8(self.state))
+        starts = np.flatnonzero(edges == 1) + self.offset
+        ends = np.flatnonzero(edges == -1) + self.offset
+
+        # Участок, открытый в предыдущем блоке, закрывается первым фронтом этого
+        if self.open_start is not None:
+            starts = np.concatenate(([self.open_start], starts))
+        self.open_start = None
+        if len(starts) > len(ends):
+            self.open_start = starts[-1]
+            starts = starts[:-1]
+
+        self.state = bool(above[-1])
+        return starts, ends
+
+    def _merge(self, starts, ends):
+        if len(starts) == 0:
+            return []
+        starts, ends = merge_runs(starts, ends, self.sr, self.merge_threshold)
+        starts, ends = list(starts), list(ends)
+        if self.last is not None:
+            last_start, last_end = self.last
+            if (starts[0] / self.sr) <= (last_end / self.sr + self.merge_threshold):
+                starts[0] = last_start
+            else:
+                starts.insert(0, last_start)
+                ends.insert(0, last_end)
+        self.last = (starts[-1], ends[-1])
+        return to_seconds(starts[:-1], ends[:-1], self.sr)
+
+    def feed(self, signal):
+        if len(signal) == 0:
+            return []
+        starts, ends = self._runs(signal)
+        self.offset += len(signal)
+        return self._merge(starts, ends)
+
+    def finish(self):
+        done = []
+        if self.open_start is not None:
+            done = self._merge(np.array([self.open_start]), np.array([self.offset]))
+            self.open_start = None
+        if self.last is not None:
+            done += to_seconds([self.last[0]], [self.last[1]], self.sr)
+            self.last = None
+        return done
+
+
+def iter_smoothed(make_blocks, window_size, dtype=np.float32):
+    """
+    Поток сглаженной огибающей |y| по блокам.
+    :param make_blocks: функция без аргументов, возвращающая новый итератор блоков
+    """
+    smoother = StreamingSmoother(window_size, dtype)
+    for block in make_blocks():
+        yield smoother.feed(np.abs(block))
+    yield smoother.finish()
+
+
+def stream_threshold(make_blocks, window_size, quantile, max_candidates=DEFAULT_BLOCK_SIZE, dtype=np.float32):
+    """
+    Точный порог compute_threshold без хранения всей огибающей.
+    Положительные числа с плавающей точкой упорядочены так же, как их битовые представления
+    (uint32 для float32, uint64 для float64), поэтому нужная порядковая статистика ищется
+    поразрядно по 16 бит за проход; как только кандидатов остаётся не больше max_candidates,
+    они собираются и выбираются через np.partition.
+    """
+    float_type = np.dtype(dtype)
+    uint = np.dtype(f"u{float_type.itemsize}").type
+    shift = 8 * float_type.itemsize - 16
+    prefix = None
+    rank = None
+    while True:
+        hist = np.zeros(1 << 16, dtype=np.int64)
+        for smoothed in iter_smoothed(make_blocks, window_size, float_type):
+            bits = smoothed[smoothed > 0].astype(float_type, copy=False).view(uint)
+            if prefix is not None:
+                bits = bits[(bits >> uint(shift + 16)) == prefix]
+            hist += np.bincount((bits >> uint(shift)) & uint(0xFFFF), minlength=1 << 16)
+
+        if rank is None:
+            total = int(hist.sum())
+            if total == 0:
+                return 0
+            rank = min(int(total * quantile), total - 1)
+
+        cumulative = np.cumsum(hist)
+        digit = int(np.searchsorted(cumulative, rank, side='right'))
+        rank -= int(cumulative[digit - 1]) if digit else 0
+        prefix = uint(digit) if prefix is None else (prefix << uint(16)) | uint(digit)
+
+        if shift == 0:
+            return np.array([prefix], dtype=uint).view(float_type)[0]
+        if hist[digit] <= max_candidates:
+            break
+        shift -= 16
+
+    candidates = []
+    for smoothed in iter_smoothed(make_blocks, window_size, float_type):
+        bits = smoothed[smoothed > 0].astype(float_type, copy=False).view(uint)
+        candidates.append(bits[(bits >> uint(shift)) == prefix])
+    candidates = np.concatenate(candidates).view(float_type)
+    return np.partition(candidates, rank)[rank]
+
+
+def stream_segments(make_blocks, sr, threshold, window_size, merge_threshold):
+    """
+    Генератор объединённых интервалов (в секундах) по мере чтения блоков.
+    """
+    segmenter = StreamingSegmenter(sr, threshold, merge_threshold)
+    for smoothed in iter_smoothed(make_blocks, window_size):
+        yield from segmenter.feed(smoothed)
+    yield from segmenter.finish()
+
+
+def run_stream_pipeline(filepath, params, block_size=DEFAULT_BLOCK_SIZE):
+    """
+    Потоковый аналог run_pipeline для поиска энергетических интервалов в файле,
+    не загружая его в память целиком.
+    :return: словарь sr, segments, threshold, series_lines, duration, power
+    :param params: параметры цепочки; недостающие берутся из DEFAULT_PARAMS, как у run_pipeline
+    :raises ValueError: для неподдерживаемых параметров и в режиме "5:6", если найдено не 30 интервалов
+    """
+    params = {**DEFAULT_PARAMS, **params}
+    unsupported = [name for name in ("noise", "normalize", "trim", "markers") if params[name]]
+    if unsupported:
+        raise ValueError(f"Потоковый режим не поддерживает фильтры: {', '.join(unsupported)}")
+    speed_mode = params["speed_mode"]
+    if params["speed"] != 1.0 and speed_mode == RESAMPLE:
+        raise ValueError("Потоковый режим поддерживает скорость, отличную от 1.0, только в аналитическом режиме")
+    if params["envelope"] != SAMPLES:
+        raise ValueError("Потоковый режим поддерживает только огибающую по отсчётам")
+
+    sr = sf.info(filepath).samplerate
+    window = smoothing_width(params["window"], params["speed"], speed_mode)
+
+    def make_blocks():
+        return iter_file_blocks(filepath, block_size)
+
+    if params["threshold_mode"] == EXACT:
+        threshold = stream_threshold(make_blocks, window, params["quantile"], block_size)
+    else:
+        # Один проход со скетчем вместо нескольких поразрядных
+        sketch = sketch_of(iter_smoothed(make_blocks, window),
+                           params["threshold_error"])
+        threshold = sketch.threshold(params["quantile"])
+
+    # Последний проход: интервалы и попутно длительность и средняя мощность сигнала
+    stats = {"n": 0, "energy": 0.0}
+
+    def make_counted_blocks():
+        for block in make_blocks():
+            stats["n"] += len(block)
+            stats["energy"] += float(np.dot(block.astype(np.float64), block))
+            yield block
+
+    segments = list(stream_segments(make_counted_blocks, sr, threshold, window, params["merge"]))
+    series_lines = []
+    if params["experiment"] != "свободный":
+        ui_latent_experiment.check_segment_count(segments)
+        series_lines = [segments[i * 6][0] for i in range(1, 5)]
+
+    n = stats["n"]
+    return {
+        "sr": sr,
+        "segments": segments,
+        "threshold": threshold,
+        "series_lines": series_lines,
+        "duration": n / sr,
+        "power": stats["energy"] / n if n else 0.0,
+    }
@@ -0,0 +1,147 @@
+import numpy as np
+
+# Режимы оценки порога
+EXACT = "точный"        # выбор порядковой статистики через np.partition
+APPROX = "приближённый"  # гистограмма с логарифмическими корзинами, ограниченная отн. погрешность
+STREAM = "потоковый"     # та же гистограмма, накапливаемая по блокам за один проход
+THRESHOLD_MODES = (EXACT, APPROX, STREAM)
+
+DEFAULT_REL_ERROR = 0.01
+SKETCH_CHUNK = 1 << 20
+
+
+class QuantileSketch:
+    """
+    Гистограмма неотрицательных значений с относительной шириной корзин (как DDSketch).
+    Корзина — старшие биты float64: порядок и mantissa_bits битов мантиссы, поэтому
+    индекс считается сдвигом битового представления, без логарифмов и сортировки.
+    Середина корзины отличается от любого её значения не более чем на rel_error (относительно).
+    Нули учитываются отдельно. Скетчи с одинаковой точностью можно сливать.
+    """
+
+    def __init__(self, rel_error=DEFAULT_REL_ERROR):
+        self.rel_error = rel_error
+        self.mantissa_bits = min(52, max(0, int(np.ceil(-np.log2(rel_error))) - 1))
+        self.shift = np.uint64(52 - self.mantissa_bits)
+        self.counts = np.zeros(1, dtype=np.int64)
+        self.zeros = 0
+
+    @property
+    def count(self):
+        return self.zeros + int(self.counts.sum())
+
+    def update(self, values):
+        values = np.asarray(values).ravel()
+        for start in range(0, len(values), SKETCH_CHUNK):
+            chunk = values[start:start + SKETCH_CHUNK]
+            self.zeros += int(np.count_nonzero(chunk == 0))
+            chunk = chunk[chunk > 0]  # отбрасывает и NaN
+            if len(chunk) == 0:
+                continue
+            idx = (chunk.astype(np.float64).view(np.uint64) >> self.shift).astype(np.intp)
+            counts = np.bincount(idx, minlength=len(self.counts))
+            counts[:len(self.counts)] += self.counts
+            self.counts = counts
+        return self
+
+    def merge(self, other):
+        if other.shift != self.shift:
+            raise ValueError("Скетчи с разной точностью нельзя объединить")
+        size = max(len(self.counts), len(other.counts))
+        counts = np.zeros(size, dtype=np.int64)
+        counts[:len(self.counts)] += self.counts
+        counts[:len(other.counts)] += other.counts
+        self.counts = counts
+        self.zeros += other.zeros
+        return self
+
+    def value_at(self, rank, positive_only=False):
+        """
+        Оценка порядковой статистики с номером rank (с нуля).
+        """
+        if not positive_only:
+            if rank < self.zeros:
+                return 0.0
+            rank -= self.zeros
+        bucket = int(np.searchsorted(np.cumsum(self.counts), rank, side='right'))
+        bounds = (np.array([bucket, bucket + 1], dtype=np.uint64) << self.shift).view(np.float64)
+        return float((bounds[0] + bounds[1]) / 2)
+
+    def threshold(self, quantile):
+        """
+        Аналог compute_threshold: порядковая статистика среди положительных значений.
+        """
+        total = int(self.counts.sum())
+        if total == 0:
+            return 0
+        return self.value_at(min(int(total * quantile), total - 1), positive_only=True)
+
+    def quantile(self, quantile, positive_only=False):
+        """
+        Аналог np.quantile (линейная интерполяция между соседними порядковыми статистиками).
+        :param positive_only: только по положительным значениям, как np.quantile(x[x > 0], q)
+        """
+        total = int(self.counts.sum()) if positive_only else self.count
+        if total == 0:
+            return np.nan
+        position = (total - 1) * quantile
+        lo = int(np.floor(position))
+        hi = min(lo + 1, total - 1)
+        a, b = self.value_at(lo, positive_only), self.value_at(hi, positive_only)
+        return a + (b - a) * (position - lo)
+
+
+def select_threshold(signal, quantile):
+    """
+    Точный порог без полной сортировки: та же порядковая статистика, что и
+    np.sort(nonzero)[index], но через np.partition за O(n).
+    """
+    nonzero = signal[signal > 0]
+    if len(nonzero) == 0:
+        return 0
+    index = int(len(nonzero) * quantile)
+    index = min(index, len(nonzero) - 1)
+    nonzero.partition(index)  # nonzero — уже копия, переставляем на месте
+    return nonzero[index]
+
+
+def sketch_of(blocks, rel_error=DEFAULT_REL_ERROR):
+    """
+    Однопроходный скетч по итератору блоков.
+    """
+    sketch = QuantileSketch(rel_error)
+    for block in blocks:
+        sketch.update(block)
+    return sketch
+
+
+def compute_threshold(signal, quantile=0.96, mode=EXACT, rel_error=DEFAULT_REL_ERROR):
+    """
+    Порог, выше которого находится (1 - quantile) доля положительных значений сигнала.
+    :param mode: "точный", "приближённый" или "потоковый" (см. THRESHOLD_MODES)
+    :param rel_error: допустимая относительная погрешность для приближённых режимов
+    """
+    if mode == EXACT:
+        return select_threshold(signal, quantile)
+    if mode == APPROX:
+        return QuantileSketch(rel_error).update(signal).threshold(quantile)
+    if mode == STREAM:
+        blocks = (signal[i:i + SKETCH_CHUNK] for i in range(0, len(signal), SKETCH_CHUNK))
+        return sketch_of(blocks, rel_error).threshold(quantile)
+    raise ValueError(f"Неизвестный режим порога: {mode}")
+
+
+def quantile(values, q, mode=EXACT, rel_error=DEFAULT_REL_ERROR, positive_only=False, overwrite_input=False):
+    """
+    Квантиль неотрицательных значений (как np.quantile) в выбранном режиме.
+    Точный режим — np.quantile, который сам использует частичную сортировку.
+    :param positive_only: только по положительным значениям
+    :param overwrite_input: точный режим может переставить values на месте (без копии)
+    """
+    if mode == EXACT:
+        if positive_only:
+            return np.quantile(values[values > 0], q, overwrite_input=True)
+        return np.quantile(values, q, overwrite_input=overwrite_input)
+    if mode in (APPROX, STREAM):
+        return QuantileSketch(rel_error).update(values).quantile(q, positive_only)
+    raise ValueError(f"Неизвестный режим порога: {mode}")
@@ -0,0 +1,136 @@
+import numpy as np
+
+PYRAMID_CHUNK = 1 << 22  # отсчётов за одно чтение при построении уровня 0
+OVERVIEW_BUCKETS = 2048  # корзин в быстром обзоре файла, отображённого в память
+
+
+class WaveformPyramid:
+    """
+    Многоуровневая огибающая min/max для быстрой отрисовки длинных сигналов.
+    Уровень 0 — минимумы и максимумы по корзинам из base отсчётов, каждый
+    следующий укрупняет предыдущий в factor раз. Строится один раз на сигнал;
+    при отрисовке читается только уровень, подходящий под ширину окна, и только
+    корзины, попадающие в видимый интервал.
+    y может быть и ui_audio_io.LazyAudio: уровень 0 строится по кускам PYRAMID_CHUNK,
+    а при крупном масштабе читаются только видимые отсчёты.
+    """
+
+    def __init__(self, y, sr, base=64, factor=4, min_buckets=1024, progress=None):
+        """
+        :param progress: progress("waveform", доля) между кусками; может прервать построение
+        """
+        self.y = y
+        self.sr = sr
+        self.levels = []  # (размер корзины в отсчётах, минимумы, максимумы)
+        self.approximate = False
+
+        size = base
+        n = len(y)
+        if n == 0:
+            return
+        count = -(-n // size)
+        dtype = np.result_type(y.dtype, np.float32)
+        mins = np.empty(count, dtype=dtype)
+        maxs = np.empty(count, dtype=dtype)
+        chunk = max(PYRAMID_CHUNK // size, 1) * size  # куски по целому числу корзин
+        for start in range(0, n, chunk):
+            if progress:
+                progress("waveform", start / n)
+            part = y[start:start + chunk]
+            starts = np.arange(0, len(part), size)
+            first = start // size
+            np.minimum.reduceat(part, starts, out=mins[first:first + len(starts)])
+            np.maximum.reduceat(part, starts, out=maxs[first:first + len(starts)])
+        self.levels.append((size, mins, maxs))
+        while len(mins) > min_buckets:
+            starts = np.arange(0, len(mins), factor)
+            mins = np.minimum.reduceat(mins, starts)
+            maxs = np.maximum.reduceat(maxs, starts)
+            size *= factor
+            self.levels.append((size, mins, maxs))
+
+    @classmethod
+    def overview(cls, y, sr, buckets=OVERVIEW_BUCKETS, probe=64):
+        """
+        Приблизительная огибающая из одного уровня: в каждой из buckets корзин читается
+        только probe отсчётов в её середине. Для файла, отображённого в память, это несколько
+        мегабайт при любой длине — график появляется сразу, пока полная пирамида строится в фоне.
+        Короткие всплески между пробами в обзор могут не попасть (approximate = True).
+        """
+        pyramid = cls.__new__(cls)
+        pyramid.y = y
+        pyramid.sr = sr
+        pyramid.levels = []
+        pyramid.approximate = True
+        n = len(y)
+        if n == 0:
+            return pyramid
+        size = max(-(-n // buckets), 1)
+        count = -(-n // size)
+        mins = np.empty(count, dtype=np.result_type(y.dtype, np.float32))
+        maxs = np.empty_like(mins)
+        for b in range(count):
+            lo = b * size
+            center = min(lo + size // 2, n - 1)
+            part = y[max(center - probe // 2, lo):min(center + probe // 2 + 1, lo + size, n)]
+            mins[b] = part.min()
+            maxs[b] = part.max()
+        pyramid.levels.append((size, mins, maxs))
+        return pyramid
+
+    @property
+    def duration(self):
+        return len(self.y) / self.sr
+
+    def amplitude_range(self):
+        """
+        Минимум и максимум всего сигнала (по самому грубому уровню).
+        """
+        if not self.levels:
+            return 0.0, 0.0
+        _, mins, maxs = self.levels[-1]
+        return float(mins.min()), float(maxs.max())
+
+    def view(self, t0, t1, width):
+        """
+        Точки линии для интервала [t0, t1] секунд при ширине графика width пикселей.
+        Если отсчётов в окне мало — возвращает сами отсчёты, иначе «зигзаг» min/max
+        по корзинам: не больше нескольких точек на пиксель при любой длине файла.
+        :return: (x в секундах, y)
+        """
+        n = len(self.y)
+        i0 = max(int(np.floor(t0 * self.sr)), 0)
+        i1 = min(int(np.ceil(t1 * self.sr)) + 1, n)
+        width = max(int(width), 1)
+        if i1 <= i0:
+            return np.empty(0), np.empty(0)
+
+        count = i1 - i0
+        if count <= 2 * width or not self.levels:
+            return np.arange(i0, i1) / self.sr, self.y[i0:i1]
+
+        # Самый грубый уровень, у которого в окне не меньше width корзин
+        size, mins, maxs = self.levels[0]
+        for level in reversed(self.levels):
+            if count / level[0] >= width:
+                size, mins, maxs = level
+                break
+
+        if self.approximate and count / size < width and count <= PYRAMID_CHUNK:
+            # Обзор слишком груб для такого масштаба — корзины по видимым отсчётам
+            size = -(-count // width)
+            part = self.y[i0:i1]
+            starts = np.arange(0, count, size)
+            return self._zigzag(i0 + starts + size / 2, np.minimum.reduceat(part, starts),
+                                np.maximum.reduceat(part, starts))
+
+        b0 = i0 // size
+        b1 = -(-i1 // size)
+        return self._zigzag(np.arange(b0, b1) * size + size / 2, mins[b0:b1], maxs[b0:b1])
+
+    def _zigzag(self, centers, mins, maxs):
+        x = np.repeat(centers / self.sr, 2)
+        y = np.empty(2 * len(mins), dtype=mins.dtype)
+        y[0::2] = mins
+        y[1::2] = maxs
+        return x, y
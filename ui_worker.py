@@ -0,0 +1,96 @@
+import queue
+import threading
+
+
+class Cancelled(Exception):
+    """
+    Задача отменена пользователем.
+    """
+
+
+class BackgroundJob:
+    """
+    Долгая задача (обработка, распознавание, выгрузка) в фоновом потоке.
+    Функция получает задачу первым аргументом: сообщает о ходе работы через
+    job.progress(stage, fraction) и там же может быть прервана — после отмены
+    progress() и check() выбрасывают Cancelled.
+    Все обратные вызовы выполняются в главном потоке tkinter: фоновый поток
+    только кладёт события в очередь, а главный забирает их через root.after.
+    """
+
+    def __init__(self, root, func, *args, on_done=None, on_error=None, on_cancel=None,
+                 on_progress=None, poll_ms=50, **kwargs):
+        self.root = root
+        self.func = func
+        self.args = args
+        self.kwargs = kwargs
+        self.on_done = on_done
+        self.on_error = on_error
+        self.on_cancel = on_cancel
+        self.on_progress = on_progress
+        self.poll_ms = poll_ms
+
+        self.events = queue.Queue()
+        self.cancel_event = threading.Event()
+        self.thread = None
+        self.finished = False
+
+    def start(self):
+        self.thread = threading.Thread(target=self._run, daemon=True)
+        self.thread.start()
+        self.root.after(self.poll_ms, self._poll)
+        return self
+
+    @property
+    def running(self):
+        return self.thread is not None and not self.finished
+
+    def cancel(self):
+        self.cancel_event.set()
+
+    def check(self):
+        """
+        Точка, в которой задачу можно прервать.
+        """
+        if self.cancel_event.is_set():
+            raise Cancelled()
+
+    def progress(self, stage, fraction=None):
+        """
+        Переход к этапу stage; fraction — доля выполненного этапа (None — неизвестна).
+        """
+        self.check()
+        self.events.put(("progress", (stage, fraction)))
+
+    # --- 🧵 Фоновый поток ---
+    def _run(self):
+        try:
+            result = self.func(self, *self.args, **self.kwargs)
+        except Cancelled:
+            self.events.put(("cancelled", None))
+        except Exception as e:
+            self.events.put(("error", e))
+        else:
+            self.events.put(("done", result))
+
+    # --- 🖥 Главный поток ---
+    def _poll(self):
+        while True:
+            try:
+                kind, value = self.events.get_nowait()
+            except queue.Empty:
+                break
+
+            if kind == "progress":
+                # После отмены уже не показываем этапы, о которых поток успел сообщить
+                if self.on_progress and not self.cancel_event.is_set():
+                    self.on_progress(*value)
+                continue
+
+            self.finished = True
+            callback = {"done": self.on_done, "error": self.on_error, "cancelled": self.on_cancel}[kind]
+            if callback:
+                callback(*(() if kind == "cancelled" else (value,)))
+            return
+
+        self.root.after(self.poll_ms, self._poll)